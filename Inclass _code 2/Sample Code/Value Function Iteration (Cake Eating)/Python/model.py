@@ -7,9 +7,16 @@ This code sets up the model.
 """
 
 #%% Imports from Python
-from numpy import linspace,log
+from numpy import linspace
 from types import SimpleNamespace
 
+#%% Imports from the shared package in the Sample Code folder
+import os,sys
+vfi_root = os.path.abspath(os.path.join(os.path.dirname(__file__),'..','..')) # Sample Code folder.
+if vfi_root not in sys.path:
+    sys.path.append(vfi_root)
+from vfi.utility import crra
+
 #%% Cake-Eating Model.
 class person():
     '''
@@ -75,6 +82,17 @@ class person():
         par.wlen = 300 # Grid size for W.
         par.wmax = 20.00 # Upper bound for W.
         par.wmin = 0.00 # Minimum W.
+
+        # Solver.
+        par.bellman = 'cached' # Bellman maximization: 'loop' (state by state), 'cached' (return matrix built once), or 'chunked' (return matrix built block by block each iteration).
+        par.chunk = 500 # Number of W-states per block when bellman is 'chunked'.
+        par.howard = 0 # Howard improvement: policy-evaluation steps between maximizations (0 turns it off).
+        par.howard_method = 'iterate' # Policy evaluation: 'iterate' (par.howard fixed-policy updates) or 'sparse' (solve the policy's linear system).
+        par.stop = 'l2' # Stopping rule: 'l2' (norm of the change in v), 'sup' (sup norm of the change scaled by beta/(1-beta)), or 'mqp' (MacQueen-Porteus bounds; the reported v is the midpoint of the bounds).
+        par.accel = 'none' # Fixed-point accelerator: 'none' or 'anderson' (Anderson mixing, with a plain update whenever the residual grows).
+        par.accel_depth = 5 # Number of earlier iterates mixed by Anderson acceleration.
+        par.search = 'grid' # Search over W': 'grid' (whole grid), 'monotone' (start at the previous state's optimum and stop once the objective falls), or 'binary' (binary concavity search).
+        par.backend = 'numpy' # Backend: 'numpy' or 'numba' (the grid search over W' compiled by Numba, in parallel over W; it replaces bellman when search is 'grid'). Without Numba installed, 'numba' runs the NumPy code.
         
         # Update parameter values to kwarg values if you don't want the default values.
         for key,val in kwargs.items():
@@ -86,26 +104,30 @@ class person():
         assert par.sigma >= 1.00
         assert par.wlen > 5
         assert par.wmax > par.wmin
+        assert par.bellman in ('loop','cached','chunked')
+        assert par.chunk > 0
+        assert par.howard >= 0
+        assert par.howard_method in ('iterate','sparse')
+        assert par.stop in ('l2','sup','mqp')
+        assert par.accel in ('none','anderson')
+        assert par.accel_depth >= 1
+        assert par.search in ('grid','monotone','binary')
+        assert par.backend in ('numpy','numba')
         
         # Set up cake grid.
         par.wgrid = linspace(par.wmin,par.wmax,par.wlen); # Equally spaced, linear grid for W (and W').
 
         # Utility function.
-        par.util = util
+        par.util = crra
         
         print('beta: ',par.beta)
         print('sigma: ',par.sigma)
         print('wmin: ',par.wmin)
         print('wmax: ',par.wmax)
         print('wlen: ',par.wlen)
-
-#%% CRRA Utility Function.
-def util(c,sigma):
-
-    # CRRA utility
-    if sigma == 1:
-        u = log(c) # Log utility.
-    else:
-        u = (c**(1-sigma))/(1-sigma) # CRRA utility.
-    
-    return u
\ No newline at end of file
+        print('bellman: ',par.bellman)
+        print('howard: ',par.howard)
+        print('stop: ',par.stop)
+        print('accel: ',par.accel)
+        print('search: ',par.search)
+        print('backend: ',par.backend)
@@ -15,6 +15,7 @@ figout = main+"\\output\\figures"
 #%% Import from folder
 from model import person
 from solve import cake_decisions
+from vfi.store import load_solution,save_solution
 from simulate import eat_cake
 from my_graph import log_meals
 
@@ -24,8 +25,10 @@ hungry_person = person()
 # Set the parameters, state space, and utility function.
 hungry_person.setup(main=main,figout=figout,beta = 0.95,sigma=1.00) # You can set the parameters here or use the defaults.
 
-# Solve the model.
-cake_decisions(hungry_person) # Obtain the policy functions for cake size.
+# Solve the model, or load a stored solution for the same parameters and code.
+if not load_solution(hungry_person): # Memory-mapped from the solutions folder.
+    cake_decisions(hungry_person) # Obtain the policy functions for cake size.
+    save_solution(hungry_person) # Simulations and graphs can then be rerun without solving.
 
 # Simulate the model.
 eat_cake(hungry_person) # Simulate forward in time.
@@ -44,6 +44,7 @@ def eat_cake(myClass):
 
     wpol = sol.w # Cake size policy function.
     cpol = sol.c # Consumption policy function.
+    wind = getattr(sol,'w_ind',None) # Cake size policy function as indices on wgrid, if the solver stored it.
 
     T = par.T # Time periods.
     csim = zeros(T) # Container for simulated consumption.
@@ -54,15 +55,20 @@ def eat_cake(myClass):
     
     seed(seed_sim)
 
-    w0_ind = choice(linspace(0,wlen,wlen,endpoint=False,dtype=int),1) # Initial cake size index.
+    w0_ind = choice(linspace(0,wlen,wlen,endpoint=False,dtype=int),1)[0] # Initial cake size index.
     csim[0] = cpol[w0_ind] # Period 1 consumption.
     wsim[0] = wpol[w0_ind] # Period 1 cake size.
     usim[0] = util(csim[0],sigma) # Period 1 value function.
 
+    w_ind = w0_ind # Cake size state today.
+
     # Simulate endogenous variables.
 
     for j in range(1,T): # Time loop.
-        w_ind = where(wsim[j-1]==wgrid) # Find where cake size policy is on the cake size state grid.
+        if wind is not None:
+            w_ind = wind[w_ind] # Follow the index of the cake size policy on the cake size state grid.
+        else:
+            w_ind = where(wsim[j-1]==wgrid)[0][0] # Without indices, find where cake size policy is on the cake size state grid.
         csim[j] = cpol[w_ind] # Period t consumption.
         wsim[j] = wpol[w_ind] # Period t cake size.
         usim[j] = util(csim[j],sigma) # Period t value function.
@@ -2,18 +2,25 @@
 
 solve.py
 --------
-This code solves the model.
+This code solves the model. The Bellman operators and the iteration engine are in the shared vfi package; this file sets up the cake-eating problem for them.
 
 """
 
 #%% Imports from Python
-from numpy import argmax,inf,zeros,seterr
-from numpy.linalg import norm
+from numpy import arange,expand_dims,inf,zeros,seterr
 from types import SimpleNamespace
 import time
 seterr(divide='ignore')
 seterr(invalid='ignore')
 
+#%% Imports from the shared package in the Sample Code folder
+import os,sys
+vfi_root = os.path.abspath(os.path.join(os.path.dirname(__file__),'..','..')) # Sample Code folder.
+if vfi_root not in sys.path:
+    sys.path.append(vfi_root)
+from vfi.bellman import chunked_operator,compiled_operator,follow_policy,grid_operator,iterate,loop_operator,record,search_operator
+from vfi.kernels import bellman_max,select_backend
+
 #%% Solve the model using VFI.
 def cake_decisions(myClass):
     '''
@@ -48,38 +55,71 @@ def cake_decisions(myClass):
     # Value Function Iteration.
     v0 = util(wgrid,sigma)/(1-beta) # Guess of value function.
 
-    crit = 1e-6;
-    maxiter = 10000;
-    diff = 1;
-    iter = 0;
-
     t0 = time.time()
 
-    while (diff > crit) and (iter < maxiter): # Iterate on the Bellman Equation until convergence.
-        
-        v1 = zeros(wlen) # Container for V.
-        w1 = zeros(wlen) # Container for W'.
-        
-        for i in range(0,wlen): # Loop over the state space and maximize.
+    bellman = par.bellman # How the maximization is carried out.
+    search = par.search # How the grid for W' is searched.
+    backend = select_backend(par) # Compiled loops, or NumPy.
+    if backend != par.backend:
+        print('Numba is not installed, so the NumPy backend is used.\n')
+
+    # Period return for every (W,W'). It does not depend on the value function, so it is built once.
+    if (search == 'grid') and (bellman == 'cached') and (backend == 'numpy'):
+        ret = period_return(arange(0,wlen),wgrid,sigma,util)
+
+    # Period return for a choice of W' on the grid, given W.
+    def ret_q(i):
+        def r(q,j):
+            c = wgrid[i]-wgrid[q] # Consumption, c = W-W'.
+            if c <= 0.0:
+                return -inf
+            return util(c,sigma)
+        return r
+
+    # Period return for every choice of W' on the grid, given W.
+    def ret_row(i):
+        def r(j):
             c = wgrid[i]-wgrid # Consumption, c = W-W', for a given state of W, wgrid(i), and the vector of choices for W', wgrid.
             c[c<0.0] = 0.0
-            vall = util(c,sigma) + beta*v0 # Compute the Bellman equation for each choice of W', given a particular state of W.
-            vall[c<=0] = -inf # Set the value function to negative infinity when c <= 0.
-            v1[i] = max(vall) # Find the value of the maximized Bellman equation. Note that wgrid(i)-wgrid is W-W', where W' is a vector.
-            w1[i] = wgrid[argmax(vall)] # Find the value of W' that maximizes the Bellman equation.
-        
-        diff = norm(v1-v0) # Check convergence.
-        v0 = v1; # Update guess.
-        
-        iter = iter + 1; # Update counter.
-        
-        # Print counter.
-        if iter%25 == 0:
-            print('Iteration: ',iter,'.\n')
+            u = util(c,sigma) # Period utility for each choice of W'.
+            u[c<=0] = -inf # Set the return to negative infinity when c <= 0.
+            return u
+        return r
+
+    # Bellman operator.
+    if search != 'grid':
+        T = search_operator(ret_q,wlen,beta,search) # Concavity search over the grid for W'.
+    elif backend == 'numba':
+        T = compiled_operator(lambda ev: bellman_max(wgrid[:,None],zeros(wlen),wgrid,ev,beta,sigma),wlen) # Compiled loop over W, with each return built as it is needed (nothing is undepreciated, so c = W-W').
+    elif bellman == 'cached':
+        T = grid_operator(ret,beta) # Maximize for all states at once.
+    elif bellman == 'chunked':
+        T = chunked_operator(lambda rows: period_return(rows,wgrid,sigma,util),wlen,par.chunk,beta) # Maximize block by block, holding at most chunk*wlen returns in memory.
+    else:
+        T = loop_operator(ret_row,wlen,beta) # Maximize one W-state at a time.
+
+    # Howard improvement: follow the current policy before maximizing again.
+    def evaluate(v0,pol):
+        c1 = wgrid-wgrid[pol] # Consumption under the current policy.
+        r1 = util(c1,sigma) # Utility under the current policy.
+        r1[c1<=0.0] = -inf
+        return follow_policy(v0,r1,pol,beta,par)
+
+    # Iterate on the Bellman Equation until convergence.
+    res = iterate(v0,T,beta,par,evaluate)
+    w1_ind = res.pol # Where the W' that maximizes the Bellman equation is on the grid.
+    w1 = wgrid[w1_ind] # Value of W' that maximizes the Bellman equation.
 
     t1 = time.time()
     print('Elapsed time is ',t1-t0,' seconds.')
-    print('Converged in ',iter,' iterations.')
+    print('Converged in ',res.iter,' iterations.')
+    if par.howard > 0:
+        print('Policy-evaluation steps: ',res.eval_steps,'.')
+
+    # Solver diagnostics.
+    record(sol,res,par)
+    sol.time = t1-t0 # Elapsed time in seconds.
+    sol.backend = backend # Backend that ran.
 
     c = wgrid-w1
     c[c<0.0] = 0.0
@@ -87,5 +127,21 @@ def cake_decisions(myClass):
     # Value and policy functions.
     sol.c = c # Consumption policy function.
     sol.w = w1 # Cake size policy function.
-    sol.v = v1 # Value function.
-    
\ No newline at end of file
+    sol.w_ind = w1_ind # Cake size policy function as indices on wgrid.
+    sol.v = res.v # Value function.
+
+#%% Period return for a block of W-states.
+def period_return(rows,wgrid,sigma,util):
+    '''
+    
+    This function computes utility for each W-state in rows (rows) and each choice of W' on wgrid (columns).
+    Infeasible choices, c <= 0, are set to negative infinity.
+    
+    '''
+
+    c = expand_dims(wgrid[rows],axis=1)-expand_dims(wgrid,axis=0) # Consumption, c = W-W'.
+    c[c<0.0] = 0.0
+    ret = util(c,sigma) # Period utility.
+    ret[c<=0.0] = -inf # Set the return to negative infinity when c <= 0.
+
+    return ret
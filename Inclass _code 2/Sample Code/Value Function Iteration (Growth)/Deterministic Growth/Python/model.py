@@ -7,9 +7,16 @@ This code sets up the model.
 """
 
 #%% Imports from Python
-from numpy import linspace,log
+from numpy import linspace
 from types import SimpleNamespace
 
+#%% Imports from the shared package in the Sample Code folder
+import os,sys
+vfi_root = os.path.abspath(os.path.join(os.path.dirname(__file__),'..','..','..')) # Sample Code folder.
+if vfi_root not in sys.path:
+    sys.path.append(vfi_root)
+from vfi.utility import crra
+
 #%% Deterministic Growth Model.
 class planner():
     '''
@@ -81,6 +88,24 @@ class planner():
         par.klen = 300 # Grid size for k.
         par.kmax = 1.75*par.kss # Upper bound for k.
         par.kmin = 0.25*par.kss # Minimum k.
+
+        # Solver.
+        par.bellman = 'cached' # Bellman maximization: 'loop' (state by state), 'cached' (return matrix built once), or 'chunked' (return matrix built block by block each iteration).
+        par.chunk = 500 # Number of k-states per block when bellman is 'chunked'.
+        par.howard = 0 # Howard improvement: policy-evaluation steps between maximizations (0 turns it off).
+        par.howard_method = 'iterate' # Policy evaluation: 'iterate' (par.howard fixed-policy updates) or 'sparse' (solve the policy's linear system).
+        par.stop = 'l2' # Stopping rule: 'l2' (norm of the change in v), 'sup' (sup norm of the change scaled by beta/(1-beta)), or 'mqp' (MacQueen-Porteus bounds; the reported v is the midpoint of the bounds).
+        par.accel = 'none' # Fixed-point accelerator: 'none' or 'anderson' (Anderson mixing, with a plain update whenever the residual grows).
+        par.accel_depth = 5 # Number of earlier iterates mixed by Anderson acceleration.
+        par.search = 'grid' # Search over k': 'grid' (whole grid), 'monotone' (start at the previous state's optimum and stop once the objective falls), or 'binary' (binary concavity search).
+        par.choice = 'grid' # Choice of k': 'grid' (on kgrid) or 'continuous' (anywhere in [kmin,kmax], with the value function interpolated).
+        par.interp = 'linear' # Interpolation of the value function when choice is 'continuous': 'linear' or 'cubic' (cubic spline).
+        par.golden_tol = 1e-8 # Tolerance for the golden-section search over k' when choice is 'continuous'.
+        par.levels = 1 # Multigrid levels: above 1, the model is first solved on grids with klen/2, klen/4, ... points and each solution is the next initial guess.
+        par.warm_start = False # Warm start: begin from the cached solution for the nearest parameters already solved in this session. The steady-state guess is exact at the steady state here, so a cold start already converges in a few dozen iterations and a warm start seldom saves any.
+        par.warm_tol = 0.10 # Largest relative parameter difference for a cached solution to be used as a warm start.
+        par.warm_size = 20 # Number of solutions kept in the warm-start cache (least recently used are dropped).
+        par.backend = 'numpy' # Backend: 'numpy' or 'numba' (the grid search over k' compiled by Numba, in parallel over k; it replaces bellman when search and choice are 'grid'). Without Numba installed, 'numba' runs the NumPy code.
         
         # Update parameter values to kwarg values if you don't want the default values.
         for key,val in kwargs.items():
@@ -94,12 +119,28 @@ class planner():
         assert par.delta >= 0 and par.delta <= 1.00
         assert par.klen > 5
         assert par.kmax > par.kmin
+        assert par.bellman in ('loop','cached','chunked')
+        assert par.chunk > 0
+        assert par.howard >= 0
+        assert par.howard_method in ('iterate','sparse')
+        assert par.stop in ('l2','sup','mqp')
+        assert par.accel in ('none','anderson')
+        assert par.accel_depth >= 1
+        assert par.search in ('grid','monotone','binary')
+        assert par.choice in ('grid','continuous')
+        assert par.interp in ('linear','cubic')
+        assert par.golden_tol > 0
+        assert par.levels >= 1 and (par.klen-1)//2**(par.levels-1) >= 5
+        assert par.warm_tol >= 0
+        assert par.warm_size >= 1
+        assert (par.choice == 'grid') or (par.howard_method == 'iterate')
+        assert par.backend in ('numpy','numba')
         
         # Set up capital grid.
         par.kgrid = linspace(par.kmin,par.kmax,par.klen); # Equally spaced, linear grid for k (and k').
 
         # Utility function.
-        par.util = util
+        par.util = crra
         
         print('beta: ',par.beta)
         print('sigma: ',par.sigma)
@@ -107,14 +148,10 @@ class planner():
         print('kmax: ',par.kmax)
         print('alpha: ',par.alpha)
         print('delta: ',par.delta)
-
-#%% CRRA Utility Function.
-def util(c,sigma):
-
-    # CRRA utility
-    if sigma == 1:
-        u = log(c) # Log utility.
-    else:
-        u = (c**(1-sigma))/(1-sigma) # CRRA utility.
-    
-    return u
\ No newline at end of file
+        print('bellman: ',par.bellman)
+        print('howard: ',par.howard)
+        print('stop: ',par.stop)
+        print('accel: ',par.accel)
+        print('search: ',par.search)
+        print('choice: ',par.choice)
+        print('backend: ',par.backend)
@@ -7,7 +7,7 @@ This code simulates the model.
 """
 
 #%% Imports from Python
-from numpy import linspace,where,zeros
+from numpy import interp,linspace,where,zeros
 from numpy.random import choice, seed
 from types import SimpleNamespace
 
@@ -36,6 +36,8 @@ def grow_economy(myClass):
     sol = myClass.sol # Policy functions.
 
     sigma = par.sigma # CRRA.
+    alpha = par.alpha # Capital's share of income.
+    delta = par.delta # Depreciation rate.
     util = par.util # Utility function.
     seed_sim = par.seed_sim # Seed for simulation.
 
@@ -46,6 +48,7 @@ def grow_economy(myClass):
     kpol = sol.k # Policy function for capital.
     cpol = sol.c # Policy function for consumption.
     ipol = sol.i # Policy function for investment.
+    kind = getattr(sol,'k_ind',None) # Policy function for capital as indices on kgrid, if the solver stored it.
 
     T = par.T # Time periods.
     ysim = zeros(par.T) # Container for simulated output.
@@ -57,17 +60,30 @@ def grow_economy(myClass):
     # Begin simulation.
     
     seed(seed_sim)
-    k0_ind = choice(linspace(0,klen,klen,endpoint=False,dtype=int),1) # Index for initial capital stock.
+    k0_ind = choice(linspace(0,klen,klen,endpoint=False,dtype=int),1)[0] # Index for initial capital stock.
     ysim[0] = yout[k0_ind] # Output in period 1 given k0.
     csim[0] = cpol[k0_ind] # Consumption in period 1 given k0.
     ksim[0] = kpol[k0_ind] # Capital choice for period 2 given k0.
     isim[0] = ipol[k0_ind] # Investment in period 1 given k0.
     usim[0] = util(csim[0],sigma) # Utility in period 1 given k0.
 
+    kt_ind = k0_ind # Capital state today.
+
     # Simulate endogenous variables.
 
     for j in range(1,T): # Time loop.
-        kt_ind = where(ksim[j-1]==kgrid); # Capital choice in the previous period is the state today. Find where the latter is on the grid.
+        if getattr(sol,'choice','grid') == 'continuous':
+            kt = ksim[j-1] # Capital choice in the previous period is the state today. It is off the grid, so the policy is interpolated.
+            ysim[j] = kt**alpha # Output in period t.
+            ksim[j] = interp(kt,kgrid,kpol) # Capital stock for period t+1.
+            isim[j] = ksim[j]-((1-delta)*kt) # Investment in period t.
+            csim[j] = ysim[j]-isim[j] # Consumption in period t.
+            usim[j] = util(csim[j],sigma) # Utility in period t.
+            continue
+        if kind is not None:
+            kt_ind = kind[kt_ind] # Capital choice in the previous period is the state today. Follow its index on the grid.
+        else:
+            kt_ind = where(ksim[j-1]==kgrid)[0][0] # Without indices, find where the capital choice is on the grid.
         ysim[j] = yout[kt_ind] # Output in period t.
         csim[j] = cpol[kt_ind] # Consumption in period t.
         ksim[j] = kpol[kt_ind] # Capital stock for period t+1.
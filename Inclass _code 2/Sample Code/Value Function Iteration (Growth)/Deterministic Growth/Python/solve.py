@@ -2,18 +2,29 @@
 
 solve.py
 --------
-This code solves the model.
+This code solves the model. The Bellman operators, the iteration engine, and the convergence controls are in the shared vfi package; this file sets up the deterministic growth model for them.
 
 """
 
 #%% Imports from Python
-from numpy import argmax,inf,zeros,seterr
-from numpy.linalg import norm
+from numpy import arange,array,expand_dims,full,inf,maximum,minimum,seterr
 from types import SimpleNamespace
 import time
 seterr(divide='ignore')
 seterr(invalid='ignore')
 
+#%% Imports from the shared package in the Sample Code folder
+import os,sys
+vfi_root = os.path.abspath(os.path.join(os.path.dirname(__file__),'..','..','..')) # Sample Code folder.
+if vfi_root not in sys.path:
+    sys.path.append(vfi_root)
+from vfi.bellman import chunked_operator,compiled_operator,follow_policy,golden_operator,grid_operator,iterate,loop_operator,record,search_operator
+from vfi.convergence import initial_guess,warm_store
+from vfi.kernels import bellman_max,select_backend
+
+#%% Parameters that define a nearby model, for warm starts.
+warm_params = ('beta','sigma','alpha','delta')
+
 #%% Solve the model using VFI.
 def plan_allocations(myClass):
     '''
@@ -56,50 +67,127 @@ def plan_allocations(myClass):
     v0 = util(c0,sigma)/(1-beta) # Guess of value function for each value of k.
     v0[c0<=0.0] = -inf # Set the value function to negative infinity number when c <= 0.
 
-    crit = 1e-6;
-    maxiter = 10000;
-    diff = 1;
-    iter = 0;
-
     t0 = time.time()
 
-    while (diff > crit) and (iter < maxiter): # Iterate on the Bellman Equation until convergence.
-
-        v1 = zeros(klen) # Container for V.
-        k1 = zeros(klen) # Container for k'.
-
-        for p in range(0,klen): # Loop over the k-states.
-
-            # Macro variables.
+    guess = v0.copy() # Steady-state guess, kept for the warm-start cache.
+    # Warm start from a nearby solution already solved, or multigrid from coarser grids.
+    warm_dist,level_klen,level_iter = initial_guess(par,v0,plan_allocations,warm_params)
+
+    bellman = par.bellman # How the maximization is carried out.
+    search = par.search # How the grid for k' is searched.
+    choice = par.choice # Whether k' is restricted to the grid.
+    backend = select_backend(par) # Compiled loops, or NumPy.
+    if backend != par.backend:
+        print('Numba is not installed, so the NumPy backend is used.\n')
+
+    # Period return for every (k,k'). It does not depend on the value function, so it is built once.
+    if (choice == 'grid') and (search == 'grid') and (bellman == 'cached') and (backend == 'numpy'):
+        ret = period_return(arange(0,klen),kgrid,alpha,delta,sigma,util)
+
+    # Bounds for a continuous choice of k': the grid, and positive consumption.
+    klo = full(klen,kgrid[0]) # Lowest k'.
+    khi = maximum(minimum(kgrid**alpha+(1-delta)*kgrid,kgrid[-1]),kgrid[0]) # Highest k'.
+
+    # Period return for a continuous choice of k', for every k at once.
+    def ret_k(kp):
+        c = kgrid**alpha-(kp-((1-delta)*kgrid)) # Consumption, c = y-i.
+        return util(c,sigma),c<=0.0
+
+    # Period return for a choice of k' on the grid, given k.
+    def ret_q(p):
+        y = kgrid[p]**alpha # Output given k, kgrid(p).
+        def r(q,j):
+            c = y-(kgrid[q]-((1-delta)*kgrid[p])) # Consumption, c = y-i.
+            if c <= 0.0:
+                return -inf
+            return util(c,sigma)
+        return r
+
+    # Period return for every choice of k' on the grid, given k.
+    def ret_row(p):
+        def r(j):
             y = kgrid[p]**alpha # Output given k, kgrid(p).
             i = kgrid-((1-delta)*kgrid[p]) # Possible values for investment, i=k'-(1-delta)k, when choosing k' from kgrid and given k.
             c = y-i # Possible values for consumption, c = y-i, given y and i.
             c[c<0.0] = 0.0
-
-            # Solve the maximization problem.
-            vall = util(c,sigma) + beta*v0 # Compute the value function for each choice of k', given k.
-            vall[c<=0.0] = -inf # Set the value function to negative infinity number when c <= 0.
-            v1[p] = max(vall) # Maximize: vmax is the maximized value function; ind is where it is in the grid.
-            k1[p] = kgrid[argmax(vall)] # Optimal k'.
-
-        diff = norm(v1-v0) # Check convergence.
-        v0 = v1; # Update guess.
-
-        iter = iter + 1; # Update counter.
-        
-        # Print counter.
-        if iter%25 == 0:
-            print('Iteration: ',iter,'.\n')
+            u = util(c,sigma) # Period utility for each choice of k'.
+            u[c<=0.0] = -inf # Set the return to negative infinity when c <= 0.
+            return u
+        return r
+
+    # Bellman operator.
+    if choice == 'continuous':
+        T = golden_operator(ret_k,kgrid,klo,khi,beta,par.interp,par.golden_tol) # Golden-section search over k', with the value function interpolated.
+    elif search != 'grid':
+        T = search_operator(ret_q,klen,beta,search) # Concavity search over the grid for k'.
+    elif backend == 'numba':
+        y = array([kgrid[p]**alpha for p in range(0,klen)])[:,None] # Output given k, taken point by point as in period_return.
+        T = compiled_operator(lambda ev: bellman_max(y,(1-delta)*kgrid,kgrid,ev,beta,sigma),klen) # Compiled loop over k, with each return built as it is needed.
+    elif bellman == 'cached':
+        T = grid_operator(ret,beta) # Maximize for all states at once.
+    elif bellman == 'chunked':
+        T = chunked_operator(lambda rows: period_return(rows,kgrid,alpha,delta,sigma,util),klen,par.chunk,beta) # Maximize block by block, holding at most chunk*klen returns in memory.
+    else:
+        T = loop_operator(ret_row,klen,beta) # Maximize one k-state at a time.
+
+    # Howard improvement: follow the current policy before maximizing again.
+    def evaluate(v0,pol):
+        k1 = pol if choice == 'continuous' else kgrid[pol] # Capital policy.
+        c1 = kgrid**alpha-(k1-((1-delta)*kgrid)) # Consumption under the current policy.
+        r1 = util(c1,sigma) # Utility under the current policy.
+        r1[c1<=0.0] = -inf
+        return follow_policy(v0,r1,pol,beta,par,kgrid=kgrid)
+
+    # Iterate on the Bellman Equation until convergence.
+    res = iterate(v0,T,beta,par,evaluate)
+    k1 = res.pol if choice == 'continuous' else kgrid[res.pol] # Optimal k'.
 
     t1 = time.time()
     print('Elapsed time is ',t1-t0,' seconds.')
-    print('Converged in ',iter,' iterations.')
+    print('Converged in ',res.iter,' iterations.')
+    if par.levels > 1:
+        print('Iterations per level: ',level_iter+[res.iter],'.')
+    if par.howard > 0:
+        print('Policy-evaluation steps: ',res.eval_steps,'.')
+
+    # Solver diagnostics.
+    record(sol,res,par)
+    sol.warm_dist = warm_dist # Relative distance to the parameters of the warm start (None for a cold start).
+    sol.time = t1-t0 # Elapsed time in seconds.
+    sol.backend = backend # Backend that ran.
+    sol.level_klen = level_klen+[klen] # Grid size at each level, coarse to fine.
+    sol.level_iter = level_iter+[res.iter] # Iterations at each level, coarse to fine.
 
     # Macro variables, value, and policy functions.
     sol.y = kgrid**alpha # Output.
+    sol.choice = choice # Whether the policies are on the grid.
     sol.k = k1 # Capital policy function.
+    if choice == 'grid':
+        sol.k_ind = res.pol # Capital policy function as indices on kgrid.
     sol.i = k1-((1-delta)*kgrid) # Investment policy function.
     sol.c = sol.y-sol.i # Consumption policy function.
     sol.c[sol.c<0.0] = 0.0
-    sol.v = v1 # Value function.
-    sol.v[sol.c<=0.0] = -inf
\ No newline at end of file
+    sol.v = res.v # Value function.
+    sol.v[sol.c<=0.0] = -inf
+
+    # Cache the solution as a warm start for nearby parameters.
+    if par.warm_start:
+        warm_store(par,sol.v,warm_params,guess)
+
+#%% Period return for a block of k-states.
+def period_return(rows,kgrid,alpha,delta,sigma,util):
+    '''
+    
+    This function computes utility for each k-state in rows (rows) and each choice of k' on kgrid (columns).
+    Infeasible choices, c <= 0, are set to negative infinity.
+    
+    '''
+
+    y = array([kgrid[p]**alpha for p in rows]) # Output given k. k**alpha is taken point by point so it rounds exactly as in the state-by-state loop.
+    i = expand_dims(kgrid,axis=0)-expand_dims((1-delta)*kgrid[rows],axis=1) # Investment, i=k'-(1-delta)k, for every k (rows) and k' (columns).
+    c = expand_dims(y,axis=1)-i # Consumption, c = y-i.
+    c[c<0.0] = 0.0
+    ret = util(c,sigma) # Period utility.
+    ret[c<=0.0] = -inf # Set the return to negative infinity when c <= 0.
+
+    return ret
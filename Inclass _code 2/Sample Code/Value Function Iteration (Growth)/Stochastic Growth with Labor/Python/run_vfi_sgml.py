@@ -15,7 +15,9 @@ figout = main+"\\output\\figures"
 #%% Import from folder
 from model import planner
 from solve import plan_allocations
+from vfi.store import load_solution,save_solution
 from simulate import grow_economy
+from vfi.distribution import find_distribution
 from my_graph import track_growth
 
 #%% Stochastic Growth Model.
@@ -24,11 +26,16 @@ benevolent_dictator = planner()
 # Set the parameters, state space, and utility function.
 benevolent_dictator.setup(main=main,figout=figout,beta = 0.96,sigma=2.00) # You can set the parameters here or use the defaults.
 
-# Solve the model.
-plan_allocations(benevolent_dictator) # Obtain the policy functions for capital.
+# Solve the model, or load a stored solution for the same parameters and code.
+if not load_solution(benevolent_dictator): # Memory-mapped from the solutions folder.
+    plan_allocations(benevolent_dictator) # Obtain the policy functions for capital.
+    save_solution(benevolent_dictator) # Simulations and graphs can then be rerun without solving.
 
 # Simulate the model.
 grow_economy(benevolent_dictator) # Simulate forward in time.
 
+# Stationary distribution.
+find_distribution(benevolent_dictator) # Exact long-run moments without simulation noise.
+
 # Graphs.
 track_growth(benevolent_dictator) # Plot policy functions and simulations.
@@ -2,18 +2,34 @@
 
 solve.py
 --------
-This code solves the model.
+This code solves the model. The Bellman operators, the iteration engine, and the convergence controls are in the shared vfi package; this file sets up the stochastic growth model with labor for them, and solves for labor supply.
 
 """
 
 #%% Imports from Python
-from numpy import argmax,expand_dims,inf,squeeze,tile,zeros,seterr
-from numpy.linalg import norm
+from numpy import arange,asarray,broadcast_shapes,expand_dims,float32,float64,full,inf,maximum,minimum,squeeze,tile,where,zeros,seterr
+from numpy.lib.format import open_memmap
 from scipy.optimize import fminbound
 from types import SimpleNamespace
+import os
 import time
 seterr(all='ignore')
 
+#%% Imports from the shared package in the Sample Code folder
+import sys
+vfi_root = os.path.abspath(os.path.join(os.path.dirname(__file__),'..','..','..')) # Sample Code folder.
+if vfi_root not in sys.path:
+    sys.path.append(vfi_root)
+from vfi.bellman import compiled_operator,follow_policy,golden_operator,iterate,loop_operator,record
+from vfi.convergence import initial_guess,warm_store
+from vfi.kernels import bisect_steps,labor_bellman,labor_grid,select_backend
+from vfi.optimize import bisect
+from vfi.store import solution_key
+from vfi.utility import crra_leisure
+
+#%% Parameters that define a nearby model, for warm starts.
+warm_params = ('beta','sigma','gamma','nu','alpha','delta','rho','sigma_eps','mu')
+
 #%% Solve the model using VFI.
 def plan_allocations(myClass):
     '''
@@ -50,90 +66,269 @@ def plan_allocations(myClass):
 
     Alen = par.Alen # Grid size for A.
     Agrid = par.Agrid[0] # Grid for A.
-    pmat = par.pmat # Grid for A.
+    pmat = par.pmat # Transition matrix for A.
 
     kmat = tile(expand_dims(kgrid,axis=1),(1,Alen)) # k for each value of A.
     Amat = tile(expand_dims(Agrid,axis=0),(klen,1)) # A for each value of k.
 
     util = par.util # Utility function.
-    n0 = zeros((klen,klen,Alen))# Container for n.
 
     t0 = time.time()
 
+    backend = select_backend(par) # Compiled loops, or NumPy.
+    if backend != par.backend:
+        print('Numba is not installed, so the NumPy backend is used.\n')
+    steps = bisect_steps(par.n_tol,par.n_maxiter) # Bisection steps for labor supply, and the bracket width they leave, for the compiled loops.
+
     # Solve for labor choice.
     print('--------------------------------------Solving for Labor Supply------------------------------------\n')
-    for h1 in range(0,klen): # Loop over k state.
-        for h2 in range(0,klen): # Loop over k choice.
-            for h3 in range(0,Alen): # Loop over A state.
-                # Intratemporal condition.
-                foc = lambda n: intra_foc(n,kgrid[h2],Agrid[h3],kgrid[h1],alpha,delta,sigma,nu,gamma)
-                n0[h1,h2,h3] = fminbound(foc,0.0,1.0)
-        
-        # Print counter.
-        if h1%25 == 0:
-            print('Capital State: ',h1,'.\n')
+    n_storage = par.n_storage # How the labor-supply tensor is stored.
+    n_block = par.n_block # k-states per block when solving for labor supply.
+
+    # Container for n.
+    if par.choice == 'continuous':
+        n0 = None # Labor supply is solved together with k' during the Bellman sweep.
+    elif n_storage == 'memmap':
+        key,_ = solution_key(par,os.path.dirname(os.path.abspath(__file__)))
+        n0 = open_memmap(os.path.join(par.main,'n0_'+key+'.npy'),mode='w+',dtype=float64,shape=(klen,klen,Alen)) # On disk under the project directory, named by the parameter hash so that solves of other parameters do not share the file.
+    elif n_storage == 'float32':
+        n0 = zeros((klen,klen,Alen),dtype=float32) # Half the memory of float64.
+    elif n_storage == 'float64':
+        n0 = zeros((klen,klen,Alen))
+    else:
+        n0 = None # Solved for each k-state during the Bellman sweep.
+
+    if par.labor == 'bisect':
+
+        # Intratemporal condition for every (k,k',A), one block of k-states at a time.
+        n_iter = 0
+        n_err = 0.0
+        if n0 is not None:
+            for p0 in range(0,klen,n_block): # Loop over blocks of k-states.
+                rows = arange(p0,min(p0+n_block,klen)) # k-states in the block.
+                if backend == 'numba':
+                    n0[rows] = labor_grid(kgrid[rows],kgrid,Agrid,alpha,delta,sigma,nu,gamma,steps[0]) # Compiled bisection, in parallel over k.
+                    it,err = steps
+                else:
+                    n0[rows],it,err = labor_supply(kgrid[rows],kgrid,Agrid,alpha,delta,sigma,nu,gamma,par.n_tol,par.n_maxiter)
+                n_iter = max(n_iter,it)
+                n_err = max(n_err,err)
+        else:
+            n_lb,n_iter,n_err = labor_supply(kgrid,kgrid[1:2],Agrid,alpha,delta,sigma,nu,gamma,par.n_tol,par.n_maxiter) # Only the choice used in the initial guess.
+
+        # Convergence diagnostics.
+        sol.n_iter = n_iter # Bisection steps taken.
+        sol.n_err = n_err # Largest remaining bracket width for n.
+        sol.n_converged = n_err <= par.n_tol # Whether every bracket is within tolerance.
+
+        print('Bisection steps: ',n_iter,'.')
+        print('Largest bracket for n: ',n_err,'.\n')
+
+    else:
+
+        for h1 in range(0,klen): # Loop over k state.
+            for h2 in range(0,klen): # Loop over k choice.
+                for h3 in range(0,Alen): # Loop over A state.
+                    # Intratemporal condition.
+                    foc = lambda n: intra_foc(n,kgrid[h2],Agrid[h3],kgrid[h1],alpha,delta,sigma,nu,gamma)
+                    n0[h1,h2,h3] = fminbound(foc,0.0,1.0)
+            
+            # Print counter.
+            if h1%25 == 0:
+                print('Capital State: ',h1,'.\n')
+
+    # Storage diagnostics.
+    sol.n_storage = n_storage # How the labor-supply tensor is stored.
+    sol.n_bytes = 0 if n0 is None else n0.nbytes # Size of the labor-supply tensor.
+
+    print('Labor supply storage: ',n_storage,' (',sol.n_bytes/2**20,' MB).\n')
+
+    # Labor supply for every (k',A) given a k-state.
+    if n0 is None:
+        n_row = lambda p: labor_supply(kgrid[p:p+1],kgrid,Agrid,alpha,delta,sigma,nu,gamma,par.n_tol,par.n_maxiter)[0][0]
+    else:
+        n_row = lambda p: n0[p]
+        n_lb = n0[:,1:2,:]
 
     print('--------------------------------------Iterating on Bellman Eq.------------------------------------\n')
 
     # Value Function Iteration.
-    y0 = Amat*(kmat**alpha)*(squeeze(n0[:,1,:])**(1.0-alpha)) # Given combinations of k and A and the value of n associated with the lowest possible k'.
+    y0 = Amat*(kmat**alpha)*(squeeze(n_lb,axis=1)**(1.0-alpha)) # Given combinations of k and A and the value of n associated with the lowest possible k'.
     i0 = delta*kmat # In steady state, k=k'=k*.
     c0 = y0-i0 # Steady-state consumption.
     c0[c0<0.0] = 0.0
-    v0 = util(c0,squeeze(n0[:,1,:]),sigma,nu,gamma)/(1.0-beta) # Guess of value function for each value of k.
+    v0 = util(c0,squeeze(n_lb,axis=1),sigma,nu,gamma)/(1.0-beta) # Guess of value function for each value of k.
     v0[c0<=0.0] = -inf # Set the value function to negative infinity number when c <= 0.
-                    
-    crit = 1e-6;
-    maxiter = 10000;
-    diff = 1;
-    iter = 0;
 
-    while (diff > crit) and (iter < maxiter): # Iterate on the Bellman Equation until convergence.
-    
-        v1 = zeros((klen,Alen)) # Container for V.
-        k1 = zeros((klen,Alen)) # Container for k'.
-        n1 = zeros((klen,Alen)) # Container for n.
-
-        for p in range(0,klen): # Loop over the k-states.
-            for j in range(0,Alen): # Loop over the A-states.
-
-                # Macro variables.
-                y = Agrid[j]*(kgrid[p]**alpha)*(squeeze(n0[p,:,j])**(1.0-alpha)) # Output in the "last period", given combinations of k and A and the value of n associated with the lowest possible k'.
-                i = kgrid-((1-delta)*kgrid[p]) # Possible values for investment, i=k'-(1-delta)k, when choosing k' from kgrid and given k.
-                c = y-i # Possible values for consumption, c = y-i, given y and i.
-                c[c<0.0] = 0.0
-
-                # Solve the maximization problem.
-                ev = squeeze(v0@pmat[j,:].T); #  The next-period value function is the expected value function over each possible next-period A, conditional on the current state j.
-                vall = util(c,n0[p,:,j],sigma,nu,gamma) + beta*ev # Compute the value function for each choice of k', given k.
-                vall[c<=0.0] = -inf # Set the value function to negative infinity number when c <= 0.
-                v1[p,j] = max(vall) # Maximize: vmax is the maximized value function; ind is where it is in the grid.
-                k1[p,j] = kgrid[argmax(vall)] # Optimal k'.
-                n1[p,j] = n0[p,argmax(vall),j] # Choice of n given k,k', and A.
-        
-        diff = norm(v1-v0) # Check convergence.
-        v0 = v1; # Update guess.
+    guess = v0.copy() # Steady-state guess, kept for the warm-start cache.
+    # Warm start from a nearby solution already solved, or multigrid from coarser grids. The fine level's memmap file stays in use, so coarse levels keep n in memory.
+    warm_dist,level_klen,level_iter = initial_guess(par,v0,plan_allocations,warm_params,n_storage='float64' if n_storage == 'memmap' else n_storage)
 
-        iter = iter + 1; # Update counter.
-        
-        # Print counter.
-        if iter%25 == 0:
-            print('Iteration: ',iter,'.\n')
+    choice = par.choice # Whether k' is restricted to the grid.
+
+    # Bounds for a continuous choice of k': the grid, and positive consumption when working full time.
+    klo = full((klen,Alen),kgrid[0]) # Lowest k'.
+    khi = maximum(minimum(Amat*(kmat**alpha)+(1-delta)*kmat,kgrid[-1]),kgrid[0]) # Highest k'.
+
+    # Period return for a continuous choice of k', for every (k,A) at once, with n solved at each k'.
+    def ret_k(kp):
+        n = labor_choice(kmat,kp,Amat,alpha,delta,sigma,nu,gamma,par.n_tol,par.n_maxiter)[0] # Labor supply given k, k', and A.
+        c = Amat*(kmat**alpha)*(n**(1.0-alpha))-(kp-((1-delta)*kmat)) # Consumption, c = y-i.
+        return util(c,n,sigma,nu,gamma),c<=0.0
+
+    # Labor supply of the state being maximized, and the choice of n once k' is chosen.
+    labor = SimpleNamespace(n_p=None,n1=None)
+
+    def pick(p,ind):
+        labor.n1[p] = labor.n_p[ind,arange(0,Alen)] # Choice of n given k,k', and A.
+
+    # Period return for every choice of k' on the grid, given k and A.
+    def ret_row(p):
+        n_p = labor.n_p = n_row(p) # Labor supply for every (k',A), given k.
+        def r(j):
+            y = Agrid[j]*(kgrid[p]**alpha)*(n_p[:,j]**(1.0-alpha)) # Output given k, A, and the labor supply for each k'.
+            i = kgrid-((1-delta)*kgrid[p]) # Possible values for investment, i=k'-(1-delta)k, when choosing k' from kgrid and given k.
+            c = y-i # Possible values for consumption, c = y-i, given y and i.
+            c[c<0.0] = 0.0
+            u = util(c,n_p[:,j],sigma,nu,gamma) # Period utility for each choice of k'.
+            u[c<=0.0] = -inf # Set the return to negative infinity when c <= 0.
+            return u
+        return r
+
+    # Maximization over k' for every (k,A) in a compiled loop, with n read from n0 or, without it, solved at each (k,k',A).
+    def labor_kernel(ev):
+        v1,ind,labor.n1 = labor_bellman(kgrid,Agrid,zeros((0,0,0)) if n0 is None else asarray(n0),n0 is None,ev,beta,alpha,delta,sigma,nu,gamma,steps[0])
+        return v1,ind
+
+    # Bellman operator.
+    if choice == 'continuous':
+        T = golden_operator(ret_k,kgrid,klo,khi,beta,par.interp,par.golden_tol,pmat) # Golden-section search over k', with the expected value function interpolated.
+    elif backend == 'numba':
+        T = compiled_operator(labor_kernel,klen,pmat) # Compiled loop over (k,A), with each return built as it is needed.
+    else:
+        T = loop_operator(ret_row,klen,beta,pmat,pick) # Maximize one k-state at a time.
+
+    # Bellman operator with the choice of n: the policy is (k',k' as the policy for Howard improvement,n).
+    def bellman(v0):
+        if choice == 'continuous':
+            v1,k1 = T(v0)
+            n1 = labor_choice(kmat,k1,Amat,alpha,delta,sigma,nu,gamma,par.n_tol,par.n_maxiter)[0] # Choice of n given k,k', and A.
+            return v1,(k1,k1,n1)
+        labor.n1 = zeros((klen,Alen)) # Container for n.
+        v1,k1_ind = T(v0)
+        return v1,(kgrid[k1_ind],k1_ind,labor.n1)
+
+    # Howard improvement: follow the current policy before maximizing again.
+    def evaluate(v0,pol):
+        k1,p1,n1 = pol
+        c1 = Amat*(kmat**alpha)*(n1**(1.0-alpha))-(k1-((1.0-delta)*kmat)) # Consumption under the current policy.
+        r1 = util(c1,n1,sigma,nu,gamma) # Utility under the current policy.
+        r1[c1<=0.0] = -inf
+        return follow_policy(v0,r1,p1,beta,par,pmat,kgrid)
+
+    # Iterate on the Bellman Equation until convergence.
+    res = iterate(v0,bellman,beta,par,evaluate)
+    k1,k1_ind,n1 = res.pol
 
     t1 = time.time()
     print('Elapsed time is ',t1-t0,' seconds.')
-    print('Converged in ',iter,' iterations.')
+    print('Converged in ',res.iter,' iterations.')
+    if par.levels > 1:
+        print('Iterations per level: ',level_iter+[res.iter],'.')
+    if par.howard > 0:
+        print('Policy-evaluation steps: ',res.eval_steps,'.')
+
+    # Solver diagnostics.
+    record(sol,res,par)
+    sol.warm_dist = warm_dist # Relative distance to the parameters of the warm start (None for a cold start).
+    sol.time = t1-t0 # Elapsed time in seconds, including the labor-supply stage.
+    sol.backend = backend # Backend that ran.
+    sol.level_klen = level_klen+[klen] # Grid size at each level, coarse to fine.
+    sol.level_iter = level_iter+[res.iter] # Iterations at each level, coarse to fine.
 
     # Macro variables, value, and policy functions.
     sol.y = Amat*(kmat**alpha)*(n1**(1.0-alpha)) # Output.
+    sol.choice = choice # Whether the policies are on the grid.
     sol.k = k1 # Capital policy function.
+    if choice == 'grid':
+        sol.k_ind = k1_ind # Capital policy function as indices on kgrid.
     sol.n = n1 # Labor supply policy function.
+    sol.n0 = n0 # Labor supply for every (k,k',A), as stored by the labor-supply stage (None when it is solved during the Bellman sweep).
     sol.i = k1-((1.0-delta)*kmat) # Investment policy function.
     sol.c = sol.y-sol.i # Consumption policy function.
     sol.c[sol.c<0.0] = 0.0
-    sol.v = v1 # Value function.
+    sol.v = res.v # Value function.
     sol.v[sol.c<=0.0] = -inf
 
+    # Cache the solution as a warm start for nearby parameters.
+    if par.warm_start:
+        warm_store(par,sol.v,warm_params,guess)
+
+#%% Labor supply for every (k,k',A).
+def labor_supply(kstate,kchoice,Agrid,alpha,delta,sigma,nu,gamma,tol,maxiter):
+    '''
+    
+    This function solves the intratemporal condition for labor for all combinations of k (axis 0), k' (axis 1), and A (axis 2) at once (see labor_choice).
+    
+    Input:
+        kstate  : Values of k (state).
+        kchoice : Values of k' (choice).
+        Agrid   : Grid for A.
+        tol     : Tolerance for the width of the bracket.
+        maxiter : Maximum number of bisection steps.
+        
+    Output:
+        n    : Labor supply, shape (len(kstate),len(kchoice),len(Agrid)).
+        iter : Number of bisection steps.
+        err  : Largest remaining bracket width.
+        
+    '''
+
+    k = expand_dims(kstate,axis=(1,2)) # k state.
+    kp = expand_dims(kchoice,axis=(0,2)) # k' choice.
+    A = expand_dims(Agrid,axis=(0,1)) # A state.
+
+    return labor_choice(k,kp,A,alpha,delta,sigma,nu,gamma,tol,maxiter)
+
+#%% Labor supply for given (k,k',A).
+def labor_choice(k,kp,A,alpha,delta,sigma,nu,gamma,tol,maxiter):
+    '''
+    
+    This function solves the intratemporal condition for labor, elementwise for k, k', and A broadcast against each other.
+    The bracket starts at the n where consumption is zero (see labor_floor), so consumption is positive at every midpoint and the condition is positive just above it.
+    The leisure term is convex in n, so the condition can turn positive again after the root; the root is kept only if it is better than working full time.
+    
+    Output:
+        n    : Labor supply, in the broadcast shape of k, k', and A.
+        iter : Number of bisection steps.
+        err  : Largest remaining bracket width.
+        
+    '''
+
+    n_min = labor_floor(k,kp,A,alpha,delta) # Consumption is positive only above n_min.
+    foc = lambda n: intra_foc(n,kp,A,k,alpha,delta,sigma,nu,gamma) # Positive while working more still raises utility.
+    n,iter,err = bisect(foc,broadcast_shapes(k.shape,kp.shape,A.shape),tol,maxiter,n_min)
+
+    # Interior root against the corner n = 1.
+    c = (A*(k**alpha)*(n**(1.0-alpha)))+((1.0-delta)*k-kp) # Consumption at the root.
+    c1 = (A*(k**alpha))+((1.0-delta)*k-kp) # Consumption when working full time.
+    full_time = (c1 > 0.0) & ((c <= 0.0) | (crra_leisure(c1,1.0,sigma,nu,gamma) > crra_leisure(c,n,sigma,nu,gamma)))
+    n = where(full_time,1.0,n)
+
+    return n,iter,err
+
+#%% Lowest labor supply with positive consumption.
+def labor_floor(k,kp,A,alpha,delta):
+    '''
+    
+    This function gives the n at which consumption is zero given k, k', and A, clipped to [0,1]: output A*k^alpha*n^(1-alpha) just pays for the investment k'-(1-delta)k.
+    
+    '''
+
+    i = maximum(kp-((1.0-delta)*k),0.0) # Investment that output must pay for.
+
+    return minimum((i/(A*(k**alpha)))**(1.0/(1.0-alpha)),1.0)
+
 #%% Intra-temporal conditions for labor.
 def intra_foc(n,kp,A,k,alpha,delta,sigma,nu,gamma):
 
@@ -7,10 +7,17 @@ This code sets up the model.
 """
 
 #%% Imports from Python
-from numpy import count_nonzero,exp,expand_dims,linspace,log,tile
-from scipy import stats
+from numpy import exp,linspace
 from types import SimpleNamespace
 
+#%% Imports from the shared package in the Sample Code folder
+import os,sys
+vfi_root = os.path.abspath(os.path.join(os.path.dirname(__file__),'..','..','..')) # Sample Code folder.
+if vfi_root not in sys.path:
+    sys.path.append(vfi_root)
+from vfi.discretization import discretize,truncate
+from vfi.utility import crra
+
 #%% Deterministic Growth Model.
 class planner():
     '''
@@ -80,6 +87,14 @@ class planner():
         # Simulation parameters.
         par.seed_sim = 2025 # Seed for simulation.
         par.T = 100 # Number of time periods.
+        par.N_sim = 1 # Number of simulated economies. Above 1, grow_economy simulates an (N_sim,T) panel.
+        par.sim_workers = 0 # Processes for the panel (0 simulates it in this process). Above 0, the policy functions are shared with a pool of workers. Either way each block of economies gets its own seed stream, so the panel is the same.
+        par.sim_block = 1000 # Economies per block (and per seed stream).
+
+        # Stationary distribution.
+        par.dist_method = 'power' # Stationary distribution: 'power' (iterate the distribution forward) or 'solve' (sparse linear solve).
+        par.dist_tol = 1e-12 # Tolerance for power iteration.
+        par.dist_maxiter = 100000 # Maximum number of power iterations.
 
         # Set up capital grid.
         par.kss = (par.alpha/((1.0/par.beta)-1+par.delta))**(1.0/(1.0-par.alpha)) # Steady state capital.
@@ -91,6 +106,25 @@ class planner():
         # Discretize productivity.
         par.Alen = 7 # Grid size for A.
         par.m = 3.0 # Scaling parameter for Tauchen.
+        par.discretization = 'tauchen' # Discretization of the AR(1): 'tauchen', 'rouwenhorst', or 'tauchen-hussey'.
+        par.pmat_format = 'dense' # Storage for the transition matrix: 'dense', 'csr' (sparse rows), or 'banded' (sparse diagonals).
+        par.pmat_tol = 1e-10 # Transition probabilities below this are dropped, and rows renormalized, when pmat_format is not 'dense'.
+
+        # Solver.
+        par.howard = 0 # Howard improvement: policy-evaluation steps between maximizations (0 turns it off).
+        par.howard_method = 'iterate' # Policy evaluation: 'iterate' (par.howard fixed-policy updates) or 'sparse' (solve the policy's linear system).
+        par.stop = 'l2' # Stopping rule: 'l2' (norm of the change in v), 'sup' (sup norm of the change scaled by beta/(1-beta)), or 'mqp' (MacQueen-Porteus bounds; the reported v is the midpoint of the bounds).
+        par.accel = 'none' # Fixed-point accelerator: 'none' or 'anderson' (Anderson mixing, with a plain update whenever the residual grows).
+        par.accel_depth = 5 # Number of earlier iterates mixed by Anderson acceleration.
+        par.search = 'grid' # Search over k': 'grid' (whole grid), 'monotone' (start at the previous state's optimum and stop once the objective falls), or 'binary' (binary concavity search).
+        par.choice = 'grid' # Choice of k': 'grid' (on kgrid) or 'continuous' (anywhere in [kmin,kmax], with the expected value function interpolated).
+        par.interp = 'linear' # Interpolation of the expected value function when choice is 'continuous': 'linear' or 'cubic' (cubic spline).
+        par.golden_tol = 1e-8 # Tolerance for the golden-section search over k' when choice is 'continuous'.
+        par.levels = 1 # Multigrid levels: above 1, the model is first solved on grids with klen/2, klen/4, ... points and each solution is the next initial guess.
+        par.warm_start = False # Warm start: begin from the cached solution for the nearest parameters already solved in this session.
+        par.warm_tol = 0.10 # Largest relative parameter difference for a cached solution to be used as a warm start.
+        par.warm_size = 20 # Number of solutions kept in the warm-start cache (least recently used are dropped).
+        par.backend = 'numpy' # Backend: 'numpy' or 'numba' (Numba compiles the grid search over k' when search and choice are 'grid', and the panel time loop, in parallel over states or economies). Without Numba installed, 'numba' runs the NumPy code.
         
         # Update parameter values to kwarg values if you don't want the default values.
         for key,val in kwargs.items():
@@ -106,19 +140,40 @@ class planner():
         assert abs(par.rho) < 1
         assert par.Alen > 3
         assert par.m > 0.0
+        assert par.discretization in ('tauchen','rouwenhorst','tauchen-hussey')
+        assert par.pmat_format in ('dense','csr','banded')
+        assert par.pmat_tol >= 0.0
         assert par.klen > 5
         assert par.kmax > par.kmin
+        assert par.N_sim >= 1
+        assert par.sim_workers >= 0
+        assert par.sim_block >= 1
+        assert par.dist_method in ('power','solve')
+        assert par.howard >= 0
+        assert par.howard_method in ('iterate','sparse')
+        assert par.stop in ('l2','sup','mqp')
+        assert par.accel in ('none','anderson')
+        assert par.accel_depth >= 1
+        assert par.search in ('grid','monotone','binary')
+        assert par.choice in ('grid','continuous')
+        assert par.interp in ('linear','cubic')
+        assert par.golden_tol > 0
+        assert par.levels >= 1 and (par.klen-1)//2**(par.levels-1) >= 5
+        assert par.warm_tol >= 0
+        assert par.warm_size >= 1
+        assert (par.choice == 'grid') or (par.howard_method == 'iterate')
+        assert par.backend in ('numpy','numba')
         
         # Set up capital grid.
         par.kgrid = linspace(par.kmin,par.kmax,par.klen) # Equally spaced, linear grid for k (and k').
 
         # Discretize productivity.
-        Agrid,pmat = tauchen(par.mu,par.rho,par.sigma_eps,par.Alen,par.m) # Tauchen's Method to discretize the AR(1) process for log productivity.
+        Agrid,pmat = discretize(par.mu,par.rho,par.sigma_eps,par.Alen,par.m,par.discretization) # Discretize the AR(1) process for log productivity.
         par.Agrid = exp(Agrid) # The AR(1) is in logs so exponentiate it to get A.
-        par.pmat = pmat # Transition matrix.
+        par.pmat = truncate(pmat,par.pmat_tol,par.pmat_format) # Transition matrix.
     
         # Utility function.
-        par.util = util
+        par.util = crra
         
         print('beta: ',par.beta)
         print('sigma: ',par.sigma)
@@ -129,64 +184,10 @@ class planner():
         print('sigma_eps: ',par.sigma_eps)
         print('rho: ',par.rho)
         print('mu: ',par.mu)
-
-#%% CRRA Utility Function.
-def util(c,sigma):
-
-    # CRRA utility
-    if sigma == 1:
-        u = log(c) # Log utility.
-    else:
-        u = (c**(1-sigma))/(1-sigma) # CRRA utility.
-    
-    return u
-
-#%% Tauchen's Method.
-def tauchen(mu,rho,sigma,N,m):
-    """
-    
-    This function discretizes an AR(1) process.
-    
-            y(t) = mu + rho*y(t-1) + eps(t), eps(t) ~ NID(0,sigma^2)
-    
-    Input:
-        mu    : Intercept of AR(1).
-        rho   : Persistence of AR(1).
-        sigma : Standard deviation of error term.
-        N     : Number of states.
-        m     : Parameter such that m time the unconditional std. dev. of the AR(1) is equal to the largest grid point.
-        
-    Output:
-        y    : Grid for the AR(1) process.
-        pmat : Transition probability matrix.
-        
-    """
-    
-    #%% Construct equally spaced grid.
-    
-    ar_mean = mu/(1.0-rho) # The mean of a stationary AR(1) process is mu/(1-rho).
-    ar_sd = sigma/((1.0-rho**2.0)**(1/2)) # The std. dev of a stationary AR(1) process is sigma/sqrt(1-rho^2)
-    
-    y1 = ar_mean-(m*ar_sd) # Smallest grid point is the mean of the AR(1) process minus m*std.dev of AR(1) process.
-    yn = ar_mean+(m*ar_sd) # Largest grid point is the mean of the AR(1) process plus m*std.dev of AR(1) process.
-     
-    y,d = linspace(y1,yn,N,endpoint=True,retstep=True) # Equally spaced grid. Include endpoint (endpoint=True) and record stepsize, d (retstep=True).
-    
-    #%% Compute transition probability matrix from state j (row) to k (column).
-    
-    ymatk = tile(expand_dims(y,axis=0),(N,1)) # Container for state next period.
-    ymatj = mu+rho*ymatk.T # States this period.
-    
-    # In the following, loc and scale are the mean and std used to standardize the variable. # For example, norm.cdf(x,loc=y,scale=s) is the standard normal CDF evaluated at (x-y)/s.
-    pmat = stats.norm.cdf(ymatk,loc=ymatj-(d/2.0),scale=sigma)-stats.norm.cdf(ymatk,loc=ymatj+(d/2.0),scale=sigma) # Transition probabilities to state 2, ..., N-1.
-    pmat[:,0] = stats.norm.cdf(y[0],loc=mu+rho*y-(d/2.0),scale=sigma) # Transition probabilities to state 1.
-    pmat[:,N-1] = 1.0-stats.norm.cdf(y[N-1],loc=mu+rho*y+(d/2.0),scale=sigma) # Transition probabilities to state N.
-    
-    #%% Output.
-    
-    y = expand_dims(y,axis=0) # Convert 0-dimensional array to a row vector.
-    
-    if count_nonzero(pmat.sum(axis=1)<0.999999) > 0:
-        raise Exception("Some columns of transition matrix don't sum to 1.") 
-
-    return y,pmat
\ No newline at end of file
+        print('discretization: ',par.discretization)
+        print('howard: ',par.howard)
+        print('stop: ',par.stop)
+        print('accel: ',par.accel)
+        print('search: ',par.search)
+        print('choice: ',par.choice)
+        print('backend: ',par.backend)
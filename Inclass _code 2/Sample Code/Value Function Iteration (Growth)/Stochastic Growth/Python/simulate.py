@@ -7,11 +7,22 @@ This code simulates the model.
 """
 
 #%% Imports from Python
-from numpy import cumsum,linspace,squeeze,where,zeros
-from numpy.random import choice,rand,seed
-from numpy.linalg import matrix_power
+from numpy import interp,linspace,where,zeros
+from numpy.random import choice,seed
 from types import SimpleNamespace
 
+#%% Imports from the shared package in the Sample Code folder
+import os,sys
+vfi_root = os.path.abspath(os.path.join(os.path.dirname(__file__),'..','..','..')) # Sample Code folder.
+if vfi_root not in sys.path:
+    sys.path.append(vfi_root)
+from vfi.kernels import select_backend
+from vfi.simulate import markov_chain,panel_path,simulate_pool,simulate_serial
+
+#%% Variables in the panel, and the policy functions the pool shares.
+panel_vars = ('Asim','ysim','ksim','csim','isim')
+pool_policies = ('y','k','c','i','k_ind')
+
 #%% Simulate the model.
 def grow_economy(myClass):
     '''
@@ -36,7 +47,14 @@ def grow_economy(myClass):
     par = myClass.par # Parameters.
     sol = myClass.sol # Policy functions.
 
+    # Simulate a panel of economies instead of a single path.
+    if par.N_sim > 1:
+        grow_panel(par,sol,sim)
+        return
+
     sigma = par.sigma # CRRA.
+    alpha = par.alpha # Capital's share of income.
+    delta = par.delta # Depreciation rate.
     util = par.util # Utility function.
     seed_sim = par.seed_sim # Seed for simulation.
 
@@ -44,12 +62,13 @@ def grow_economy(myClass):
     Alen = par.Alen # Productivity grid size.
     kgrid = par.kgrid # Capital today (state).
     Agrid = par.Agrid[0] # Productivity today (state).
-    pmat = par.pmat # Productivity today (state).
+    pmat = par.pmat # Transition matrix for productivity.
     
     yout = sol.y # Production function.
     kpol = sol.k # Policy function for capital.
     cpol = sol.c # Policy function for consumption.
     ipol = sol.i # Policy function for investment.
+    kind = getattr(sol,'k_ind',None) # Policy function for capital as indices on kgrid, if the solver stored it.
 
     T = par.T # Time periods.
     Asim = zeros(par.T*2) # Container for simulated productivity.
@@ -63,12 +82,10 @@ def grow_economy(myClass):
     
     seed(seed_sim)
 
-    pmat0 = matrix_power(pmat,1000)
-    pmat0 = pmat0[0,:] # % Stationary distribution.
-    cmat = cumsum(par.pmat,axis=1) # CDF matrix.
+    pmat0,draw = markov_chain(pmat) # Stationary distribution, and draws of next-period productivity given today's state.
 
-    A0_ind = choice(linspace(0,Alen,Alen,endpoint=False,dtype=int),1,p=pmat0) # Index for initial productivity.
-    k0_ind = choice(linspace(0,klen,klen,endpoint=False,dtype=int),1) # Index for initial capital stock.
+    A0_ind = choice(linspace(0,Alen,Alen,endpoint=False,dtype=int),1,p=pmat0)[0] # Index for initial productivity.
+    k0_ind = choice(linspace(0,klen,klen,endpoint=False,dtype=int),1)[0] # Index for initial capital stock.
 
     Asim[0] = Agrid[A0_ind] # Productivity in period 1.
     ysim[0] = yout[k0_ind,A0_ind] # Output in period 1 given k0 and A0.
@@ -77,21 +94,36 @@ def grow_economy(myClass):
     isim[0] = ipol[k0_ind,A0_ind] # Investment in period 1 given k0 and A0.
     usim[0] = util(csim[0],sigma) # Utility in period 1 given k0 and A0.
 
-    A1_ind = where(rand(1)<=squeeze(cmat[A0_ind,:])) # Draw productivity for next period.
-    At_ind = A1_ind[0][0]
+    kt_ind = k0_ind # Capital state today.
+    Ap_ind = A0_ind # Productivity state today.
+    At_ind = draw(A0_ind) # Draw productivity for next period.
 
     # Simulate endogenous variables.
 
     for j in range(1,T*2): # Time loop.
-        kt_ind = where(ksim[j-1]==kgrid); # Capital choice in the previous period is the state today. Find where the latter is on the grid.
+        if getattr(sol,'choice','grid') == 'continuous':
+            kt = ksim[j-1] # Capital choice in the previous period is the state today. It is off the grid, so policies are interpolated.
+            Asim[j] = Agrid[At_ind] # Productivity in period t.
+            ysim[j] = Agrid[At_ind]*(kt**alpha) # Output in period t.
+            ksim[j] = interp(kt,kgrid,kpol[:,At_ind]) # Capital stock for period t+1.
+            isim[j] = ksim[j]-((1-delta)*kt) # Investment in period t.
+            csim[j] = ysim[j]-isim[j] # Consumption in period t.
+            usim[j] = util(csim[j],sigma) # Utility in period t.
+            Ap_ind = At_ind # Productivity state today.
+            At_ind = draw(At_ind) # Draw next state.
+            continue
+        if kind is not None:
+            kt_ind = kind[kt_ind,Ap_ind] # Capital choice in the previous period is the state today. Follow its index on the grid.
+        else:
+            kt_ind = where(ksim[j-1]==kgrid)[0][0] # Without indices, find where the capital choice is on the grid.
         Asim[j] = Agrid[At_ind] # Productivity in period t.
         ysim[j] = yout[kt_ind,At_ind] # Output in period t.
         csim[j] = cpol[kt_ind,At_ind] # Consumption in period t.
         ksim[j] = kpol[kt_ind,At_ind] # Capital stock for period t+1.
         isim[j] = ipol[kt_ind,At_ind] # Investment in period t.
         usim[j] = util(csim[j],sigma) # Utility in period t.
-        A1_ind = where(rand(1)<=squeeze(cmat[At_ind,:])) # Draw next state.
-        At_ind = A1_ind[0][0] # State next period.
+        Ap_ind = At_ind # Productivity state today.
+        At_ind = draw(At_ind) # Draw next state.
 
     # Burn the first half.
     sim.Asim = Asim[T:2*T+1] # Simulated productivity.
@@ -99,4 +131,78 @@ def grow_economy(myClass):
     sim.ksim = ksim[T:2*T+1] # Simulated capital choice.
     sim.csim = csim[T:2*T+1] # Simulated consumption.
     sim.isim = isim[T:2*T+1] # Simulated investment.
-    sim.usim = usim[T:2*T+1] # Simulated utility.
\ No newline at end of file
+    sim.usim = usim[T:2*T+1] # Simulated utility.
+
+#%% Simulate a panel of economies.
+def grow_panel(par,sol,sim):
+    '''
+    
+    This function simulates par.N_sim economies at once. Each period advances every economy with index lookups on the policy functions.
+    The first T periods are burned, and each variable is stored as an (N_sim,T) array.
+    The economies are simulated in blocks, each with its own seed stream: by a pool of processes with par.sim_workers above 0, and one after the other otherwise (see simulate_pool and simulate_serial in the vfi package). Both give the same panel.
+    
+    Input:
+        par : Parameters.
+        sol : Policy functions.
+        sim : Namespace for simulation.
+        
+    '''
+
+    if par.sim_workers > 0:
+        out = simulate_pool(par,sol,panel_block,pool_policies,panel_vars)
+    else:
+        out = simulate_serial(par,sol,panel_block,panel_vars)
+
+    sim.Asim = out['Asim'] # Simulated productivity.
+    sim.ysim = out['ysim'] # Simulated output.
+    sim.ksim = out['ksim'] # Simulated capital choice.
+    sim.csim = out['csim'] # Simulated consumption.
+    sim.isim = out['isim'] # Simulated investment.
+    sim.usim = par.util(sim.csim,par.sigma) # Simulated utility.
+
+#%% Simulate a block of economies.
+def panel_block(par,sol,rng,out):
+    '''
+    
+    This function simulates one block of economies, one row of the arrays in out per economy, with random numbers from rng.
+    
+    Input:
+        par : Parameters.
+        sol : Policy functions.
+        rng : Random number generator for the block.
+        out : Containers for the simulated variables, each (economies,T).
+        
+    '''
+
+    alpha = par.alpha # Capital's share of income.
+    delta = par.delta # Depreciation rate.
+
+    Agrid = par.Agrid[0] # Productivity today (state).
+
+    yout = sol.y # Production function.
+    cpol = sol.c # Policy function for consumption.
+    ipol = sol.i # Policy function for investment.
+    kpol = sol.k # Policy function for capital.
+    continuous = getattr(sol,'choice','grid') == 'continuous' # Whether the policies are off the grid.
+
+    Asim = out['Asim'] # Container for simulated productivity.
+    ysim = out['ysim'] # Container for simulated output.
+    ksim = out['ksim'] # Container for simulated capital stock.
+    csim = out['csim'] # Container for simulated consumption.
+    isim = out['isim'] # Container for simulated investment.
+
+    # Variables in period s, given capital kt and productivity At today, and the capital choice kp off the grid.
+    def record(s,kt,At,kp):
+        Asim[:,s] = Agrid[At] # Productivity in period t.
+        if continuous:
+            ysim[:,s] = Agrid[At]*(kt**alpha) # Output in period t.
+            ksim[:,s] = kp # Capital stock for period t+1.
+            isim[:,s] = kp-((1-delta)*kt) # Investment in period t.
+            csim[:,s] = ysim[:,s]-isim[:,s] # Consumption in period t.
+        else:
+            ysim[:,s] = yout[kt,At] # Output in period t.
+            csim[:,s] = cpol[kt,At] # Consumption in period t.
+            ksim[:,s] = kpol[kt,At] # Capital stock for period t+1.
+            isim[:,s] = ipol[kt,At] # Investment in period t.
+
+    panel_path(par.kgrid,par.pmat,kpol,getattr(sol,'k_ind',None),continuous,rng,Asim.shape[0],par.T,record,select_backend(par))
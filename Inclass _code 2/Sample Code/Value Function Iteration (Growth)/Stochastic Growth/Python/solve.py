@@ -2,18 +2,31 @@
 
 solve.py
 --------
-This code solves the model.
+This code solves the model. The Bellman operators, the iteration engine, and the convergence controls are in the shared vfi package; this file sets up the stochastic growth model for them.
 
 """
 
 #%% Imports from Python
-from numpy import argmax,expand_dims,inf,squeeze,tile,zeros,seterr
+from numpy import array,clip,expand_dims,full,inf,interp,maximum,minimum,searchsorted,tile,zeros,seterr
 from numpy.linalg import norm
 from types import SimpleNamespace
 import time
 seterr(divide='ignore')
 seterr(invalid='ignore')
 
+#%% Imports from the shared package in the Sample Code folder
+import os,sys
+vfi_root = os.path.abspath(os.path.join(os.path.dirname(__file__),'..','..','..')) # Sample Code folder.
+if vfi_root not in sys.path:
+    sys.path.append(vfi_root)
+from vfi.bellman import compiled_operator,follow_policy,golden_operator,grid_operator,iterate,policy_transition,policy_value,record,search_operator
+from vfi.convergence import initial_guess,warm_store
+from vfi.discretization import expectation
+from vfi.kernels import bellman_max,select_backend
+
+#%% Parameters that define a nearby model, for warm starts.
+warm_params = ('beta','sigma','alpha','delta','rho','sigma_eps','mu')
+
 #%% Solve the model using VFI.
 def plan_allocations(myClass):
     '''
@@ -48,7 +61,7 @@ def plan_allocations(myClass):
 
     Alen = par.Alen # Grid size for A.
     Agrid = par.Agrid[0] # Grid for A.
-    pmat = par.pmat # Grid for A.
+    pmat = par.pmat # Transition matrix for A.
 
     kmat = tile(expand_dims(kgrid,axis=1),(1,Alen)) # k for each value of A.
     Amat = tile(expand_dims(Agrid,axis=0),(klen,1)) # A for each value of k.
@@ -62,7 +75,151 @@ def plan_allocations(myClass):
     c0[c0<0.0] = 0.0
     v0 = util(c0,sigma)/(1-beta) # Guess of value function for each value of k.
     v0[c0<=0.0] = -inf # Set the value function to negative infinity number when c <= 0.
-                    
+
+    t0 = time.time()
+
+    guess = v0.copy() # Steady-state guess, kept for the warm-start cache.
+    # Warm start from a nearby solution already solved, or multigrid from coarser grids.
+    warm_dist,level_klen,level_iter = initial_guess(par,v0,plan_allocations,warm_params)
+
+    search = par.search # How the grid for k' is searched.
+    choice = par.choice # Whether k' is restricted to the grid.
+    backend = select_backend(par) # Compiled loops, or NumPy.
+    if backend != par.backend:
+        print('Numba is not installed, so the NumPy backend is used.\n')
+
+    # Period return for every (k,k',A). It does not depend on the value function, so it is built once.
+    yout = Amat*array([kp**alpha for kp in kgrid])[:,None] # Output given k and A. k**alpha is taken point by point so it rounds exactly as in the state-by-state loop.
+    if (choice == 'grid') and (search == 'grid') and (backend == 'numpy'):
+        i = expand_dims(kgrid,axis=(0,2))-expand_dims((1-delta)*kgrid,axis=(1,2)) # Investment, i=k'-(1-delta)k, for every k (rows) and k' (columns), shape (klen,klen,1).
+        c = expand_dims(yout,axis=1)-i # Consumption, c = y-i, shape (klen,klen,Alen).
+        c[c<0.0] = 0.0
+        ret = util(c,sigma) # Period utility for every (k,k',A).
+        ret[c<=0.0] = -inf # Set the return to negative infinity when c <= 0.
+        del i,c
+
+    # Bounds for a continuous choice of k': the grid, and positive consumption.
+    klo = full((klen,Alen),kgrid[0]) # Lowest k'.
+    khi = maximum(minimum(yout+(1-delta)*kmat,kgrid[-1]),kgrid[0]) # Highest k'.
+
+    # Period return for a continuous choice of k', for every (k,A) at once.
+    def ret_k(kp):
+        c = yout-(kp-((1-delta)*kmat)) # Consumption, c = y-i.
+        return util(c,sigma),c<=0.0
+
+    # Period return for a choice of k' on the grid, given k and A.
+    def ret_q(p):
+        def r(q,j):
+            c = yout[p,j]-(kgrid[q]-((1-delta)*kgrid[p])) # Consumption, c = y-i.
+            if c <= 0.0:
+                return -inf
+            return util(c,sigma)
+        return r
+
+    # Bellman operator.
+    if choice == 'continuous':
+        T = golden_operator(ret_k,kgrid,klo,khi,beta,par.interp,par.golden_tol,pmat) # Golden-section search over k', with the expected value function interpolated.
+    elif search != 'grid':
+        T = search_operator(ret_q,klen,beta,search,pmat) # Concavity search over the grid for k'.
+    elif backend == 'numba':
+        T = compiled_operator(lambda ev: bellman_max(yout,(1-delta)*kgrid,kgrid,ev,beta,sigma),klen,pmat) # Compiled loop over (k,A), with each return built as it is needed.
+    else:
+        T = grid_operator(ret,beta,pmat) # Maximize for all states at once.
+
+    # Howard improvement: follow the current policy before maximizing again.
+    def evaluate(v0,pol):
+        k1 = pol if choice == 'continuous' else kgrid[pol] # Capital policy.
+        c1 = yout-(k1-((1-delta)*kmat)) # Consumption under the current policy.
+        r1 = util(c1,sigma) # Utility under the current policy.
+        r1[c1<=0.0] = -inf
+        return follow_policy(v0,r1,pol,beta,par,pmat,kgrid)
+
+    # Iterate on the Bellman Equation until convergence.
+    res = iterate(v0,T,beta,par,evaluate)
+    k1 = res.pol if choice == 'continuous' else kgrid[res.pol] # Optimal k'.
+
+    t1 = time.time()
+    print('Elapsed time is ',t1-t0,' seconds.')
+    print('Converged in ',res.iter,' iterations.')
+    if par.levels > 1:
+        print('Iterations per level: ',level_iter+[res.iter],'.')
+    if par.howard > 0:
+        print('Policy-evaluation steps: ',res.eval_steps,'.')
+
+    # Solver diagnostics.
+    record(sol,res,par)
+    sol.warm_dist = warm_dist # Relative distance to the parameters of the warm start (None for a cold start).
+    sol.time = t1-t0 # Elapsed time in seconds.
+    sol.backend = backend # Backend that ran.
+    sol.level_klen = level_klen+[klen] # Grid size at each level, coarse to fine.
+    sol.level_iter = level_iter+[res.iter] # Iterations at each level, coarse to fine.
+
+    # Macro variables, value, and policy functions.
+    sol.y = Amat*(kmat**alpha) # Output.
+    sol.choice = choice # Whether the policies are on the grid.
+    sol.k = k1 # Capital policy function.
+    if choice == 'grid':
+        sol.k_ind = res.pol # Capital policy function as indices on kgrid.
+    sol.i = k1-((1-delta)*kmat) # Investment policy function.
+    sol.c = sol.y-sol.i # Consumption policy function.
+    sol.c[sol.c<0.0] = 0.0
+    sol.v = res.v # Value function.
+    sol.v[sol.c<=0.0] = -inf
+
+    # Cache the solution as a warm start for nearby parameters.
+    if par.warm_start:
+        warm_store(par,sol.v,warm_params,guess)
+
+#%% Solve the model using the endogenous grid method.
+def plan_allocations_egm(myClass):
+    '''
+    
+    This function solves the stochastic growth model by the endogenous grid method (EGM).
+    Given consumption tomorrow on kgrid, the Euler equation gives consumption today for each k' on kgrid without a maximization, and c+k' is the cash on hand at which that k' is chosen.
+    Consumption on kgrid is then interpolated from these endogenous points. The policies are off the grid, so sol.choice is 'continuous'.
+    
+    Input:
+        myClass : Model class with parameters, grids, and utility function.
+        
+    '''
+
+    print('\n--------------------------------------------------------------------------------------------------')
+    print('Solving the Model by the Endogenous Grid Method')
+    print('--------------------------------------------------------------------------------------------------\n')
+    
+    # Namespace for optimal policy funtions.
+    setattr(myClass,'sol',SimpleNamespace())
+    sol = myClass.sol
+
+    # Model parameters, grids and functions.
+    
+    par = myClass.par # Parameters.
+
+    beta = par.beta # Discount factor.
+    sigma = par.sigma # CRRA.
+
+    alpha = par.alpha # Capital's share of income.
+    delta = par.delta # Depreciation rate
+
+    klen = par.klen # Grid size for k.
+    kgrid = par.kgrid # Grid for k (state) and k' (choice).
+
+    Alen = par.Alen # Grid size for A.
+    Agrid = par.Agrid[0] # Grid for A.
+    pmat = par.pmat # Transition matrix for A.
+
+    kmat = tile(expand_dims(kgrid,axis=1),(1,Alen)) # k for each value of A.
+    Amat = tile(expand_dims(Agrid,axis=0),(klen,1)) # A for each value of k.
+
+    util = par.util # Utility function.
+
+    yout = Amat*(kmat**alpha) # Output given k and A.
+    mout = yout+(1-delta)*kmat # Cash on hand, c+k', given k and A.
+    rout = 1+alpha*Amat*(kmat**(alpha-1))-delta # Gross return on k' (rows) when next-period A is each column.
+
+    # Endogenous Grid Method.
+    c0 = mout-kmat # Guess of consumption: k'=k.
+
     crit = 1e-6;
     maxiter = 10000;
     diff = 1;
@@ -70,29 +227,21 @@ def plan_allocations(myClass):
 
     t0 = time.time()
 
-    while (diff > crit) and (iter < maxiter): # Iterate on the Bellman Equation until convergence.
-    
-        v1 = zeros((klen,Alen)) # Container for V.
-        k1 = zeros((klen,Alen)) # Container for k'.
-
-        for p in range(0,klen): # Loop over the k-states.
-            for j in range(0,Alen): # Loop over the A-states.
-
-                # Macro variables.
-                y = Agrid[j]*(kgrid[p]**alpha) # Output given k, kgrid(p).
-                i = kgrid-((1-delta)*kgrid[p]) # Possible values for investment, i=k'-(1-delta)k, when choosing k' from kgrid and given k.
-                c = y-i # Possible values for consumption, c = y-i, given y and i.
-                c[c<0.0] = 0.0
-
-                # Solve the maximization problem.
-                ev = squeeze(v0@pmat[j,:].T); #  The next-period value function is the expected value function over each possible next-period A, conditional on the current state j.
-                vall = util(c,sigma) + beta*ev # Compute the value function for each choice of k', given k.
-                vall[c<=0.0] = -inf # Set the value function to negative infinity number when c <= 0.
-                v1[p,j] = max(vall) # Maximize: vmax is the maximized value function; ind is where it is in the grid.
-                k1[p,j] = kgrid[argmax(vall)] # Optimal k'.
-        
-        diff = norm(v1-v0) # Check convergence.
-        v0 = v1; # Update guess.
+    while (diff > crit) and (iter < maxiter): # Iterate on the Euler Equation until convergence.
+
+        emu = expectation((c0**(-sigma))*rout,pmat) # Expected marginal utility times the return on each k' (rows), conditional on each current A-state (columns).
+        c_endo = (beta*emu)**(-1.0/sigma) # Invert the Euler equation: consumption today when choosing k'.
+        m_endo = c_endo+kmat # Cash on hand at which k' is chosen.
+
+        # Consumption on the fixed grid for k, one A-state at a time.
+        c1 = zeros((klen,Alen)) # Container for c.
+        for j in range(0,Alen): # Loop over the A-states.
+            c1[:,j] = interp(mout[:,j],m_endo[:,j],c_endo[:,j])
+        k1 = clip(mout-c1,kgrid[0],kgrid[-1]) # Optimal k', kept within the grid.
+        c1 = mout-k1 # Consumption, with k' at a bound when the bound binds.
+
+        diff = norm(c1-c0) # Check convergence.
+        c0 = c1; # Update guess.
 
         iter = iter + 1; # Update counter.
         
@@ -100,15 +249,27 @@ def plan_allocations(myClass):
         if iter%25 == 0:
             print('Iteration: ',iter,'.\n')
 
+    # Value of the policies, with k' split between the grid points around it.
+    r1 = util(c1,sigma) # Utility under the policy.
+    r1[c1<=0.0] = -inf
+    klo = clip(searchsorted(kgrid,k1)-1,0,klen-2) # Grid point below k'.
+    w = (k1-kgrid[klo])/(kgrid[klo+1]-kgrid[klo]) # Weight on the grid point above k'.
+    Q = policy_transition(klo,pmat,w) # Transition from (k,A) to (k',A').
+    v1 = policy_value(r1.ravel(),Q,beta).reshape((klen,Alen)) # Value of following the policies forever.
+
     t1 = time.time()
     print('Elapsed time is ',t1-t0,' seconds.')
     print('Converged in ',iter,' iterations.')
 
+    # Solver diagnostics.
+    sol.iter = iter # Number of Euler-equation iterations.
+    sol.eval_steps = 1 # The value function is computed once, at the end.
+    sol.time = t1-t0 # Elapsed time in seconds.
+
     # Macro variables, value, and policy functions.
-    sol.y = Amat*(kmat**alpha) # Output.
+    sol.choice = 'continuous' # The policies are off the grid, so they are simulated by interpolation.
+    sol.y = yout # Output.
     sol.k = k1 # Capital policy function.
     sol.i = k1-((1-delta)*kmat) # Investment policy function.
-    sol.c = sol.y-sol.i # Consumption policy function.
-    sol.c[sol.c<0.0] = 0.0
+    sol.c = c1 # Consumption policy function.
     sol.v = v1 # Value function.
-    sol.v[sol.c<=0.0] = -inf
\ No newline at end of file
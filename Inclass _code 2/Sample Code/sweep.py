@@ -0,0 +1,191 @@
+"""
+
+sweep.py
+--------
+This code solves (and optionally simulates) one of the models for every combination of parameter values, in parallel.
+
+Usage:
+    python sweep.py sgm --grid beta=0.94,0.95,0.96 sigma=1.5,2.0 --fixed klen=100 --simulate --workers 4 --out sweep.csv
+
+"""
+
+#%% Imports from Python
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+import argparse
+import ast
+import contextlib
+import csv
+import importlib
+import io
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+#%% Models.
+here = os.path.dirname(os.path.abspath(__file__))
+vfi = os.path.join(here,'Value Function Iteration (Growth)')
+
+# Folder, model class, solver, and simulator for each model.
+models = {
+    'cake' : (os.path.join(here,'Value Function Iteration (Cake Eating)','Python'),'person','cake_decisions','eat_cake'),
+    'dgm'  : (os.path.join(vfi,'Deterministic Growth','Python'),'planner','plan_allocations','grow_economy'),
+    'sgm'  : (os.path.join(vfi,'Stochastic Growth','Python'),'planner','plan_allocations','grow_economy'),
+    'sgml' : (os.path.join(vfi,'Stochastic Growth with Labor','Python'),'planner','plan_allocations','grow_economy'),
+}
+
+# Environment variables that set the number of BLAS/OpenMP threads.
+blas_vars = ('OMP_NUM_THREADS','OPENBLAS_NUM_THREADS','MKL_NUM_THREADS','VECLIB_MAXIMUM_THREADS','NUMEXPR_NUM_THREADS')
+
+#%% Run a parameter sweep.
+def sweep(model,grid,fixed=None,simulate=False,solver=None,workers=None,blas_threads=1):
+    '''
+
+    This function solves the model for every combination of the values in grid, one process per combination.
+    Each worker starts with blas_threads BLAS threads, so workers times BLAS threads does not exceed the cores.
+
+    Input:
+        model        : 'cake', 'dgm', 'sgm', or 'sgml'.
+        grid         : Dictionary of parameter name to a list of values.
+        fixed        : Dictionary of parameter overrides shared by every combination.
+        simulate     : Whether to simulate after solving.
+        solver       : Name of the solver in solve.py, if not the default (e.g. 'plan_allocations_egm').
+        workers      : Number of processes (default: number of cores).
+        blas_threads : BLAS threads per process.
+
+    Output:
+        table : One row (dictionary) per combination, with its parameter values, solver diagnostics, and simulated means and standard deviations.
+
+    '''
+
+    assert model in models
+    fixed = {} if fixed is None else fixed
+
+    names = list(grid.keys())
+    points = [dict(zip(names,vals)) for vals in product(*[grid[n] for n in names])] # Every combination.
+
+    # Workers are started fresh (spawn), so they load BLAS with these settings.
+    saved = {v:os.environ.get(v) for v in blas_vars}
+    for v in blas_vars:
+        os.environ[v] = str(blas_threads)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers,mp_context=multiprocessing.get_context('spawn')) as pool:
+            table = list(pool.map(solve_point,[model]*len(points),[{**fixed,**p} for p in points],[simulate]*len(points),[solver]*len(points)))
+    finally:
+        for v,val in saved.items():
+            if val is None:
+                os.environ.pop(v,None)
+            else:
+                os.environ[v] = val
+
+    return table
+
+#%% Solve the model for one combination.
+def solve_point(model,overrides,simulate,solver):
+    '''
+
+    This function solves (and optionally simulates) the model for one set of parameter overrides and summarizes it in one row.
+    Each combination gets its own temporary project directory, so files written under par.main do not collide.
+
+    '''
+
+    folder,cls,solve_name,sim_name = models[model]
+    if folder not in sys.path:
+        sys.path.insert(0,folder)
+    mod = importlib.import_module('model')
+    solve_fn = getattr(importlib.import_module('solve'),solver if solver else solve_name)
+    sim_fn = getattr(importlib.import_module('simulate'),sim_name)
+
+    row = {'model':model}
+    row.update(overrides)
+
+    with tempfile.TemporaryDirectory() as main:
+        t0 = time.time()
+        with contextlib.redirect_stdout(io.StringIO()):
+            obj = getattr(mod,cls)()
+            obj.setup(main=main,figout=main,**overrides)
+            solve_fn(obj)
+            if simulate:
+                sim_fn(obj)
+        t1 = time.time()
+
+    # Solver diagnostics.
+    sol = obj.sol
+    for key in ('iter','eval_steps','time','err_bound','accel_steps','warm_dist'):
+        if hasattr(sol,key):
+            row[key] = getattr(sol,key)
+    row['wall_time'] = t1-t0
+
+    # Simulated moments.
+    if simulate:
+        for key,val in vars(obj.sim).items():
+            row[key+'_mean'] = float(val.mean())
+            row[key+'_std'] = float(val.std())
+
+    return row
+
+#%% Write the table.
+def write_table(table,path):
+    '''
+
+    This function writes the sweep table to a CSV file, one row per combination.
+
+    '''
+
+    cols = []
+    for row in table:
+        cols = cols+[c for c in row if c not in cols]
+
+    with open(path,'w',newline='') as f:
+        writer = csv.DictWriter(f,fieldnames=cols)
+        writer.writeheader()
+        writer.writerows(table)
+
+#%% Command line.
+def parse_value(s):
+    '''
+
+    This function reads a parameter value from the command line as a Python literal, or as a string otherwise.
+
+    '''
+
+    try:
+        return ast.literal_eval(s)
+    except (ValueError,SyntaxError):
+        return s # Strings such as rouwenhorst or csr.
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description='Solve a model for every combination of parameter values, in parallel.')
+    parser.add_argument('model',choices=sorted(models))
+    parser.add_argument('--grid',nargs='+',default=[],metavar='NAME=V1,V2,...',help='Parameter values to sweep.')
+    parser.add_argument('--fixed',nargs='+',default=[],metavar='NAME=V',help='Parameter overrides shared by every combination.')
+    parser.add_argument('--simulate',action='store_true',help='Simulate after solving.')
+    parser.add_argument('--solver',default=None,help='Solver in solve.py, if not the default.')
+    parser.add_argument('--workers',type=int,default=None,help='Number of processes (default: number of cores).')
+    parser.add_argument('--blas-threads',type=int,default=1,help='BLAS threads per process.')
+    parser.add_argument('--out',default='sweep.csv',help='CSV file for the results.')
+    args = parser.parse_args(argv)
+
+    grid = {}
+    for g in args.grid:
+        name,vals = g.split('=',1)
+        grid[name] = [parse_value(v) for v in vals.split(',')]
+    fixed = {}
+    for g in args.fixed:
+        name,val = g.split('=',1)
+        fixed[name] = parse_value(val)
+
+    t0 = time.time()
+    table = sweep(args.model,grid,fixed,args.simulate,args.solver,args.workers,args.blas_threads)
+    t1 = time.time()
+
+    write_table(table,args.out)
+    print('Solved ',len(table),' combinations in ',t1-t0,' seconds.')
+    print('Results written to ',args.out,'.')
+
+if __name__ == '__main__':
+    main()
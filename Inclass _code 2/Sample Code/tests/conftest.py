@@ -0,0 +1,96 @@
+"""
+
+conftest.py
+-----------
+This code loads the models for the tests. Every model folder has its own model.py, solve.py, and simulate.py, so a model is loaded by putting its folder first on the path and dropping the modules of the model loaded before.
+
+"""
+
+#%% Imports from Python
+from types import SimpleNamespace
+import contextlib
+import importlib
+import io
+import os
+import sys
+
+import pytest
+
+#%% Model folders.
+sample_code = os.path.abspath(os.path.join(os.path.dirname(__file__),'..')) # Sample Code folder.
+if sample_code not in sys.path:
+    sys.path.append(sample_code)
+folders = {'cake':os.path.join(sample_code,'Value Function Iteration (Cake Eating)','Python'),
+           'dgm':os.path.join(sample_code,'Value Function Iteration (Growth)','Deterministic Growth','Python'),
+           'sgm':os.path.join(sample_code,'Value Function Iteration (Growth)','Stochastic Growth','Python'),
+           'sgml':os.path.join(sample_code,'Value Function Iteration (Growth)','Stochastic Growth with Labor','Python'),
+           'slcm':os.path.abspath(os.path.join(sample_code,'..','Stochastic Life Cycle (Borrowing Constraints)','Python')),
+           'slcm_port':os.path.abspath(os.path.join(sample_code,'..','Stochastic Life Cycle (Portfolio Choice)','Python')),
+           'q':os.path.abspath(os.path.join(sample_code,'..','..','Inclass_code 3','Python'))}
+local = ('model','solve','simulate','my_graph') # Modules with the same name in every folder.
+agents = {'cake':'person','slcm':'household','slcm_port':'household','q':'firm'} # Model class of each model (planner if not here).
+solvers = {'cake':'cake_decisions','slcm':'plan_life','slcm_port':'plan_life','q':'firm_problem'} # Solver of each model (plan_allocations if not here).
+
+#%% Load a model.
+def load(name):
+    '''
+
+    This function imports model.py, solve.py, and simulate.py from the folder of a model.
+
+    Input:
+        name : Key of the model in folders.
+
+    Output:
+        mods : Namespace with the modules.
+
+    '''
+
+    for mod in local:
+        sys.modules.pop(mod,None)
+
+    sys.path.insert(0,folders[name])
+    try:
+        mods = SimpleNamespace(**{mod:importlib.import_module(mod) for mod in ('model','solve','simulate')})
+    finally:
+        sys.path.remove(folders[name])
+
+    return mods
+
+#%% Set up a model.
+@pytest.fixture
+def setup_model(tmp_path):
+    '''
+
+    This fixture gives a function that sets up a model with the parameters given, without printing, and returns the model class with its modules in the attribute mods.
+
+    '''
+
+    def setup_model(name,**kwargs):
+        mods = load(name)
+        with contextlib.redirect_stdout(io.StringIO()):
+            agent = getattr(mods.model,agents.get(name,'planner'))()
+            agent.setup(main=str(tmp_path),figout=str(tmp_path),**kwargs)
+        agent.mods = mods
+        return agent
+
+    return setup_model
+
+#%% Solve a model.
+@pytest.fixture
+def solve_model(setup_model):
+    '''
+
+    This fixture gives a function that sets up and solves a model with the parameters given, without printing, and returns the model class.
+    Its solution log is kept in the attribute log.
+
+    '''
+
+    def solve_model(name,solver=None,**kwargs):
+        agent = setup_model(name,**kwargs)
+        log = io.StringIO()
+        with contextlib.redirect_stdout(log):
+            getattr(agent.mods.solve,solver or solvers.get(name,'plan_allocations'))(agent)
+        agent.log = log.getvalue()
+        return agent
+
+    return solve_model
@@ -0,0 +1,31 @@
+"""
+
+test_anderson.py
+----------------
+This code checks that Anderson acceleration reaches the fixed point of plain value function iteration in fewer maximizations, with a residual history without NaN.
+The stochastic growth models have a finite fixed point and converge slowly at the rate beta, which is where Anderson mixing helps.
+
+"""
+
+#%% Imports from Python
+from numpy import array_equal,isfinite,isnan
+
+import pytest
+
+#%% Stochastic growth models.
+@pytest.mark.parametrize('name,kwargs',[('sgm',dict(klen=60)),
+                                        ('sgm',dict(klen=60,sigma=1.00)),
+                                        ('sgml',dict(klen=25)),
+                                        ('sgml',dict(klen=25,gamma=5.00,nu=1.00))])
+def test_anderson_matches_vfi(solve_model,name,kwargs):
+    plain = solve_model(name,**kwargs)
+    anderson = solve_model(name,accel='anderson',**kwargs)
+
+    assert anderson.sol.accel_steps > 0
+    assert anderson.sol.iter < plain.sol.iter/2
+    assert len(anderson.sol.res_hist) == anderson.sol.iter
+    assert not isnan(anderson.sol.res_hist).any()
+    assert array_equal(anderson.sol.k_ind,plain.sol.k_ind)
+    fin = isfinite(plain.sol.v)
+    assert fin.any() and array_equal(isfinite(anderson.sol.v),fin)
+    assert abs(anderson.sol.v[fin]-plain.sol.v[fin]).max() < 1e-5
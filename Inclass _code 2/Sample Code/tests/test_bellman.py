@@ -0,0 +1,76 @@
+"""
+
+test_bellman.py
+---------------
+This code checks that the vectorized Bellman operator of the stochastic growth model gives, bit for bit, the solution of the state-by-state loop it replaced.
+It also checks that the cake-eating and deterministic growth models give the same solution with the return matrix built once, built block by block for several block sizes, or built state by state.
+
+"""
+
+#%% Imports from Python
+from numpy import argmax,array_equal,errstate,expand_dims,inf,ndarray,squeeze,tile,zeros
+from numpy.linalg import norm
+
+import pytest
+
+#%% State-by-state value function iteration.
+def loop_solve(par):
+    '''
+
+    This function solves the stochastic growth model with a loop over (k,A) in every iteration, as plan_allocations did before the Bellman operator was vectorized.
+
+    '''
+
+    kgrid = par.kgrid
+    Agrid = par.Agrid[0]
+    kmat = tile(expand_dims(kgrid,axis=1),(1,par.Alen))
+    Amat = tile(expand_dims(Agrid,axis=0),(par.klen,1))
+
+    with errstate(all='ignore'):
+        c0 = Amat*(kmat**par.alpha)-par.delta*kmat
+        c0[c0<0.0] = 0.0
+        v0 = par.util(c0,par.sigma)/(1-par.beta)
+        v0[c0<=0.0] = -inf
+
+        diff = 1
+        while diff > 1e-6:
+            v1 = zeros((par.klen,par.Alen))
+            k1 = zeros((par.klen,par.Alen))
+            for p in range(0,par.klen):
+                for j in range(0,par.Alen):
+                    y = Agrid[j]*(kgrid[p]**par.alpha)
+                    c = y-(kgrid-((1-par.delta)*kgrid[p]))
+                    c[c<0.0] = 0.0
+                    ev = squeeze(v0@par.pmat[j,:].T)
+                    vall = par.util(c,par.sigma) + par.beta*ev
+                    vall[c<=0.0] = -inf
+                    v1[p,j] = max(vall)
+                    k1[p,j] = kgrid[argmax(vall)]
+            diff = norm(v1-v0)
+            v0 = v1
+
+    return v1,k1
+
+#%% Vectorized against loop.
+def test_vectorized_bellman(solve_model):
+    planner = solve_model('sgm',klen=30)
+    v1,k1 = loop_solve(planner.par)
+
+    v1[planner.sol.c<=0.0] = -inf # As in the solution, where consumption is not positive.
+
+    assert planner.sol.iter > 1
+    assert array_equal(planner.sol.k,k1)
+    assert array_equal(planner.sol.v,v1)
+
+#%% Return matrix built once, block by block, or state by state.
+@pytest.mark.parametrize('bellman,chunk',[('loop',500),('chunked',1),('chunked',7),('chunked',64),('chunked',500)])
+@pytest.mark.parametrize('name',['cake','dgm'])
+def test_cached_chunked(solve_model,name,bellman,chunk):
+    grid = dict(wlen=60) if name == 'cake' else dict(klen=60)
+    cached = solve_model(name,bellman='cached',**grid)
+    other = solve_model(name,bellman=bellman,chunk=chunk,**grid)
+
+    assert other.sol.iter == cached.sol.iter
+    for key,val in vars(cached.sol).items():
+        if isinstance(val,ndarray):
+            assert array_equal(getattr(other.sol,key),val,equal_nan=True)
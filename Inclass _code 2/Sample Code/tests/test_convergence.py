@@ -0,0 +1,72 @@
+"""
+
+test_convergence.py
+-------------------
+This code checks that the multigrid solve gives the single-grid solution on the fine grid, in fewer iterations on it for the stochastic models.
+It also checks that the sup-norm and MacQueen-Porteus stopping rules reach the fixed point of the L2 rule, and that the reported error bounds hold against the exact value of the optimal policy.
+Last, it checks that a warm start from a nearby solution reaches the cold-start solution in fewer iterations.
+
+"""
+
+#%% Imports from Python
+from numpy import array_equal,errstate,isfinite
+
+from vfi.bellman import policy_transition,policy_value
+from vfi.convergence import warm_cache
+
+import pytest
+
+#%% Multigrid against a single grid.
+@pytest.mark.parametrize('name,klen',[('dgm',121),('sgm',121),('sgml',41)])
+def test_multigrid(solve_model,name,klen):
+    single = solve_model(name,klen=klen)
+    multi = solve_model(name,klen=klen,levels=3)
+
+    assert multi.sol.level_klen == [(klen-1)//4+1,(klen-1)//2+1,klen]
+    assert multi.sol.level_iter[-1] == multi.sol.iter
+    assert array_equal(multi.sol.k,single.sol.k)
+    assert (isfinite(multi.sol.v) == isfinite(single.sol.v)).all()
+    assert abs(multi.sol.v-single.sol.v)[isfinite(single.sol.v)].max() < 1e-5
+    if name != 'dgm':
+        assert multi.sol.iter < single.sol.iter # The coarse solution is a better start than the steady-state guess.
+
+#%% Stopping rules.
+@pytest.mark.parametrize('name,klen',[('sgm',60),('sgml',25)])
+def test_stopping_rules(solve_model,name,klen):
+    rules = {stop:solve_model(name,klen=klen,stop=stop) for stop in ('l2','sup','mqp')}
+    par = rules['l2'].par
+    sol = rules['l2'].sol
+
+    # Exact value of the optimal policy, from its linear system.
+    with errstate(all='ignore'):
+        r1 = par.util(sol.c,sol.n,par.sigma,par.nu,par.gamma) if name == 'sgml' else par.util(sol.c,par.sigma)
+    v_true = policy_value(r1.ravel(),policy_transition(sol.k_ind,par.pmat),par.beta).reshape(r1.shape)
+
+    for stop,planner in rules.items():
+        assert planner.sol.stop == stop
+        assert array_equal(planner.sol.k_ind,sol.k_ind)
+        assert abs(planner.sol.v-sol.v).max() < 1e-5
+        assert abs(planner.sol.v-v_true).max() <= planner.sol.err_bound+1e-10 # The value is within the bound of the true value.
+
+    # The MacQueen-Porteus bounds bracket the true value, and are reached in fewer iterations.
+    mqp = rules['mqp'].sol
+    assert (mqp.v-mqp.err_bound <= v_true+1e-10).all() and (v_true <= mqp.v+mqp.err_bound+1e-10).all()
+    assert mqp.iter < sol.iter
+
+#%% Warm start.
+@pytest.mark.parametrize('change',[dict(sigma=2.05),dict(beta=0.965),dict(sigma=2.05,beta=0.955),'grid'])
+@pytest.mark.parametrize('name,klen',[('sgm',60),('sgml',25)])
+def test_warm_start(solve_model,name,klen,change):
+    warm_cache.clear()
+    solve_model(name,klen=klen,warm_start=True,warm_size=1) # Fills the cache.
+    assert len(warm_cache) == 1
+
+    nearby = dict(klen=klen*3//2,sigma=2.05) if change == 'grid' else dict(klen=klen,**change) # Nearby parameters, or a finer grid.
+    cold = solve_model(name,**nearby)
+    warm = solve_model(name,warm_start=True,warm_size=1,**nearby)
+
+    assert cold.sol.warm_dist is None and warm.sol.warm_dist is not None
+    assert warm.sol.iter < cold.sol.iter
+    assert array_equal(warm.sol.k,cold.sol.k)
+    assert abs(warm.sol.v-cold.sol.v).max() < 1e-5
+    assert len(warm_cache) == 1 # The least recently used solution was dropped.
@@ -0,0 +1,82 @@
+"""
+
+test_discretization.py
+----------------------
+This code checks the expectation over a transition matrix stored sparse (CSR) or banded against the dense matrix, on its own and in the solution of the stochastic growth model.
+It also checks the Rouwenhorst and Tauchen-Hussey chains against the mean, variance, and autocorrelation of the AR(1) process, and the cache of discretized processes.
+
+"""
+
+#%% Imports from Python
+from numpy import array_equal,ones
+from numpy.linalg import matrix_power
+from numpy.random import default_rng
+from scipy.sparse import issparse
+
+from vfi.discretization import discretize,expectation,grid_cache,rouwenhorst,tauchen,tauchen_hussey,truncate
+
+import pytest
+
+#%% Sparse and banded expectations.
+@pytest.mark.parametrize('fmt',['csr','banded'])
+def test_sparse_expectation(fmt):
+    pmat = tauchen(0.0,0.95,0.01,25,5)[1] # Wide grid, so most transitions are numerically zero.
+    sparse = truncate(pmat,1e-10,fmt)
+    v0 = default_rng(0).normal(size=(50,25))
+
+    assert issparse(sparse) and sparse.nnz < 0.5*pmat.size
+    assert abs(sparse.sum(axis=1)-1.0).max() < 1e-12
+    assert abs(expectation(v0,sparse)-expectation(v0,pmat)).max() < 1e-8*abs(v0).max()
+    assert array_equal(truncate(pmat,1e-10,'dense'),pmat)
+
+#%% Sparse and banded transition matrices in the solution.
+@pytest.mark.parametrize('fmt',['csr','banded'])
+def test_sparse_solution(solve_model,fmt):
+    grid = dict(klen=40,Alen=15,m=5)
+    dense = solve_model('sgm',**grid)
+    sparse = solve_model('sgm',pmat_format=fmt,**grid)
+
+    assert issparse(sparse.par.pmat)
+    assert array_equal(sparse.sol.k,dense.sol.k)
+    assert abs(sparse.sol.v-dense.sol.v).max() < 1e-6
+
+#%% Moments of a Markov chain.
+def chain_moments(y,pmat):
+    '''
+
+    This function gives the unconditional mean, variance, and first-order autocorrelation of a Markov chain with grid y and transition matrix pmat.
+
+    '''
+
+    pi = (ones(len(y))/len(y))@matrix_power(pmat,10000) # Stationary distribution.
+    mean = pi@y
+    var = pi@((y-mean)**2)
+    autocorr = (pi@((y-mean)*(pmat@(y-mean))))/var
+
+    return mean,var,autocorr
+
+#%% Rouwenhorst and Tauchen-Hussey.
+@pytest.mark.parametrize('method,rho,tol',[('rouwenhorst',0.50,1e-10),('rouwenhorst',0.90,1e-10),('rouwenhorst',0.99,1e-8),('tauchen-hussey',0.50,1e-3)])
+def test_discretization_moments(method,rho,tol):
+    mu,sigma,N = 0.2,0.1,7
+    y,pmat = rouwenhorst(mu,rho,sigma,N) if method == 'rouwenhorst' else tauchen_hussey(mu,rho,sigma,N)
+    mean,var,autocorr = chain_moments(y[0],pmat)
+
+    assert y.shape == (1,N) and pmat.shape == (N,N) and (pmat >= 0.0).all()
+    assert abs(pmat.sum(axis=1)-1.0).max() < 1e-12
+    assert abs(mean-mu/(1.0-rho)) < 1e-8
+    assert abs(var/(sigma**2/(1.0-rho**2))-1.0) < tol
+    assert abs(autocorr-rho) < tol
+
+#%% Cache of discretized processes.
+@pytest.mark.parametrize('method',['tauchen','rouwenhorst','tauchen-hussey'])
+def test_discretization_cache(method):
+    key = (0.0,0.95,0.02,9,3,method)
+    grid_cache.pop(key,None)
+    y0,pmat0 = discretize(*key)
+    assert key in grid_cache
+    y1,pmat1 = discretize(*key) # From the cache.
+
+    assert array_equal(y1,y0) and array_equal(pmat1,pmat0)
+    y1[0,0] = 99.0 # Callers get copies, so the cached grid is unchanged.
+    assert array_equal(discretize(*key)[0],y0)
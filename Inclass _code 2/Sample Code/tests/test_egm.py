@@ -0,0 +1,38 @@
+"""
+
+test_egm.py
+-----------
+This code cross-checks the endogenous grid method against value function iteration with a continuous choice of k' on the stochastic growth model.
+Both give policies off the grid, so they should agree up to the interpolation error of each method, which shrinks as the grid is refined.
+
+"""
+
+#%% Imports from Python
+import pytest
+
+#%% Policies and values of both methods.
+def gaps(solve_model,**kwargs):
+    egm = solve_model('sgm',solver='plan_allocations_egm',**kwargs)
+    vfi = solve_model('sgm',choice='continuous',**kwargs)
+    step = egm.par.kgrid[1]-egm.par.kgrid[0] # Grid step for k.
+    dk = abs(egm.sol.k-vfi.sol.k).max()
+    dc = abs(egm.sol.c-vfi.sol.c).max()
+    dv = abs(egm.sol.v-vfi.sol.v).max()/abs(vfi.sol.v).max()
+    return dk,dc,dv,step
+
+#%% Agreement on one grid.
+@pytest.mark.parametrize('interp,tol',[('linear',0.5),('cubic',0.1)])
+@pytest.mark.parametrize('sigma',[1.00,2.00])
+def test_egm_matches_vfi(solve_model,interp,tol,sigma):
+    dk,dc,dv,step = gaps(solve_model,klen=60,sigma=sigma,interp=interp)
+
+    assert dk < tol*step
+    assert dc < tol*step
+    assert dv < 1e-4 # Relative to the value function.
+
+#%% Agreement as the grid is refined.
+def test_egm_vfi_gap_shrinks(solve_model):
+    dk60 = gaps(solve_model,klen=60,interp='cubic')[0]
+    dk120 = gaps(solve_model,klen=120,interp='cubic')[0]
+
+    assert dk120 < 0.6*dk60
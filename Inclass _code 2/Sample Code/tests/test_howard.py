@@ -0,0 +1,31 @@
+"""
+
+test_howard.py
+--------------
+This code checks that Howard improvement reaches the fixed point of plain value function iteration in fewer maximizations.
+The growth models have a finite fixed point. Cake eating does not: with u(0) = -inf and c > 0 needed every period, every path on a finite cake grid ends with no cake, whatever wmin is.
+
+"""
+
+#%% Imports from Python
+from numpy import array_equal,isfinite
+
+import pytest
+
+#%% Growth models.
+@pytest.mark.parametrize('howard_method',['iterate','sparse'])
+@pytest.mark.parametrize('name,kwargs',[('dgm',dict(klen=60)),
+                                        ('dgm',dict(klen=60,sigma=1.00)),
+                                        ('sgm',dict(klen=60)),
+                                        ('sgml',dict(klen=25)),
+                                        ('sgml',dict(klen=25,gamma=5.00,nu=1.00))])
+def test_howard_matches_vfi(solve_model,name,kwargs,howard_method):
+    plain = solve_model(name,**kwargs)
+    howard = solve_model(name,howard=10,howard_method=howard_method,**kwargs)
+
+    assert howard.sol.eval_steps > 0
+    assert howard.sol.iter < plain.sol.iter
+    assert array_equal(howard.sol.k_ind,plain.sol.k_ind)
+    fin = isfinite(plain.sol.v)
+    assert fin.any() and array_equal(isfinite(howard.sol.v),fin)
+    assert abs(howard.sol.v[fin]-plain.sol.v[fin]).max() < 1e-5
@@ -0,0 +1,106 @@
+"""
+
+test_labor.py
+-------------
+This code checks the labor supply of the stochastic growth model with labor against a fine grid for n, with a Frisch elasticity high enough that labor is interior.
+It also checks the compiled Bellman maximization when the first choice of k' is infeasible, and that labor supply stored in a memory-mapped file gives the solution of the in-memory tensor, with one file for each set of parameters.
+
+"""
+
+#%% Imports from Python
+from numpy import arange,argmax,array_equal,errstate,inf,isnan,linspace,nan,where
+
+from vfi.kernels import bisect_steps,labor_bellman,labor_grid
+
+import os
+import pytest
+
+#%% Labor supply for every (k,k',A).
+@pytest.mark.parametrize('sigma',[1.00,1.50,2.00])
+def test_labor_supply(setup_model,sigma):
+    planner = setup_model('sgml',klen=40,sigma=sigma,gamma=5.00,nu=1.00)
+    par = planner.par
+    kgrid = par.kgrid
+    Agrid = par.Agrid[0]
+
+    n,iter,err = planner.mods.solve.labor_supply(kgrid,kgrid,Agrid,par.alpha,par.delta,sigma,par.nu,par.gamma,par.n_tol,par.n_maxiter)
+    assert err <= par.n_tol
+
+    # Consumption for the labor supply found, and on a fine grid for n.
+    k = kgrid[:,None,None,None]
+    kp = kgrid[None,:,None,None]
+    A = Agrid[None,None,:,None]
+    nfine = linspace(0.0,1.0,2001)[None,None,None,:]
+    c = (A*(k**par.alpha)*(n[...,None]**(1.0-par.alpha))+((1.0-par.delta)*k-kp))[...,0]
+    cfine = A*(k**par.alpha)*(nfine**(1.0-par.alpha))+((1.0-par.delta)*k-kp)
+    feasible = cfine[...,-1] > 0.0 # Consumption is positive when working full time.
+    assert (n > 0.0).any() and (n < 1.0).any() # Labor is interior for some (k,k',A) and at the corner for others.
+
+    # Consumption is positive wherever it can be, and no n on the fine grid does better.
+    assert (c[feasible] > 0.0).all()
+    with errstate(all='ignore'):
+        u = where(c > 0.0,par.util(c,n,sigma,par.nu,par.gamma),-inf)
+        ufine = where(cfine > 0.0,par.util(cfine,nfine,sigma,par.nu,par.gamma),-inf).max(axis=-1)
+    assert (u[feasible] >= ufine[feasible]-1e-9).all()
+
+#%% Compiled labor supply.
+@pytest.mark.parametrize('sigma',[1.00,1.50])
+def test_labor_kernel(setup_model,sigma):
+    planner = setup_model('sgml',klen=15,sigma=sigma,gamma=5.00,nu=1.00)
+    par = planner.par
+    kgrid = par.kgrid
+    Agrid = par.Agrid[0]
+
+    # The loops of the compiled backend run as plain Python when Numba is not installed.
+    n = planner.mods.solve.labor_supply(kgrid,kgrid,Agrid,par.alpha,par.delta,sigma,par.nu,par.gamma,par.n_tol,par.n_maxiter)[0]
+    steps = bisect_steps(par.n_tol,par.n_maxiter)[0]
+    nk = labor_grid(kgrid,kgrid,Agrid,par.alpha,par.delta,sigma,par.nu,par.gamma,steps)
+    assert abs(nk-n).max() <= par.n_tol
+
+#%% Compiled Bellman maximization with an infeasible first choice.
+def test_labor_bellman_infeasible(setup_model):
+    planner = setup_model('sgml',klen=12)
+    par = planner.par
+    kgrid = par.kgrid
+    Agrid = par.Agrid[0]
+
+    # No labor at k' = kgrid[0] makes it infeasible at k = kgrid[0], and a NaN continuation value there (-inf times a zero probability) would otherwise become the maximum.
+    n0 = planner.mods.solve.labor_supply(kgrid,kgrid,Agrid,par.alpha,par.delta,par.sigma,par.nu,par.gamma,par.n_tol,par.n_maxiter)[0]
+    n0[:,0,:] = 0.0
+    ev = -((kgrid[:,None]-kgrid.mean())**2)*Agrid[None,:]
+    ev[0,:] = nan
+
+    # The loops of the compiled backend run as plain Python when Numba is not installed.
+    v1,ind,n1 = labor_bellman(kgrid,Agrid,n0,False,ev,par.beta,par.alpha,par.delta,par.sigma,par.nu,par.gamma,0)
+
+    # The same maximization in NumPy, with infeasible and NaN choices at negative infinity.
+    k = kgrid[:,None,None]
+    kp = kgrid[None,:,None]
+    A = Agrid[None,None,:]
+    c = A*(k**par.alpha)*(n0**(1.0-par.alpha))-(kp-(1.0-par.delta)*k)
+    with errstate(all='ignore'):
+        u = where(c > 0.0,par.util(c,n0,par.sigma,par.nu,par.gamma),-inf)
+    vall = u+par.beta*ev[None,:,:]
+    vall[(u == -inf) | isnan(vall)] = -inf
+    assert (c[0,0,:] <= 0.0).all()
+    assert not isnan(v1).any()
+    assert (ind > 0).all()
+    assert array_equal(ind,argmax(vall,axis=1))
+    assert abs(v1-vall.max(axis=1)).max() < 1e-12
+    assert array_equal(n1,n0[arange(len(kgrid))[:,None],ind,arange(len(Agrid))[None,:]])
+
+#%% Memory-mapped labor supply.
+def test_labor_memmap(solve_model,tmp_path):
+    dense = solve_model('sgml',klen=20)
+    mapped = solve_model('sgml',klen=20,n_storage='memmap')
+    other = solve_model('sgml',klen=20,n_storage='memmap',beta=0.90)
+
+    # A file for each set of parameters, named by their hash, in the project directory.
+    files = sorted(f for f in os.listdir(tmp_path) if f.startswith('n0'))
+    assert len(files) == 2
+    assert mapped.sol.n0.filename != other.sol.n0.filename
+
+    # The solve of the first parameters is unchanged by the second.
+    assert array_equal(mapped.sol.n0,dense.sol.n0)
+    assert array_equal(mapped.sol.v,dense.sol.v) and array_equal(mapped.sol.k,dense.sol.k)
+    assert not array_equal(other.sol.v,dense.sol.v)
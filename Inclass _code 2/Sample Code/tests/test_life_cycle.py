@@ -0,0 +1,63 @@
+"""
+
+test_life_cycle.py
+------------------
+This code checks the life-cycle model with a borrowing constraint: the solution and the simulation, and the savings policy at the constraint.
+It also checks that the life-cycle model with portfolio choice gives the same joint maximum over (a',alpha) whether the portfolio shares are maximized one at a time, in blocks, or all at once.
+
+"""
+
+#%% Imports from Python
+from numpy import array_equal,isfinite,isnan
+import contextlib
+import io
+
+import pytest
+
+#%% Solve and simulate.
+def test_slcm_solve_simulate(solve_model):
+    saver = solve_model('slcm',alen=60,NN=500)
+    par = saver.par
+    sol = saver.sol
+    with contextlib.redirect_stdout(io.StringIO()):
+        saver.mods.simulate.live_lives(saver)
+    sim = saver.sim
+
+    assert sol.v.shape == sol.a.shape == sol.c.shape == (par.alen,par.T,par.ylen)
+    assert isfinite(sol.v).all() and (sol.c > 0.0).all()
+    assert (sol.a >= par.amin).all() and (sol.a[:,-1,:] == 0.0).all() # Nothing is saved in the last period of life.
+    assert (par.agrid[sol.a_ind] == sol.a).all()
+
+    # The simulation follows the policies, for the people alive.
+    alive = ~isnan(sim.tsim)
+    assert sim.csim.shape == (par.TT,par.NN) and alive.any()
+    assert (sim.asim[alive] >= par.amin).all() and (sim.csim[alive] > 0.0).all()
+    assert (isnan(sim.csim) == ~alive).all()
+
+#%% Savings at the borrowing constraint.
+def test_slcm_constraint(solve_model):
+    tight = solve_model('slcm',alen=61,amin=0.0,amax=30.0)
+    loose = solve_model('slcm',alen=122,amin=-0.25,amax=30.0)
+    par = tight.par
+
+    # With no wealth and the lowest income, a young worker saves nothing and consumes the income.
+    young = slice(0,10)
+    assert (tight.sol.a[0,young,0] == 0.0).all()
+    assert abs(tight.sol.c[0,young,0]-par.ygrid[0]).max() < 1e-12
+
+    # Allowed to borrow, the same worker borrows up to the limit, so the constraint binds.
+    i0 = abs(loose.par.agrid).argmin() # a = 0 on the grid.
+    assert abs(loose.par.agrid[i0]) < 1e-12
+    assert (loose.sol.a[i0,young,0] == loose.par.amin).all()
+
+#%% Portfolio shares maximized in blocks.
+@pytest.mark.parametrize('chunk',[1,4])
+def test_portfolio_chunk(solve_model,chunk):
+    risky = dict(alen=40,alphalen=11,sigma=5.00,premium=0.04,nu_values=(0.15,-0.15)) # A risky return volatile enough for interior shares.
+    whole = solve_model('slcm_port',chunk=11,**risky)
+    block = solve_model('slcm_port',chunk=chunk,**risky)
+
+    assert isfinite(whole.sol.v).all()
+    assert ((whole.sol.alpha_ind > 0) & (whole.sol.alpha_ind < 10)).any() # Some shares are interior.
+    for key in ('v','a','c','alpha','alpha_ind'):
+        assert array_equal(getattr(block.sol,key),getattr(whole.sol,key),equal_nan=True)
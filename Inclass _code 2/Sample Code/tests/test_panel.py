@@ -0,0 +1,33 @@
+"""
+
+test_panel.py
+-------------
+This code checks that the simulated panel is the same in this process as with a pool of processes, for any number of workers.
+
+"""
+
+#%% Imports from Python
+from numpy import array_equal
+import contextlib
+import io
+import os
+
+import pytest
+
+#%% Serial and pooled panels.
+@pytest.mark.parametrize('name,solver',[('sgm',None),('sgm','plan_allocations_egm'),('sgml',None)])
+def test_serial_matches_pool(solve_model,monkeypatch,name,solver):
+    planner = solve_model(name,solver=solver,klen=20,N_sim=250,sim_block=100)
+    monkeypatch.syspath_prepend(os.path.dirname(planner.mods.simulate.__file__)) # The workers import the block simulator from the model's folder.
+
+    panels = {}
+    for workers in (0,1,2):
+        planner.par.sim_workers = workers
+        with contextlib.redirect_stdout(io.StringIO()):
+            planner.mods.simulate.grow_economy(planner)
+        panels[workers] = vars(planner.sim)
+
+    for workers in (1,2):
+        assert panels[workers].keys() == panels[0].keys()
+        for key,val in panels[0].items():
+            assert array_equal(panels[workers][key],val)
@@ -0,0 +1,40 @@
+"""
+
+test_q.py
+---------
+This code checks the solution of the Q-theory model of the firm: feasible investment, value and capital rising with productivity, average Q above marginal q, and the same solution with Howard improvement and Anderson acceleration in fewer iterations.
+
+"""
+
+#%% Imports from Python
+from numpy import array_equal,diff,isfinite
+import contextlib
+import io
+
+import pytest
+
+#%% Solve and simulate.
+def test_q_solve_simulate(solve_model):
+    firm = solve_model('q',klen=80,N=20,T=50)
+    par = firm.par
+    sol = firm.sol
+    with contextlib.redirect_stdout(io.StringIO()):
+        firm.mods.simulate.firm_dynamics(firm)
+
+    assert sol.iter < 10000 and sol.res_hist[-1] < 1e-6
+    assert isfinite(sol.v).all() and sol.v.shape == (par.klen,par.Alen)
+    assert (sol.i >= 0.0).all() and (sol.i <= sol.r).all() # Investment is non-negative and paid for out of revenue.
+    assert (diff(sol.v,axis=1) > 0.0).all() # Firm value rises with productivity.
+    assert (diff(sol.k,axis=1) >= 0.0).all() and (diff(sol.k,axis=0) >= 0.0).all() # So does capital next period, and with capital today.
+    assert (sol.Q > sol.q).all() # With decreasing returns, average Q is above marginal q.
+    assert isfinite(firm.sim.vsim).all()
+
+#%% Howard improvement and Anderson acceleration.
+@pytest.mark.parametrize('kwargs',[dict(howard=50),dict(howard=1,howard_method='sparse'),dict(accel='anderson')])
+def test_q_solvers(solve_model,kwargs):
+    plain = solve_model('q',klen=80)
+    fast = solve_model('q',klen=80,**kwargs)
+
+    assert fast.sol.iter < plain.sol.iter
+    assert array_equal(fast.sol.k_ind,plain.sol.k_ind)
+    assert abs(fast.sol.v-plain.sol.v).max() < 1e-5
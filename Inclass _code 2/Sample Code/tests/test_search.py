@@ -0,0 +1,36 @@
+"""
+
+test_search.py
+--------------
+This code checks that the concavity searches over the grid ('monotone' and 'binary') give the policy of the whole-grid search in the models that allow them, and that the model with labor refuses them.
+
+"""
+
+#%% Imports from Python
+from numpy import array_equal,isfinite
+
+import pytest
+
+#%% Models with a concave objective and an increasing policy.
+@pytest.mark.parametrize('search',['monotone','binary'])
+@pytest.mark.parametrize('name,kwargs',[('cake',dict(wlen=100,sigma=1.00)),
+                                        ('cake',dict(wlen=100,sigma=2.00)),
+                                        ('dgm',dict(klen=80,sigma=2.00)),
+                                        ('dgm',dict(klen=80,sigma=1.00)),
+                                        ('sgm',dict(klen=40,sigma=2.00)),
+                                        ('sgm',dict(klen=40,sigma=1.00,howard=10))])
+def test_search_matches_grid(solve_model,name,kwargs,search):
+    grid = solve_model(name,**kwargs)
+    concave = solve_model(name,search=search,**kwargs)
+
+    ind = 'w_ind' if name == 'cake' else 'k_ind'
+    assert array_equal(getattr(concave.sol,ind),getattr(grid.sol,ind))
+    assert array_equal(isfinite(concave.sol.v),isfinite(grid.sol.v))
+    fin = isfinite(grid.sol.v)
+    assert abs(concave.sol.v[fin]-grid.sol.v[fin]).max(initial=0.0) < 1e-6 # Within the stopping tolerance.
+
+#%% Model with labor.
+@pytest.mark.parametrize('search',['monotone','binary'])
+def test_search_labor_refused(setup_model,search):
+    with pytest.raises(AssertionError):
+        setup_model('sgml',klen=25,gamma=5.00,nu=1.00,search=search)
@@ -0,0 +1,67 @@
+"""
+
+test_store.py
+-------------
+This code checks that a stored solution loads back for the same model and solve parameters only, and that the stationary distribution is the same by power iteration and by a linear solve.
+
+"""
+
+#%% Imports from Python
+from numpy import asarray,array_equal,ndarray
+
+import pytest
+
+from vfi.distribution import find_distribution
+from vfi.store import load_solution,save_solution
+
+#%% Kwargs for a small grid in each model.
+small = {'cake':dict(wlen=60),'dgm':dict(klen=40),'sgm':dict(klen=40),'sgml':dict(klen=20)}
+
+#%% Save and load.
+@pytest.mark.parametrize('fmt',['npy','npz'])
+@pytest.mark.parametrize('name',['cake','dgm','sgm','sgml'])
+def test_store_round_trip(solve_model,setup_model,tmp_path,name,fmt):
+    store = str(tmp_path/'solutions')
+    solved = solve_model(name,**small[name])
+    assert not load_solution(solved,fmt=fmt,store=store)
+    save_solution(solved,fmt=fmt,store=store)
+
+    loaded = setup_model(name,**small[name])
+    assert load_solution(loaded,fmt=fmt,store=store)
+    for key,val in vars(solved.sol).items():
+        if isinstance(val,ndarray):
+            assert array_equal(asarray(getattr(loaded.sol,key)),val,equal_nan=True)
+        else:
+            assert getattr(loaded.sol,key) == val or val != val
+
+    # Other parameters, or another model with the same parameters, do not load it.
+    assert not load_solution(setup_model(name,beta=0.90,**small[name]),fmt=fmt,store=store)
+    if name == 'dgm':
+        assert not load_solution(setup_model('sgm',**small[name]),fmt=fmt,store=store)
+
+#%% Simulation parameters do not change the key.
+@pytest.mark.parametrize('name',['cake','sgm','sgml'])
+def test_store_simulation_params(solve_model,setup_model,tmp_path,name):
+    store = str(tmp_path/'solutions')
+    solved = solve_model(name,**small[name])
+    save_solution(solved,store=store)
+
+    sim = dict(T=17,seed_sim=7,backend='numba')
+    if name != 'cake':
+        sim.update(N_sim=3,sim_workers=2,sim_block=2,dist_method='solve',dist_tol=1e-6,dist_maxiter=50)
+    loaded = setup_model(name,**sim,**small[name])
+    assert load_solution(loaded,store=store)
+    assert array_equal(asarray(loaded.sol.v),solved.sol.v,equal_nan=True)
+
+#%% Stationary distribution.
+@pytest.mark.parametrize('name',['sgm','sgml'])
+def test_distribution(solve_model,name):
+    power = solve_model(name,dist_method='power',**small[name])
+    find_distribution(power)
+    linear = solve_model(name,dist_method='solve',**small[name])
+    find_distribution(linear)
+
+    assert abs(power.dist.mu.sum()-1.0) < 1e-12
+    assert abs(power.dist.mu-linear.dist.mu).max() < 1e-8
+    assert abs(power.dist.k_mean-linear.dist.k_mean) < 1e-8
+    assert hasattr(power.dist,'n_mean') == (name == 'sgml')
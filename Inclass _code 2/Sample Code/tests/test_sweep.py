@@ -0,0 +1,37 @@
+"""
+
+test_sweep.py
+-------------
+This code checks a two-point parameter sweep: one CSV row per combination, and no temporary project directory left behind by the workers.
+
+"""
+
+#%% Imports from Python
+import contextlib
+import csv
+import io
+import os
+
+import sweep
+
+#%% Two-point sweep.
+def test_sweep_csv(tmp_path,monkeypatch):
+    scratch = tmp_path/'scratch'
+    scratch.mkdir()
+    monkeypatch.setenv('TMPDIR',str(scratch)) # The workers are spawned, so they make their temporary directories here.
+    out = tmp_path/'sweep.csv'
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        sweep.main(['cake','--grid','howard=0,10','--fixed','wlen=100','--simulate','--workers','2','--out',str(out)])
+
+    with open(out,newline='') as f:
+        rows = list(csv.DictReader(f))
+
+    assert [row['howard'] for row in rows] == ['0','10']
+    for row in rows:
+        assert row['model'] == 'cake' and row['wlen'] == '100'
+        assert int(row['iter']) >= 1 and float(row['wall_time']) > 0.0
+        assert any(key.endswith('_mean') for key in row) # Simulated moments.
+
+    # Each worker removed its temporary project directory.
+    assert os.listdir(scratch) == []
@@ -0,0 +1,21 @@
+"""
+
+vfi
+---
+This package has the parts of value function iteration that the models share: discretization of AR(1) processes, utility functions, the Bellman operators and the iteration engine, the convergence controls, the simulator, the stationary distribution, and saving and loading solutions.
+The loops that dominate the run time also have compiled versions (Numba), used with par.backend = 'numba' when Numba is installed.
+Each model (cake eating, deterministic growth, stochastic growth, stochastic growth with labor) only sets up its parameters, its period return, and its transition matrix, and passes them to the package.
+The life-cycle models (borrowing constraint, portfolio choice) take their utility function and Tauchen discretization from the package and keep their own backward induction. The Q-theory model of the firm (Inclass_code 3) iterates with the package's Bellman operator and iteration engine.
+
+"""
+
+#%% Imports from the package
+from .bellman import chunked_operator,compiled_operator,follow_policy,golden_operator,grid_operator,interpolant,iterate,loop_operator,policy_transition,policy_value,record,search_operator
+from .convergence import anderson,coarse_guess,initial_guess,stopping_rule,warm_guess,warm_store
+from .discretization import discretize,expectation,rouwenhorst,tauchen,tauchen_hussey,truncate
+from .distribution import find_distribution
+from .kernels import numba_ok,select_backend
+from .optimize import bisect,golden_max,search_argmax
+from .simulate import interp_policy,markov_chain,panel_blocks,panel_path,simulate_pool,simulate_serial
+from .store import load_solution,save_solution,solution_key
+from .utility import crra,crra_leisure
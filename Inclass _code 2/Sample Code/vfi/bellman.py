@@ -0,0 +1,445 @@
+"""
+
+bellman.py
+----------
+This code has the Bellman operators and the value function iteration engine shared by the models.
+
+A model supplies its period return and, if it has an exogenous state, the transition matrix pmat for it.
+The value function has one row per grid point of the endogenous state (e.g. k) and, with pmat, one column per exogenous state (e.g. A).
+Each operator returns a function bellman(v0) -> (v1,pol) that applies the Bellman equation once, where pol is the choice as indices on the grid or, off the grid, as values.
+Infeasible choices are set to -inf after the continuation value is added, so they stay infeasible where the continuation value is NaN (-inf times a zero probability in the expectation).
+
+"""
+
+#%% Imports from Python
+from numpy import arange,argmax,clip,concatenate,expand_dims,full,inf,isfinite,isnan,ones,searchsorted,take_along_axis,tile,zeros
+from scipy.interpolate import CubicSpline
+from scipy.sparse import coo_matrix,csr_matrix,identity
+from scipy.sparse.linalg import spsolve
+from types import SimpleNamespace
+
+#%% Imports from the package
+from .convergence import anderson,finite_change,stopping_rule
+from .discretization import expectation
+from .optimize import golden_max,search_argmax
+
+#%% Expected value function.
+def continuation(v0,pmat):
+    '''
+
+    This function gives the value of each choice tomorrow: v0 itself without an exogenous state, or its expectation over the next-period exogenous state.
+
+    '''
+
+    if pmat is None:
+        return v0
+
+    return expectation(v0,pmat)
+
+#%% Bellman operator with the return built once.
+def grid_operator(ret,beta,pmat=None):
+    '''
+
+    This function returns the Bellman operator for a choice on the grid when the period return for every (state,choice) pair fits in memory.
+    The maximization is done for all states at once.
+
+    Input:
+        ret  : Period return for each state (axis 0) and choice (axis 1), and for each exogenous state (axis 2) if there is one. Infeasible choices are -inf.
+        beta : Discount factor.
+        pmat : Transition matrix for the exogenous state, or None.
+
+    Output:
+        bellman : Bellman operator, v1,ind = bellman(v0).
+
+    '''
+
+    infeasible = ret == -inf # Infeasible (state,choice) pairs.
+
+    def bellman(v0):
+        vall = ret + beta*expand_dims(continuation(v0,pmat),axis=0) # Compute the value function for each choice (axis 1), given the state.
+        vall[infeasible] = -inf # Set the value function to negative infinity for infeasible choices.
+        ind = argmax(vall,axis=1) # Where the optimal choice is on the grid.
+        v1 = take_along_axis(vall,expand_dims(ind,axis=1),axis=1).squeeze(axis=1) # Maximized value function.
+        return v1,ind
+
+    return bellman
+
+#%% Bellman operator with the return built block by block.
+def chunked_operator(block,n,chunk,beta,pmat=None):
+    '''
+
+    This function returns the Bellman operator for a choice on the grid when the period return is built for chunk states at a time in each sweep, holding at most chunk*n returns in memory.
+
+    Input:
+        block : Period return for a block of states: block(rows) has one row per state in rows and one column per choice, as in grid_operator.
+        n     : Grid size for the state (and choice).
+        chunk : States per block.
+        beta  : Discount factor.
+        pmat  : Transition matrix for the exogenous state, or None.
+
+    Output:
+        bellman : Bellman operator, v1,ind = bellman(v0).
+
+    '''
+
+    def bellman(v0):
+        ev = expand_dims(continuation(v0,pmat),axis=0)
+        v1 = zeros(v0.shape) # Container for V.
+        ind = zeros(v0.shape,dtype=int) # Container for the index of the choice.
+        for p0 in range(0,n,chunk): # Loop over blocks of states.
+            rows = arange(p0,min(p0+chunk,n)) # States in the block.
+            r = block(rows)
+            vall = r + beta*ev # Compute the value function for each choice, given the state.
+            vall[r == -inf] = -inf # Set the value function to negative infinity for infeasible choices.
+            ind[rows] = argmax(vall,axis=1) # Where the optimal choice is on the grid.
+            v1[rows] = take_along_axis(vall,expand_dims(ind[rows],axis=1),axis=1).squeeze(axis=1) # Maximized value function.
+        return v1,ind
+
+    return bellman
+
+#%% Bellman operator with a compiled maximization.
+def compiled_operator(kernel,n,pmat=None):
+    '''
+
+    This function returns the Bellman operator for a choice on the grid when the maximization is a compiled loop (see kernels.py), which builds each return as it needs it.
+
+    Input:
+        kernel : Maximization: v1,ind = kernel(ev), for every state (rows) and exogenous state (columns), given the (expected) value ev of each choice (rows) in each exogenous state (columns).
+        n      : Grid size for the state (and choice).
+        pmat   : Transition matrix for the exogenous state, or None.
+
+    Output:
+        bellman : Bellman operator, v1,ind = bellman(v0).
+
+    '''
+
+    def bellman(v0):
+        ev = continuation(v0,pmat).reshape((n,-1)) # One column per exogenous state.
+        v1,ind = kernel(ev)
+        return v1.reshape(v0.shape),ind.reshape(v0.shape)
+
+    return bellman
+
+#%% Bellman operator state by state.
+def loop_operator(row,n,beta,pmat=None,pick=None):
+    '''
+
+    This function returns the Bellman operator for a choice on the grid that maximizes one state at a time over the whole grid of choices.
+
+    Input:
+        row  : Period return from a state: r = row(p) gives r(j), the return of every choice on the grid in exogenous state j (j = 0 without one). Infeasible choices are -inf.
+        n    : Grid size for the state (and choice).
+        beta : Discount factor.
+        pmat : Transition matrix for the exogenous state, or None.
+        pick : Called as pick(p,ind) with the choices for state p once they are made, for policies that depend on the choice (e.g. labor supply).
+
+    Output:
+        bellman : Bellman operator, v1,ind = bellman(v0).
+
+    '''
+
+    def bellman(v0):
+        ev = continuation(v0,pmat).reshape((n,-1)) # One column per exogenous state.
+        v1 = zeros(ev.shape) # Container for V.
+        ind = zeros(ev.shape,dtype=int) # Container for the index of the choice.
+        for p in range(0,n): # Loop over the states.
+            r = row(p)
+            for j in range(0,ev.shape[1]): # Loop over the exogenous states.
+                u = r(j)
+                vall = u + beta*ev[:,j] # Compute the value function for each choice, given the state.
+                vall[u == -inf] = -inf # Set the value function to negative infinity for infeasible choices.
+                v1[p,j] = max(vall) # Maximized value function.
+                ind[p,j] = argmax(vall) # Where the optimal choice is on the grid.
+            if pick is not None:
+                pick(p,ind[p])
+        return v1.reshape(v0.shape),ind.reshape(v0.shape)
+
+    return bellman
+
+#%% Bellman operator with a concavity search.
+def search_operator(point,n,beta,search,pmat=None,pick=None):
+    '''
+
+    This function returns the Bellman operator for a choice on the grid that searches the grid for each state with search_argmax.
+    The policy is assumed increasing in the state, so the search for a state starts at the optimum of the state below it.
+    It finds the maximum on the grid only when the objective is also concave in the choice; a model that cannot guarantee both must search the whole grid.
+
+    Input:
+        point  : Period return from a state: r = point(p) gives r(q,j), the return of choice q in exogenous state j (j = 0 without one). Infeasible choices are -inf.
+        n      : Grid size for the state (and choice).
+        beta   : Discount factor.
+        search : 'monotone' or 'binary' (see search_argmax).
+        pmat   : Transition matrix for the exogenous state, or None.
+        pick   : Called as pick(p,ind) with the choices for state p once they are made.
+
+    Output:
+        bellman : Bellman operator, v1,ind = bellman(v0).
+
+    '''
+
+    def bellman(v0):
+        ev = continuation(v0,pmat).reshape((n,-1)) # One column per exogenous state.
+        v1 = zeros(ev.shape) # Container for V.
+        ind = zeros(ev.shape,dtype=int) # Container for the index of the choice.
+        lb = zeros(ev.shape[1],dtype=int) # The search for the choice starts at the previous state's optimum.
+        for p in range(0,n): # Loop over the states.
+            r = point(p)
+            for j in range(0,ev.shape[1]): # Loop over the exogenous states.
+
+                # Bellman equation for a given choice on the grid.
+                def bellman_q(q):
+                    u = r(q,j)
+                    if u == -inf:
+                        return -inf
+                    return u + beta*ev[q,j]
+
+                ind[p,j],v1[p,j] = search_argmax(bellman_q,lb[j],n-1,search)
+                lb[j] = ind[p,j]
+            if pick is not None:
+                pick(p,ind[p])
+        return v1.reshape(v0.shape),ind.reshape(v0.shape)
+
+    return bellman
+
+#%% Bellman operator off the grid.
+def golden_operator(ret,kgrid,lo,hi,beta,interp,tol,pmat=None):
+    '''
+
+    This function returns the Bellman operator for a continuous choice in [lo,hi], found by golden-section search with the (expected) value function interpolated off the grid.
+
+    Input:
+        ret    : Period return of a choice for every state at once: r,bad = ret(kp), where bad marks infeasible choices.
+        kgrid  : Grid for the state (and choice).
+        lo     : Lowest choice for each state.
+        hi     : Highest choice for each state.
+        beta   : Discount factor.
+        interp : 'linear' or 'cubic' (see interpolant).
+        tol    : Tolerance for golden-section search.
+        pmat   : Transition matrix for the exogenous state, or None.
+
+    Output:
+        bellman : Bellman operator, v1,kp = bellman(v0).
+
+    '''
+
+    def bellman(v0):
+        evf = interpolant(kgrid,continuation(v0,pmat),interp) # Expected value function off the grid.
+
+        # Bellman equation for every state at once, given a choice for each.
+        def bellman_k(kp):
+            r,bad = ret(kp)
+            vall = r + beta*evf(kp)
+            vall[bad] = -inf # Set the value function to negative infinity for infeasible choices.
+            return vall
+
+        kp,v1 = golden_max(bellman_k,lo,hi,tol)
+        return v1,kp
+
+    return bellman
+
+#%% Expected value off the grid.
+def interpolant(kgrid,ev,interp):
+    '''
+
+    This function interpolates the (expected) value function so that it can be evaluated at any k' in [kgrid[0],kgrid[-1]].
+
+    Input:
+        kgrid  : Grid for k'.
+        ev     : Value function on kgrid (rows), conditional on each current exogenous state (columns) if there is one.
+        interp : 'linear' or 'cubic' (cubic spline).
+
+    Output:
+        f : Function that evaluates the value function at an array of k', with one column per current exogenous state.
+
+    '''
+
+    if interp == 'cubic':
+        spline = CubicSpline(kgrid,ev,axis=0) # One spline per exogenous state.
+        if ev.ndim == 1:
+            return spline
+        cols = arange(0,ev.shape[1])
+        return lambda kp: spline(kp)[:,cols,cols] # Each column of k' uses the spline for its own exogenous state.
+
+    def f(kp):
+        ind = clip(searchsorted(kgrid,kp)-1,0,len(kgrid)-2) # Grid point below k'.
+        w = (kp-kgrid[ind])/(kgrid[ind+1]-kgrid[ind]) # Weight on the grid point above k'.
+        return (1.0-w)*take_along_axis(ev,ind,axis=0)+w*take_along_axis(ev,ind+1,axis=0)
+
+    return f
+
+#%% Transition under a policy.
+def policy_transition(ind,pmat=None,w=None):
+    '''
+
+    This function builds the sparse transition matrix over states (k,A), flattened row by row, when k' follows a policy and A' follows pmat.
+
+    Input:
+        ind  : Grid point for k' from each state. Off the grid, the grid point below k'.
+        pmat : Transition matrix for the exogenous state, or None.
+        w    : Off the grid, the weight on the grid point above k' (None on the grid).
+
+    Output:
+        Q : Transition matrix from (k,A) to (k',A').
+
+    '''
+
+    if pmat is None:
+        pmat = ones((1,1)) # A single exogenous state.
+        ind = expand_dims(ind,axis=1)
+        w = None if w is None else expand_dims(w,axis=1)
+
+    n,m = ind.shape
+    P = coo_matrix(pmat) # Nonzero transition probabilities from A (row) to A' (col).
+    rows = (expand_dims(arange(0,n)*m,axis=1)+P.row).ravel() # State (k,A), flattened row by row.
+    cols = (ind[:,P.row]*m+P.col).ravel() # State (k',A') reached under the policy.
+    probs = tile(P.data,n) # Probability of each A' given A.
+
+    if w is None:
+        return csr_matrix((probs,(rows,cols)),shape=(n*m,n*m))
+
+    return csr_matrix((concatenate((probs*(1.0-w[:,P.row].ravel()),probs*w[:,P.row].ravel())),(concatenate((rows,rows)),concatenate((cols,cols+m)))),shape=(n*m,n*m))
+
+#%% Value of a fixed policy.
+def policy_value(r1,Q,beta):
+    '''
+
+    This function solves (I-beta*Q)v = r1 for the value of following a policy forever.
+
+    Input:
+        r1   : Period return under the policy for each state.
+        Q    : Sparse transition matrix over states implied by the policy.
+        beta : Discount factor.
+
+    Output:
+        v : Value of the policy. States with a return of -inf, or that lead to one, get -inf.
+
+    '''
+
+    # States that eventually reach an infeasible return.
+    bad = ~isfinite(r1)
+    while True:
+        bad1 = bad | (Q@bad.astype(float) > 0.0)
+        if (bad1 == bad).all():
+            break
+        bad = bad1
+
+    # Solve the linear system on the remaining states.
+    ok = ~bad
+    v = full(r1.shape,-inf)
+    A = identity(ok.sum(),format='csr') - beta*Q[ok][:,ok]
+    v[ok] = spsolve(A.tocsc(),r1[ok])
+
+    return v
+
+#%% Howard improvement.
+def follow_policy(v0,r1,pol,beta,par,pmat=None,kgrid=None):
+    '''
+
+    This function updates the guess v0 by following the current policy: par.howard times for one period ('iterate'), or forever ('sparse', on the grid only).
+
+    Input:
+        v0    : Current guess.
+        r1    : Period return under the policy for each state.
+        pol   : The policy, as indices on the grid or, when par.choice is 'continuous', as values.
+        beta  : Discount factor.
+        par   : Parameters (howard, howard_method, and for a continuous choice, choice and interp).
+        pmat  : Transition matrix for the exogenous state, or None.
+        kgrid : Grid for the choice, for a continuous choice.
+
+    Output:
+        v0    : Updated guess.
+        steps : Number of policy-evaluation steps.
+
+    '''
+
+    if par.howard_method == 'sparse':
+        Q = policy_transition(pol,pmat) # Transition under the current policy.
+        return policy_value(r1.ravel(),Q,beta).reshape(r1.shape),1 # Value of following the current policy forever.
+
+    for h in range(0,par.howard):
+        ev = continuation(v0,pmat) # Expected value function over the next-period exogenous state.
+        if getattr(par,'choice','grid') == 'continuous':
+            v0 = r1 + beta*interpolant(kgrid,ev,par.interp)(pol) # Value of following the current policy for one more period, off the grid.
+        else:
+            v0 = r1 + beta*take_along_axis(ev,pol,axis=0) # Value of following the current policy for one more period.
+
+    return v0,par.howard
+
+#%% Value function iteration.
+def iterate(v0,bellman,beta,par,evaluate=None):
+    '''
+
+    This function iterates on the Bellman equation v = T(v) until convergence, with the stopping rule par.stop, the accelerator par.accel, and par.howard policy-evaluation steps between maximizations.
+
+    Input:
+        v0       : Initial guess.
+        bellman  : Bellman operator, v1,pol = bellman(v0), where pol is whatever evaluate needs to follow the policy.
+        beta     : Discount factor.
+        par      : Parameters (stop, accel, accel_depth, howard).
+        evaluate : Howard improvement, v0,steps = evaluate(v0,pol) (see follow_policy). Only used if par.howard is above 0.
+
+    A NaN value function cannot converge, so a Bellman update with NaN raises ValueError instead of being iterated (or reported as converged).
+
+    Output:
+        res : Namespace with the value function v (the last T(v0); with 'mqp', the midpoint of the bounds), the policy pol, and the diagnostics iter, eval_steps, err_bound, accel_steps, and res_hist.
+
+    '''
+
+    crit = 1e-6;
+    maxiter = 10000;
+    diff = 1;
+    iter = 0;
+    steps = 0; # Counter for policy-evaluation steps.
+
+    howard = par.howard # Policy-evaluation steps between maximizations.
+    stop = par.stop # Stopping rule.
+    accel = par.accel # Fixed-point accelerator.
+    acc = SimpleNamespace(df=[],dt=[],f_prev=None,t_prev=None,res_prev=inf,steps=0) # Memory for Anderson mixing.
+    res_hist = [] # Sup norm of T(v)-v over the finite states at each iteration (inf while states move between finite and infinite values).
+
+    while (diff > crit) and (iter < maxiter): # Iterate on the Bellman Equation until convergence.
+
+        v1,pol = bellman(v0) # Maximize.
+        if isnan(v1).any():
+            raise ValueError('The Bellman update is NaN at iteration '+str(iter+1)+'.')
+
+        diff,lb,ub = stopping_rule(v1,v0,beta,stop) # Check convergence.
+        dv = finite_change(v1,v0)
+        res_hist.append(inf if dv is None else abs(dv).max(initial=0.0))
+        if accel == 'anderson':
+            v0 = anderson(v0,v1,acc,par.accel_depth) # Update guess by mixing in earlier iterates.
+        else:
+            v0 = v1; # Update guess.
+
+        # Howard improvement: update the guess by following the current policy before maximizing again.
+        if (howard > 0) and (diff > crit):
+            v0,h = evaluate(v0,pol)
+            steps = steps + h;
+
+        iter = iter + 1; # Update counter.
+
+        # Print counter.
+        if iter%25 == 0:
+            print('Iteration: ',iter,'.\n')
+
+    # MacQueen-Porteus: the midpoint of the bounds is the better estimate of the value function. Without finite bounds (maxiter reached first) v1 is kept as it is.
+    if (stop == 'mqp') and isfinite(lb+ub):
+        v1 = v1 + 0.5*(lb+ub)
+
+    return SimpleNamespace(v=v1,pol=pol,iter=iter,eval_steps=steps,err_bound=0.5*(ub-lb),accel_steps=acc.steps,res_hist=res_hist)
+
+#%% Solver diagnostics.
+def record(sol,res,par):
+    '''
+
+    This function copies the diagnostics of value function iteration onto sol.
+
+    '''
+
+    sol.iter = res.iter # Number of maximizations.
+    sol.eval_steps = res.eval_steps # Number of policy-evaluation steps.
+    sol.stop = par.stop # Stopping rule.
+    sol.err_bound = res.err_bound # Bound on the sup-norm distance from sol.v to the true value function on the grid.
+    sol.accel = par.accel # Fixed-point accelerator.
+    sol.accel_steps = res.accel_steps # Number of Anderson steps taken.
+    sol.res_hist = res.res_hist # Sup norm of T(v)-v over the finite states at each iteration.
@@ -0,0 +1,268 @@
+"""
+
+convergence.py
+--------------
+This code has the convergence controls for value function iteration: stopping rules, Anderson acceleration, warm starts, and multigrid initial guesses.
+
+"""
+
+#%% Imports from Python
+from numpy import array,column_stack,inf,interp,isfinite,linspace,maximum,where,zeros
+from numpy.linalg import lstsq,norm
+from collections import OrderedDict
+from types import SimpleNamespace
+
+#%% Change in the value function.
+def finite_change(v1,v0):
+    '''
+
+    This function gives the change v1-v0 over the states where both are finite. States that are -inf in both (e.g. no cake left) are dropped, since -inf-(-inf) is NaN.
+    If a state is finite in one and not in the other, or is NaN, the value function is still changing there, and the function returns None.
+
+    '''
+
+    ok = isfinite(v0) & isfinite(v1) # States where the change is defined.
+    if not (ok | (v1 == v0)).all():
+        return None
+
+    return v1[ok]-v0[ok]
+
+#%% Stopping rule.
+def stopping_rule(v1,v0,beta,stop):
+    '''
+
+    This function measures how far value function iteration is from convergence after the update v1 = T(v0).
+    The default 'l2' is the norm of v1-v0 over every state, as the models always measured it (a state that is -inf in both iterates gives NaN, which ends the loop, as before).
+    'sup' and 'mqp' measure only the states where v0 and v1 are both finite (see finite_change); until every other state is -inf in both, their distance is inf. The bounds lb and ub are measured the same way under every rule.
+
+    Input:
+        v1   : Updated value function.
+        v0   : Previous value function.
+        beta : Discount factor.
+        stop : 'l2' (norm of v1-v0), 'sup' (sup norm of v1-v0 scaled by beta/(1-beta)), or 'mqp' (width of the MacQueen-Porteus bounds).
+
+    Output:
+        diff : Distance compared with the convergence criterion.
+        lb   : Lower bound on the true value function minus v1.
+        ub   : Upper bound on the true value function minus v1.
+
+    '''
+
+    dv = finite_change(v1,v0) # Change in the value function over the finite states.
+    if dv is None:
+        err = inf # No bound while states move between finite and infinite values.
+    else:
+        if dv.size == 0:
+            dv = zeros(1) # No finite states: nothing left to converge.
+        err = (beta/(1.0-beta))*abs(dv).max() # Contraction bound on the distance to the true value function.
+
+    if stop == 'l2':
+        return norm(v1-v0),-err,err
+
+    if dv is None:
+        return inf,-inf,inf
+
+    if stop == 'mqp':
+        lb = (beta/(1.0-beta))*dv.min()
+        ub = (beta/(1.0-beta))*dv.max()
+        return ub-lb,lb,ub
+
+    return err,-err,err
+
+#%% Anderson acceleration.
+def anderson(v0,v1,acc,depth):
+    '''
+
+    This function returns the next guess for the fixed point v = T(v) by Anderson mixing of the last few iterates.
+    The mixing weights minimize the combined residual T(v)-v in least squares. If the residual grew since the last step, the memory is cleared and the plain update v1 is used.
+
+    Input:
+        v0    : Current guess.
+        v1    : Updated value function, T(v0).
+        acc   : Namespace with the memory of earlier iterates; it is updated in place.
+        depth : Number of earlier iterates to mix.
+
+    Output:
+        v : Next guess.
+
+    '''
+
+    ok = isfinite(v0) & isfinite(v1) # Only finite values are mixed.
+    f = where(ok,v1-v0,0.0).ravel() # Residual.
+    t = where(ok,v1,0.0).ravel() # Update.
+    res = abs(f).max()
+
+    # Safeguard: fall back to the plain update when the residual grows.
+    if res > acc.res_prev:
+        acc.df = []
+        acc.dt = []
+        acc.f_prev = f
+        acc.t_prev = t
+        acc.res_prev = res
+        return v1
+
+    # Differences of residuals and updates over the memory.
+    if acc.f_prev is not None:
+        acc.df = (acc.df+[f-acc.f_prev])[-depth:]
+        acc.dt = (acc.dt+[t-acc.t_prev])[-depth:]
+    acc.f_prev = f
+    acc.t_prev = t
+    acc.res_prev = res
+
+    if len(acc.df) == 0:
+        return v1
+
+    # Mixing weights and the extrapolated guess.
+    gamma = lstsq(column_stack(acc.df),f,rcond=None)[0]
+    v = (t-column_stack(acc.dt)@gamma).reshape(v1.shape)
+    if not isfinite(v[ok]).all():
+        return v1
+    acc.steps = acc.steps + 1
+
+    return where(ok,v,v1)
+
+#%% Value function on another grid.
+def regrid(kgrid,kgrid0,v0):
+    '''
+
+    This function linearly interpolates a value function from kgrid0 onto kgrid, one exogenous state (column) at a time.
+
+    '''
+
+    if v0.ndim == 1:
+        return interp(kgrid,kgrid0,v0)
+
+    return column_stack([interp(kgrid,kgrid0,v0[:,j]) for j in range(0,v0.shape[1])])
+
+#%% Warm-start cache.
+warm_cache = OrderedDict() # (kgrid, v minus the steady-state guess, parameters, parameter names) for each model solved, least recently used first.
+
+def warm_guess(par,v0,names):
+    '''
+
+    This function finds the cached solution whose parameters are nearest to par, and gives v0 plus the cached solution's distance from its own steady-state guess, interpolated onto par.kgrid.
+    The steady-state guess already moves with the parameters (its level with beta and sigma), so only the shape of the cached solution is carried over. A cached value function used as it is would start with the wrong level, which value function iteration only removes at the rate beta.
+    Only solutions of the same model, with the same parameter names and the same number of exogenous states as v0, are candidates.
+    Distance is the largest relative difference over names. Only solutions within par.warm_tol are used.
+
+    Input:
+        par   : Parameters.
+        v0    : Steady-state guess on par.kgrid.
+        names : Parameters that define a nearby model.
+
+    Output:
+        v    : Warm-start guess on par.kgrid, or None if no cached parameters are within par.warm_tol.
+        dist : Relative distance to the cached parameters, or None.
+
+    '''
+
+    x = array([getattr(par,p) for p in names]) # Parameters of this model.
+
+    # Nearest cached parameters.
+    best = None
+    dist = par.warm_tol
+    for key,(kgrid,v,xc,nc) in warm_cache.items():
+        if (nc != names) or (v.shape[1:] != v0.shape[1:]): # Another model, or a different grid for the exogenous state.
+            continue
+        d = (abs(x-xc)/maximum(abs(xc),1e-8)).max()
+        if d <= dist:
+            best = key
+            dist = d
+
+    if best is None:
+        return None,None
+
+    warm_cache.move_to_end(best) # Most recently used.
+    kgrid,dv,xc,nc = warm_cache[best]
+
+    return v0+regrid(par.kgrid,kgrid,dv),dist
+
+def warm_store(par,v,names,guess):
+    '''
+
+    This function adds a solved value function to the warm-start cache, evicting the least recently used entries beyond par.warm_size.
+
+    Input:
+        par   : Parameters.
+        v     : Value function on par.kgrid.
+        names : Parameters that define a nearby model.
+        guess : Steady-state guess the solve began from (before any warm start or multigrid), on par.kgrid.
+
+    '''
+
+    x = tuple(getattr(par,p) for p in names)
+    key = (names,)+x+(par.klen,par.kgrid[0],par.kgrid[-1]) # Model, parameters, and grid.
+    warm_cache[key] = (par.kgrid.copy(),v-guess,array(x),names) # Not finite where v or the guess is not.
+    warm_cache.move_to_end(key) # Most recently used.
+    while len(warm_cache) > par.warm_size:
+        warm_cache.popitem(last=False)
+
+#%% Initial guess from a coarser grid.
+def coarse_guess(par,solver,**coarse_par):
+    '''
+
+    This function solves the model on a grid with half as many points and interpolates its value function onto par.kgrid.
+    The coarse solve uses par.levels-1 levels itself, so the levels run from coarse to fine.
+
+    Input:
+        par        : Parameters.
+        solver     : Solver to use on the coarse grid.
+        coarse_par : Parameters that differ on the coarse grid, besides the grid itself.
+
+    Output:
+        v0         : Value function on par.kgrid, interpolated from the coarse solution.
+        level_klen : Grid size at each coarser level.
+        level_iter : Iterations at each coarser level.
+
+    '''
+
+    coarse = SimpleNamespace(par=SimpleNamespace(**vars(par))) # Same model with a coarser grid.
+    coarse.par.levels = par.levels-1
+    coarse.par.warm_start = False # Coarse levels neither use nor fill the warm-start cache.
+    coarse.par.klen = (par.klen-1)//2+1 # About half as many grid points.
+    coarse.par.kgrid = linspace(par.kgrid[0],par.kgrid[-1],coarse.par.klen)
+    for key,val in coarse_par.items():
+        setattr(coarse.par,key,val)
+
+    solver(coarse)
+
+    v0 = regrid(par.kgrid,coarse.par.kgrid,coarse.sol.v) # Coarse value function on the fine grid.
+
+    return v0,coarse.sol.level_klen,coarse.sol.level_iter
+
+#%% Initial guess.
+def initial_guess(par,v0,solver,names,**coarse_par):
+    '''
+
+    This function improves the initial guess v0 (in place) with a warm start, if par.warm_start and a nearby solution is cached, or else with the solution on coarser grids, if par.levels is above 1.
+    The guess is kept where the cached or coarse value function is not finite.
+
+    Input:
+        par        : Parameters.
+        v0         : Initial guess on par.kgrid.
+        solver     : Solver to use on the coarse grid.
+        names      : Parameters that define a nearby model (see warm_guess).
+        coarse_par : Parameters that differ on the coarse grid (see coarse_guess).
+
+    Output:
+        warm_dist  : Relative distance to the parameters of the cached solution used, or None.
+        level_klen : Grid size at each coarser level.
+        level_iter : Iterations at each coarser level.
+
+    '''
+
+    # Warm start: begin from the solution for the nearest parameter vector already solved.
+    warm_dist = None # Relative distance to the parameters of the cached solution used, if any.
+    if par.warm_start:
+        vw,warm_dist = warm_guess(par,v0,names)
+
+    # Multigrid: start from the solution on a grid with half as many points, solved the same way.
+    level_klen = [] # Grid size at each coarser level.
+    level_iter = [] # Iterations at each coarser level.
+    if warm_dist is not None:
+        v0[isfinite(vw)] = vw[isfinite(vw)] # Keep the initial guess where the cached value function is not finite.
+    elif par.levels > 1:
+        vc,level_klen,level_iter = coarse_guess(par,solver,**coarse_par)
+        v0[isfinite(vc)] = vc[isfinite(vc)] # Keep the initial guess where the coarse value function is not finite.
+
+    return warm_dist,level_klen,level_iter
@@ -0,0 +1,229 @@
+"""
+
+discretization.py
+-----------------
+This code discretizes AR(1) processes and takes expectations over the discretized process.
+
+"""
+
+#%% Imports from Python
+from numpy import array,column_stack,count_nonzero,expand_dims,linspace,pi,sqrt,tile,zeros
+from numpy.polynomial.hermite import hermgauss
+from scipy import stats
+from scipy.sparse import csr_matrix,dia_matrix,issparse
+
+#%% Discretize the AR(1) process with a cache.
+grid_cache = {} # (grid, pmat) for each (mu, rho, sigma, N, m, method) already discretized.
+
+def discretize(mu,rho,sigma,N,m,method):
+    """
+    
+    This function discretizes an AR(1) process with the chosen method. Results are memoized, so repeated calls to setup in a parameter sweep skip recomputing the transition matrix.
+    
+    Input:
+        mu     : Intercept of AR(1).
+        rho    : Persistence of AR(1).
+        sigma  : Standard deviation of error term.
+        N      : Number of states.
+        m      : Scaling parameter for Tauchen (unused by the other methods).
+        method : 'tauchen', 'rouwenhorst', or 'tauchen-hussey'.
+        
+    Output:
+        y    : Grid for the AR(1) process.
+        pmat : Transition probability matrix.
+        
+    """
+
+    key = (mu,rho,sigma,N,m,method)
+
+    if key not in grid_cache:
+        if method == 'rouwenhorst':
+            grid_cache[key] = rouwenhorst(mu,rho,sigma,N)
+        elif method == 'tauchen-hussey':
+            grid_cache[key] = tauchen_hussey(mu,rho,sigma,N)
+        else:
+            grid_cache[key] = tauchen(mu,rho,sigma,N,m)
+
+    y,pmat = grid_cache[key]
+
+    return y.copy(),pmat.copy() # Copies, so callers cannot change the cached arrays.
+
+#%% Tauchen's Method.
+def tauchen(mu,rho,sigma,N,m):
+    """
+    
+    This function discretizes an AR(1) process.
+    
+            y(t) = mu + rho*y(t-1) + eps(t), eps(t) ~ NID(0,sigma^2)
+    
+    Input:
+        mu    : Intercept of AR(1).
+        rho   : Persistence of AR(1).
+        sigma : Standard deviation of error term.
+        N     : Number of states.
+        m     : Parameter such that m time the unconditional std. dev. of the AR(1) is equal to the largest grid point.
+        
+    Output:
+        y    : Grid for the AR(1) process.
+        pmat : Transition probability matrix.
+        
+    """
+    
+    #%% Construct equally spaced grid.
+    
+    ar_mean = mu/(1.0-rho) # The mean of a stationary AR(1) process is mu/(1-rho).
+    ar_sd = sigma/((1.0-rho**2.0)**(1/2)) # The std. dev of a stationary AR(1) process is sigma/sqrt(1-rho^2)
+    
+    y1 = ar_mean-(m*ar_sd) # Smallest grid point is the mean of the AR(1) process minus m*std.dev of AR(1) process.
+    yn = ar_mean+(m*ar_sd) # Largest grid point is the mean of the AR(1) process plus m*std.dev of AR(1) process.
+     
+    y,d = linspace(y1,yn,N,endpoint=True,retstep=True) # Equally spaced grid. Include endpoint (endpoint=True) and record stepsize, d (retstep=True).
+    
+    #%% Compute transition probability matrix from state j (row) to k (column).
+    
+    ymatk = tile(expand_dims(y,axis=0),(N,1)) # Container for state next period.
+    ymatj = mu+rho*ymatk.T # States this period.
+    
+    # In the following, loc and scale are the mean and std used to standardize the variable. # For example, norm.cdf(x,loc=y,scale=s) is the standard normal CDF evaluated at (x-y)/s.
+    pmat = stats.norm.cdf(ymatk,loc=ymatj-(d/2.0),scale=sigma)-stats.norm.cdf(ymatk,loc=ymatj+(d/2.0),scale=sigma) # Transition probabilities to state 2, ..., N-1.
+    pmat[:,0] = stats.norm.cdf(y[0],loc=mu+rho*y-(d/2.0),scale=sigma) # Transition probabilities to state 1.
+    pmat[:,N-1] = 1.0-stats.norm.cdf(y[N-1],loc=mu+rho*y+(d/2.0),scale=sigma) # Transition probabilities to state N.
+    
+    #%% Output.
+    
+    y = expand_dims(y,axis=0) # Convert 0-dimensional array to a row vector.
+    
+    if count_nonzero(pmat.sum(axis=1)<0.999999) > 0:
+        raise Exception("Some columns of transition matrix don't sum to 1.") 
+
+    return y,pmat
+
+#%% Rouwenhorst's Method.
+def rouwenhorst(mu,rho,sigma,N):
+    """
+    
+    This function discretizes an AR(1) process. It matches the unconditional variance and persistence exactly, which keeps it accurate for rho near 1.
+    
+            y(t) = mu + rho*y(t-1) + eps(t), eps(t) ~ NID(0,sigma^2)
+    
+    Input:
+        mu    : Intercept of AR(1).
+        rho   : Persistence of AR(1).
+        sigma : Standard deviation of error term.
+        N     : Number of states.
+        
+    Output:
+        y    : Grid for the AR(1) process.
+        pmat : Transition probability matrix.
+        
+    """
+    
+    #%% Construct equally spaced grid.
+    
+    ar_mean = mu/(1.0-rho) # The mean of a stationary AR(1) process is mu/(1-rho).
+    ar_sd = sigma/((1.0-rho**2.0)**(1/2)) # The std. dev of a stationary AR(1) process is sigma/sqrt(1-rho^2)
+    
+    y = linspace(ar_mean-sqrt(N-1)*ar_sd,ar_mean+sqrt(N-1)*ar_sd,N) # Grid spans sqrt(N-1) unconditional std. devs. on either side of the mean.
+    
+    #%% Build the transition matrix recursively from the two-state case.
+    
+    p = (1.0+rho)/2.0 # Probability of staying in the same state in the two-state chain.
+    pmat = array([[p,1.0-p],[1.0-p,p]])
+    
+    for n in range(3,N+1):
+        pnew = zeros((n,n))
+        pnew[:-1,:-1] += p*pmat
+        pnew[:-1,1:] += (1.0-p)*pmat
+        pnew[1:,:-1] += (1.0-p)*pmat
+        pnew[1:,1:] += p*pmat
+        pnew[1:-1,:] /= 2.0 # Interior rows were counted twice.
+        pmat = pnew
+    
+    #%% Output.
+    
+    y = expand_dims(y,axis=0) # Convert 0-dimensional array to a row vector.
+
+    return y,pmat
+
+#%% Tauchen and Hussey's Method.
+def tauchen_hussey(mu,rho,sigma,N):
+    """
+    
+    This function discretizes an AR(1) process using Gauss-Hermite quadrature nodes as the grid.
+    
+            y(t) = mu + rho*y(t-1) + eps(t), eps(t) ~ NID(0,sigma^2)
+    
+    Input:
+        mu    : Intercept of AR(1).
+        rho   : Persistence of AR(1).
+        sigma : Standard deviation of error term.
+        N     : Number of states.
+        
+    Output:
+        y    : Grid for the AR(1) process.
+        pmat : Transition probability matrix.
+        
+    """
+    
+    #%% Quadrature grid.
+    
+    ar_mean = mu/(1.0-rho) # The mean of a stationary AR(1) process is mu/(1-rho).
+    
+    z,w = hermgauss(N) # Gauss-Hermite nodes and weights.
+    y = ar_mean+sqrt(2.0)*sigma*z # Grid for the AR(1) process.
+    
+    #%% Compute transition probability matrix from state j (row) to k (column).
+    
+    ymatk = tile(expand_dims(y,axis=0),(N,1)) # States next period.
+    ymatj = mu+rho*ymatk.T # Conditional means given the states this period.
+    
+    pmat = (w/sqrt(pi))*stats.norm.pdf(ymatk,loc=ymatj,scale=sigma)/stats.norm.pdf(ymatk,loc=ar_mean,scale=sigma) # Quadrature weights reweighted by the conditional density.
+    pmat = pmat/pmat.sum(axis=1,keepdims=True) # Rows sum to 1.
+    
+    #%% Output.
+    
+    y = expand_dims(y,axis=0) # Convert 0-dimensional array to a row vector.
+
+    return y,pmat
+
+#%% Sparse storage for the transition matrix.
+def truncate(pmat,tol,fmt):
+    """
+    
+    This function drops transition probabilities below tol, renormalizes the rows, and stores the matrix in the requested format.
+    
+    Input:
+        pmat : Transition probability matrix.
+        tol  : Threshold below which probabilities are set to zero.
+        fmt  : 'dense' (returned unchanged), 'csr', or 'banded'.
+        
+    Output:
+        pmat : Transition probability matrix in the requested format.
+        
+    """
+
+    if fmt == 'dense':
+        return pmat
+
+    pmat = pmat.copy()
+    pmat[pmat<tol] = 0.0 # Drop numerically zero transitions.
+    pmat = pmat/pmat.sum(axis=1,keepdims=True) # Renormalize the rows.
+
+    if fmt == 'csr':
+        return csr_matrix(pmat)
+
+    return dia_matrix(pmat) # Only the diagonals with a nonzero entry are stored.
+
+#%% Expected value over the next-period exogenous state.
+def expectation(v0,pmat):
+    '''
+    
+    This function computes the expected value function over the next-period exogenous state (e.g. A) for every choice (rows, e.g. k'), conditional on each current exogenous state (columns).
+    This is v0@pmat.T. A dense pmat is applied one A-state at a time so the result rounds exactly as in the state-by-state loop; a sparse pmat only touches its stored entries.
+    
+    '''
+
+    if issparse(pmat):
+        return (pmat@v0.T).T
+
+    return column_stack([v0@pmat[j,:].T for j in range(0,pmat.shape[0])])
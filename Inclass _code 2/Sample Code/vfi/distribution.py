@@ -0,0 +1,114 @@
+"""
+
+distribution.py
+---------------
+This code computes the stationary distribution of the stochastic growth models, with or without labor supply.
+
+"""
+
+#%% Imports from Python
+from numpy import clip,full,ones,searchsorted,tile,zeros
+from scipy.sparse import identity
+from scipy.sparse.linalg import spsolve
+from types import SimpleNamespace
+import time
+
+#%% Imports from the package
+from .bellman import policy_transition
+
+#%% Stationary distribution of the model.
+def find_distribution(myClass):
+    '''
+
+    This function computes the stationary distribution over (k,A) on the grid (Young's histogram method).
+    The policy functions and pmat give a sparse transition matrix over (k,A), and its fixed point replaces a long simulation.
+
+    Input:
+        myClass : Model class with parameters, grids, utility function, and policy functions.
+
+    '''
+
+    print('\n--------------------------------------------------------------------------------------------------')
+    print('Stationary Distribution')
+    print('--------------------------------------------------------------------------------------------------\n')
+
+    # Namespace for the distribution.
+    setattr(myClass,'dist',SimpleNamespace())
+    dist = myClass.dist
+
+    # Model parameters, grids and functions.
+
+    par = myClass.par # Parameters.
+    sol = myClass.sol # Policy functions.
+
+    klen = par.klen # Capital grid size.
+    Alen = par.Alen # Productivity grid size.
+    kgrid = par.kgrid # Capital today (state).
+    Agrid = par.Agrid[0] # Productivity today (state).
+    pmat = par.pmat # Transition matrix for productivity.
+
+    method = par.dist_method # Power iteration or linear solve.
+    tol = par.dist_tol # Tolerance for power iteration.
+    maxiter = par.dist_maxiter # Maximum number of power iterations.
+
+    # Capital policy as indices on kgrid. A choice off the grid is split between the grid points around it, keeping its mean.
+    kind = getattr(sol,'k_ind',None)
+    if kind is not None:
+        klo = kind # Grid point for k'.
+        w = None # All mass on klo.
+    else:
+        klo = clip(searchsorted(kgrid,sol.k)-1,0,klen-2) # Grid point below k'.
+        w = (sol.k-kgrid[klo])/(kgrid[klo+1]-kgrid[klo]) # Share of mass on the grid point above k'.
+
+    t0 = time.time()
+
+    # Transition matrix over states s = p*Alen+j: (k_p,A_j) -> (k'(k_p,A_j),A_j') with probability pmat[j,j'].
+    Q = policy_transition(klo,pmat,w)
+    QT = Q.T.tocsr() # Maps today's distribution into tomorrow's.
+
+    if method == 'power':
+        mu0 = full(klen*Alen,1.0/(klen*Alen)) # Start from a uniform distribution.
+        diff = 1
+        iter = 0
+        while (diff > tol) and (iter < maxiter):
+            mu1 = QT@mu0
+            diff = abs(mu1-mu0).max()
+            mu0 = mu1
+            iter = iter + 1
+        mu = mu0
+    else:
+        # Solve (I-Q')mu = 0 with one equation replaced by sum(mu) = 1.
+        A = (identity(klen*Alen,format='csr') - QT).tolil()
+        A[0,:] = ones(klen*Alen)
+        b = zeros(klen*Alen)
+        b[0] = 1.0
+        mu = spsolve(A.tocsc(),b)
+        mu[mu < 0.0] = 0.0
+        iter = 1
+
+    mu = mu/mu.sum()
+    mu = mu.reshape(klen,Alen) # Mass on each (k,A).
+
+    t1 = time.time()
+    print('Elapsed time is ',t1-t0,' seconds.')
+    print('Converged in ',iter,' iterations.')
+
+    dist.mu = mu # Stationary distribution over (k,A).
+    dist.k_marg = mu.sum(axis=1) # Marginal distribution of capital.
+    dist.A_marg = mu.sum(axis=0) # Marginal distribution of productivity.
+    dist.iter = iter # Number of power iterations.
+    dist.time = t1-t0 # Elapsed time in seconds.
+
+    # Aggregate means and variances, with labor supply when the model has it.
+    Amat = tile(Agrid,(klen,1)) # Productivity on each (k,A).
+    if hasattr(sol,'n'):
+        series = (('A',Amat),('y',sol.y),('k',sol.k),('c',sol.c),('n',sol.n),('i',sol.i),('u',par.util(sol.c,sol.n,par.sigma,par.nu,par.gamma)))
+    else:
+        series = (('A',Amat),('y',sol.y),('k',sol.k),('c',sol.c),('i',sol.i),('u',par.util(sol.c,par.sigma)))
+    for name,x in series:
+        mean = (mu*x).sum()
+        setattr(dist,name+'_mean',mean) # Stationary mean.
+        setattr(dist,name+'_var',(mu*(x-mean)**2).sum()) # Stationary variance.
+
+    print('Mean of k: ',dist.k_mean)
+    print('Std. dev. of k: ',dist.k_var**0.5)
@@ -0,0 +1,314 @@
+"""
+
+kernels.py
+----------
+This code has the compiled backend: the grid search in the Bellman equation, the bisection for labor supply, and the panel time loop, written as plain loops that Numba compiles and runs in parallel over states (or economies).
+The loops build each return as they need it, so they do not hold the (k,k',A) tensors that the vectorized NumPy code builds. The compiled code is cached on disk, so later runs (and the workers of a pool) do not compile it again.
+A model uses them with par.backend = 'numba'. If Numba cannot be imported, the models run their NumPy code instead (see select_backend).
+
+"""
+
+#%% Imports from Python
+from numpy import empty,inf,int64,log,searchsorted,zeros
+
+#%% Imports from Numba, if it is installed.
+try:
+    from numba import njit,prange
+    numba_ok = True
+except ImportError:
+    numba_ok = False
+    prange = range
+    def njit(*args,**kwargs): # Without Numba the loops stay plain Python. They are not called then, since select_backend falls back to NumPy.
+        return lambda f: f
+
+#%% Backend.
+def select_backend(par):
+    '''
+
+    This function gives the backend that will run: par.backend, or 'numpy' when it is 'numba' and Numba cannot be imported.
+
+    '''
+
+    if (par.backend == 'numba') and (not numba_ok):
+        return 'numpy'
+
+    return par.backend
+
+#%% Utility for one consumption level.
+@njit(error_model='numpy',cache=True)
+def crra_point(c,sigma):
+
+    # CRRA utility
+    if sigma == 1:
+        u = log(c) # Log utility.
+    else:
+        u = (c**(1-sigma))/(1-sigma) # CRRA utility.
+
+    return u
+
+@njit(error_model='numpy',cache=True)
+def crra_leisure_point(c,n,sigma,nu,gamma):
+
+    # Leisure.
+    un = ((1.0-n)**(1.0+(1.0/nu)))/(1.0+(1.0/nu))
+
+    # Consumption.
+    if sigma == 1:
+        uc = log(c) # Log utility.
+    else:
+        uc = (c**(1.0-sigma))/(1.0-sigma) # CRRA utility.
+
+    # Total.
+    u = uc + gamma*un;
+
+    return u
+
+#%% Bellman maximization over the grid.
+@njit(parallel=True,error_model='numpy',cache=True)
+def bellman_max(y,s,kgrid,ev,beta,sigma):
+    '''
+
+    This function maximizes u(c)+beta*ev over the grid for the choice, for every state, where consumption is c = y-(k'-s).
+    For the growth models y is output and s is undepreciated capital, (1-delta)*k; for the cake-eating problem y is the cake and s is zero.
+
+    Input:
+        y     : Output for each state (rows) and exogenous state (columns).
+        s     : Undepreciated capital for each state.
+        kgrid : Grid for the choice.
+        ev    : (Expected) value of each choice (rows), for each exogenous state (columns).
+        beta  : Discount factor.
+        sigma : CRRA.
+
+    Output:
+        v1  : Maximized value function.
+        ind : Where the optimal choice is on the grid (the first one, if several tie).
+
+    '''
+
+    n,m = y.shape
+    v1 = empty((n,m)) # Container for V.
+    ind = zeros((n,m),dtype=int64) # Container for the index of the choice.
+
+    for p in prange(n): # Loop over the states, in parallel.
+        for j in range(0,m): # Loop over the exogenous states.
+            vmax = -inf
+            imax = 0
+            for q in range(0,kgrid.shape[0]): # Loop over the choices.
+                c = y[p,j]-(kgrid[q]-s[p]) # Consumption, c = y-i.
+                if c <= 0.0:
+                    u = -inf # Negative infinity when c <= 0.
+                else:
+                    u = crra_point(c,sigma)
+                val = u + beta*ev[q,j]
+                if val > vmax:
+                    vmax = val
+                    imax = q
+            v1[p,j] = vmax
+            ind[p,j] = imax
+
+    return v1,ind
+
+#%% Labor supply.
+def bisect_steps(tol,maxiter):
+    '''
+
+    This function gives the number of steps bisection on [0,1] takes to reach tol, and the bracket width it ends with (see bisect in optimize.py).
+    Every bracket halves at each step, so every (k,k',A) takes the same number of steps.
+
+    '''
+
+    err = 1.0
+    iter = 0
+
+    while (err > tol) and (iter < maxiter):
+        err = 0.5*err
+        iter = iter + 1
+
+    return iter,err
+
+@njit(error_model='numpy',cache=True)
+def labor_point(k,kp,A,alpha,delta,sigma,nu,gamma,steps):
+    '''
+
+    This function solves the intratemporal condition for labor given k, k', and A by bisection with a fixed number of steps, as labor_choice in the labor model's solve.py does.
+    The bracket starts at the n where consumption is zero, and the root is kept only if it is better than working full time.
+
+    '''
+
+    lo = min((max(kp-((1.0-delta)*k),0.0)/(A*(k**alpha)))**(1.0/(1.0-alpha)),1.0) # Lower end of the bracket: consumption is zero there.
+    hi = 1.0 # Upper end of the bracket.
+
+    for h in range(0,steps):
+        n = 0.5*(lo+hi) # Midpoint.
+
+        # Intratemporal condition.
+        c = (A*(k**alpha)*(n**(1.0-alpha)))+((1.0-delta)*k-kp)
+        mpl = A*(1.0-alpha)*((k/n)**alpha)
+        un = -gamma*(1.0-n)**(1.0/nu)
+        if sigma == 1.0:
+            uc = 1.0/c # Log utility.
+        else:
+            uc = c**(-sigma) # CRRA utility.
+
+        if uc*mpl + un > 0.0: # Raising n still raises the objective.
+            lo = n
+        else:
+            hi = n
+
+    n = 0.5*(lo+hi)
+
+    # Interior root against the corner n = 1.
+    c = (A*(k**alpha)*(n**(1.0-alpha)))+((1.0-delta)*k-kp) # Consumption at the root.
+    c1 = (A*(k**alpha))+((1.0-delta)*k-kp) # Consumption when working full time.
+    if (c1 > 0.0) and ((c <= 0.0) or (crra_leisure_point(c1,1.0,sigma,nu,gamma) > crra_leisure_point(c,n,sigma,nu,gamma))):
+        n = 1.0
+
+    return n
+
+@njit(parallel=True,error_model='numpy',cache=True)
+def labor_grid(kstate,kchoice,Agrid,alpha,delta,sigma,nu,gamma,steps):
+    '''
+
+    This function solves the intratemporal condition for labor for all combinations of k (axis 0), k' (axis 1), and A (axis 2), in parallel over k.
+
+    '''
+
+    n = empty((kstate.shape[0],kchoice.shape[0],Agrid.shape[0])) # Container for n.
+
+    for p in prange(kstate.shape[0]): # Loop over the k-states, in parallel.
+        for q in range(0,kchoice.shape[0]): # Loop over the k-choices.
+            for j in range(0,Agrid.shape[0]): # Loop over the A-states.
+                n[p,q,j] = labor_point(kstate[p],kchoice[q],Agrid[j],alpha,delta,sigma,nu,gamma,steps)
+
+    return n
+
+#%% Bellman maximization over the grid with labor supply.
+@njit(parallel=True,error_model='numpy',cache=True)
+def labor_bellman(kgrid,Agrid,n0,lazy,ev,beta,alpha,delta,sigma,nu,gamma,steps):
+    '''
+
+    This function maximizes u(c,n)+beta*ev over the grid for k', for every (k,A), where n is the labor supply given k, k', and A.
+
+    Input:
+        kgrid : Grid for k (state and choice).
+        Agrid : Grid for A.
+        n0    : Labor supply for every (k,k',A), unless lazy.
+        lazy  : Whether n is solved by bisection for each (k,k',A) as it is needed, instead of read from n0.
+        ev    : Expected value of each k' (rows), for each A-state (columns).
+        steps : Bisection steps for labor supply (see bisect_steps).
+
+    Output:
+        v1  : Maximized value function.
+        ind : Where the optimal k' is on the grid.
+        n1  : Labor supply at the optimal k'.
+
+    '''
+
+    klen = kgrid.shape[0]
+    Alen = Agrid.shape[0]
+    v1 = empty((klen,Alen)) # Container for V.
+    ind = zeros((klen,Alen),dtype=int64) # Container for the index of k'.
+    n1 = zeros((klen,Alen)) # Container for n.
+
+    for p in prange(klen): # Loop over the k-states, in parallel.
+        s = (1-delta)*kgrid[p] # Undepreciated capital.
+        for j in range(0,Alen): # Loop over the A-states.
+            vmax = -inf
+            imax = 0
+            nmax = 0.0
+            for q in range(0,klen): # Loop over the k-choices.
+                if lazy:
+                    n = labor_point(kgrid[p],kgrid[q],Agrid[j],alpha,delta,sigma,nu,gamma,steps)
+                else:
+                    n = n0[p,q,j]
+                c = Agrid[j]*(kgrid[p]**alpha)*(n**(1.0-alpha))-(kgrid[q]-s) # Consumption, c = y-i.
+                if not (c > 0.0):
+                    u = -inf # Negative infinity when c <= 0 (or c is NaN).
+                else:
+                    u = crra_leisure_point(c,n,sigma,nu,gamma)
+                val = u + beta*ev[q,j]
+                if (u == -inf) or (val != val):
+                    val = -inf # Infeasible choices, and a NaN continuation value (-inf times a zero probability), are negative infinity, so a NaN cannot become the maximum.
+                if q == 0:
+                    nmax = n # Labor supply at the first choice, kept when no choice is feasible (as argmax does).
+                if val > vmax:
+                    vmax = val
+                    imax = q
+                    nmax = n
+            v1[p,j] = vmax
+            ind[p,j] = imax
+            n1[p,j] = nmax
+
+    return v1,ind,n1
+
+#%% Panel time loop.
+@njit(parallel=True,error_model='numpy',cache=True)
+def panel_grid(kind,cmat,A0,k0,draws,T):
+    '''
+
+    This function advances economies on the grid for len(draws) periods, in parallel over economies, and returns the states of the last T periods.
+
+    Input:
+        kind  : Policy function for k' as indices on the grid, for each A-state (columns).
+        cmat  : CDF matrix of the transition matrix for A, with row j shifted up by j and flattened (see panel_path).
+        A0    : Initial A-state of each economy.
+        k0    : Initial k-state of each economy, as an index on the grid.
+        draws : Uniform draws for the next A-state, one row per period and one column per economy.
+        T     : Time periods kept.
+
+    Output:
+        ks : k-states in the kept periods, (T,economies).
+        As : A-states in the kept periods, (T,economies).
+
+    '''
+
+    N = A0.shape[0]
+    Alen = kind.shape[1]
+    burn = draws.shape[0]-T # Periods burned.
+    ks = empty((T,N),dtype=int64) # Container for k.
+    As = empty((T,N),dtype=int64) # Container for A.
+
+    for e in prange(N): # Loop over the economies, in parallel.
+        kt = k0[e]
+        At = A0[e]
+        for t in range(0,burn+T): # Time loop.
+            if t >= burn:
+                ks[t-burn,e] = kt # Record the second half.
+                As[t-burn,e] = At
+            kt = kind[kt,At] # Capital choice today is the state tomorrow.
+            At = min(max(searchsorted(cmat,draws[t,e]+At)-At*Alen,0),Alen-1) # Draw next-period productivity.
+
+    return ks,As
+
+@njit(parallel=True,error_model='numpy',cache=True)
+def panel_continuous(kgrid,kpol,cmat,A0,k0,draws,T):
+    '''
+
+    This function advances economies off the grid for len(draws) periods, in parallel over economies, with the policy interpolated in k (see interp_policy).
+    The inputs are as in panel_grid, except that k0 is the initial capital stock itself. It returns the states and the capital choices of the last T periods.
+
+    '''
+
+    N = A0.shape[0]
+    Alen = kpol.shape[1]
+    klen = kgrid.shape[0]
+    burn = draws.shape[0]-T # Periods burned.
+    ks = empty((T,N)) # Container for k.
+    As = empty((T,N),dtype=int64) # Container for A.
+    kps = empty((T,N)) # Container for k'.
+
+    for e in prange(N): # Loop over the economies, in parallel.
+        kt = k0[e]
+        At = A0[e]
+        for t in range(0,burn+T): # Time loop.
+            ind = min(max(searchsorted(kgrid,kt)-1,0),klen-2) # Grid point below k.
+            w = (kt-kgrid[ind])/(kgrid[ind+1]-kgrid[ind]) # Weight on the grid point above k.
+            kp = (1.0-w)*kpol[ind,At]+w*kpol[ind+1,At] # Capital choice, interpolated off the grid.
+            if t >= burn:
+                ks[t-burn,e] = kt # Record the second half.
+                As[t-burn,e] = At
+                kps[t-burn,e] = kp
+            kt = kp # Capital choice today is the state tomorrow.
+            At = min(max(searchsorted(cmat,draws[t,e]+At)-At*Alen,0),Alen-1) # Draw next-period productivity.
+
+    return ks,As,kps
@@ -0,0 +1,133 @@
+"""
+
+optimize.py
+-----------
+This code has the one-dimensional maximizers and root finders used by the Bellman operators.
+
+"""
+
+#%% Imports from Python
+from numpy import broadcast_to,maximum,ones,sqrt,where,zeros
+
+#%% Search a concave objective on the grid.
+def search_argmax(f,lo,hi,search):
+    '''
+
+    This function finds the first maximizer of f over the grid indices lo, ..., hi, assuming f is concave there.
+
+    Input:
+        f      : Objective as a function of the grid index.
+        lo     : Smallest index to consider.
+        hi     : Largest index to consider.
+        search : 'monotone' walks up from lo and stops once f starts falling; 'binary' halves the bracket by comparing f(m) and f(m+1).
+
+    Output:
+        ind  : Index of the maximizer.
+        fmax : Maximized value of f.
+
+    '''
+
+    # Binary concavity search: the maximum lies to the right of m if f is still rising at m.
+    if search == 'binary':
+        while hi-lo > 2:
+            m = (lo+hi)//2
+            if f(m) < f(m+1):
+                lo = m+1
+            else:
+                hi = m
+
+    # Walk up the remaining bracket until f stops rising.
+    ind = lo
+    fmax = f(lo)
+    while ind < hi:
+        fq = f(ind+1)
+        if fq <= fmax:
+            break
+        ind = ind+1
+        fmax = fq
+
+    return ind,fmax
+
+#%% Golden-section search.
+def golden_max(f,lo,hi,tol):
+    '''
+
+    This function maximizes f over [lo,hi] by golden-section search, for every element of lo and hi at once.
+    f must be single-peaked on each bracket, which holds when the Bellman equation is concave in the choice.
+
+    Input:
+        f   : Objective, evaluated elementwise on an array of choices.
+        lo  : Lower ends of the brackets.
+        hi  : Upper ends of the brackets.
+        tol : Tolerance for the width of the brackets.
+
+    Output:
+        x    : Maximizers.
+        fmax : Maximized values of f.
+
+    '''
+
+    r = (sqrt(5.0)-1.0)/2.0 # Golden ratio conjugate.
+    a = lo.copy() # Lower end of the bracket.
+    b = hi.copy() # Upper end of the bracket.
+    x1 = b-r*(b-a) # Lower interior point.
+    x2 = a+r*(b-a) # Upper interior point.
+    f1 = f(x1)
+    f2 = f(x2)
+
+    while (b-a).max() > tol:
+        up = f2 > f1 # The maximum is in [x1,b], so x2 becomes the lower interior point.
+        a = where(up,x1,a)
+        b = where(up,b,x2)
+        xn = where(up,a+r*(b-a),b-r*(b-a)) # The one new interior point.
+        fn = f(xn)
+        x1,x2 = where(up,x2,xn),where(up,xn,x1)
+        f1,f2 = where(up,f2,fn),where(up,fn,f1)
+
+    x = where(f2 > f1,x2,x1)
+    fmax = maximum(f1,f2)
+
+    # Corner solutions.
+    for xc in (lo,hi):
+        fc = f(xc)
+        x = where(fc > fmax,xc,x)
+        fmax = maximum(fc,fmax)
+
+    return x,fmax
+
+#%% Bisection on [0,1].
+def bisect(foc,shape,tol,maxiter,lo=None):
+    '''
+
+    This function solves foc(n) = 0 for n in [lo,1] by bisection, elementwise for an array of brackets of the given shape.
+    foc must be positive just above lo, so the bracket moves right while it is positive. If it never turns negative the bracket closes on n = 1.
+
+    Input:
+        foc     : First-order condition, evaluated elementwise on an array of n.
+        shape   : Shape of the array of brackets.
+        tol     : Tolerance for the width of the brackets.
+        maxiter : Maximum number of bisection steps.
+        lo      : Lower end of the brackets, broadcast to shape (zero if None).
+
+    Output:
+        n    : Roots.
+        iter : Number of bisection steps.
+        err  : Largest remaining bracket width.
+
+    '''
+
+    lo = zeros(shape) if lo is None else broadcast_to(lo,shape).astype(float) # Lower end of the bracket.
+    hi = ones(lo.shape) # Upper end of the bracket.
+
+    err = 1.0
+    iter = 0
+
+    while (err > tol) and (iter < maxiter):
+        n = 0.5*(lo+hi) # Midpoint.
+        up = foc(n) > 0.0 # Raising n still raises the objective.
+        lo[up] = n[up]
+        hi[~up] = n[~up]
+        err = (hi-lo).max()
+        iter = iter + 1
+
+    return 0.5*(lo+hi),iter,err
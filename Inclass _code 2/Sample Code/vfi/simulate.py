@@ -0,0 +1,294 @@
+"""
+
+simulate.py
+-----------
+This code has the simulator shared by the models with an exogenous Markov state: draws from the Markov chain, the panel time loop, and the serial loop and pool of processes that simulate the panel in blocks.
+
+"""
+
+#%% Imports from Python
+from numpy import arange,clip,cumsum,dtype,expand_dims,minimum,ndarray,prod,searchsorted,squeeze,where,zeros
+from numpy.random import SeedSequence,default_rng,rand
+from numpy.linalg import matrix_power
+from scipy.sparse import csr_matrix,issparse
+from types import SimpleNamespace
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+#%% Imports from the package
+from .kernels import panel_continuous,panel_grid
+
+#%% Markov chain for a single path.
+def markov_chain(pmat):
+    '''
+
+    This function gives the stationary distribution of pmat and a function that draws the next state with NumPy's global random numbers (seeded with numpy.random.seed).
+
+    Input:
+        pmat : Transition matrix, dense or sparse.
+
+    Output:
+        pmat0 : Stationary distribution.
+        draw  : draw(j) is the next state given state j.
+
+    '''
+
+    N = pmat.shape[0] # Number of states.
+
+    if issparse(pmat):
+        P = csr_matrix(pmat) # Stored transition probabilities, row by row.
+        pmat0 = zeros(N)
+        pmat0[0] = 1.0
+        for h in range(0,1000):
+            pmat0 = P.T@pmat0 # % Stationary distribution.
+        cmat = [cumsum(P.data[P.indptr[j]:P.indptr[j+1]]) for j in range(0,N)] # CDF over the stored entries of each row.
+        cind = [P.indices[P.indptr[j]:P.indptr[j+1]] for j in range(0,N)] # Next-period states of the stored entries.
+        draw = lambda j: cind[j][min(searchsorted(cmat[j],rand(1)[0]),len(cind[j])-1)] # Draw next-period state given today's state.
+    else:
+        pmat0 = matrix_power(pmat,1000)
+        pmat0 = pmat0[0,:] # % Stationary distribution.
+        cmat = cumsum(pmat,axis=1) # CDF matrix.
+        draw = lambda j: where(rand(1)<=squeeze(cmat[j,:]))[0][0] # Draw next-period state given today's state.
+
+    return pmat0,draw
+
+#%% Simulate a panel.
+def panel_path(kgrid,pmat,kpol,kind,continuous,rng,N,T,record,backend='numpy'):
+    '''
+
+    This function advances N economies for 2T periods at once, with the endogenous state k following the policy kpol and the exogenous state A following pmat.
+    The first T periods are burned; each of the last T periods is passed to record.
+    The random numbers are drawn from rng in a fixed order: the initial A, the initial k, then the next A in each period.
+    With backend 'numba', the time loop is compiled and runs in parallel over economies (see kernels.py); it draws the same random numbers, all at once, and gives the same panel.
+
+    Input:
+        kgrid      : Grid for k.
+        pmat       : Transition matrix for A.
+        kpol       : Policy function for k' on kgrid (rows) for each A-state (columns).
+        kind       : Policy function for k' as indices on kgrid, or None.
+        continuous : Whether the policies are off the grid, in which case k is a value and the policies are interpolated.
+        rng        : Random number generator.
+        N          : Number of economies.
+        T          : Time periods kept.
+        record     : Called as record(s,kt,At,kp) in kept period s, with today's state (k as an index on kgrid, or as a value off the grid), and off the grid the interpolated k'.
+        backend    : 'numpy' or 'numba' (see select_backend in kernels.py).
+
+    '''
+
+    klen = len(kgrid) # Capital grid size.
+    Alen = pmat.shape[0] # Productivity grid size.
+    pmat = pmat.toarray() if issparse(pmat) else pmat
+
+    pmat0 = matrix_power(pmat,1000)
+    pmat0 = pmat0[0,:] # Stationary distribution.
+    cmat = cumsum(pmat,axis=1)+expand_dims(arange(0,Alen),axis=1) # CDF matrix with row j shifted up by j, so one sorted search covers every row.
+    cmat = cmat.ravel()
+
+    At = minimum(searchsorted(cumsum(pmat0),rng.random(N)),Alen-1) # Index for initial productivity.
+    kt = rng.integers(0,klen,N) # Index for initial capital stock.
+    if continuous:
+        kt = kgrid[kt] # Off the grid, the capital stock itself is the state.
+
+    # Compiled time loop: every economy is advanced through all 2T periods, then the kept periods are recorded.
+    if backend == 'numba':
+        draws = rng.random((2*T,N)) # Draws for next-period productivity, in the same order as one period at a time.
+        if continuous:
+            ks,As,kps = panel_continuous(kgrid,kpol,cmat,At,kt,draws,T)
+        else:
+            ks,As = panel_grid(kind if kind is not None else searchsorted(kgrid,kpol),cmat,At,kt,draws,T)
+            kps = [None]*T
+        for s in range(0,T):
+            record(s,ks[s],As[s],kps[s]) # Record the second half.
+        return
+
+    for t in range(0,2*T): # Time loop.
+
+        if continuous:
+            kp = interp_policy(kt,kgrid,kpol,At) # Capital choice, interpolated off the grid.
+            if t >= T:
+                record(t-T,kt,At,kp) # Record the second half.
+            kt = kp # Capital choice today is the state tomorrow.
+
+        else:
+            if t >= T:
+                record(t-T,kt,At,None) # Record the second half.
+
+            # Capital choice today is the state tomorrow.
+            if kind is not None:
+                kt = kind[kt,At]
+            else:
+                kt = searchsorted(kgrid,kpol[kt,At])
+
+        # Draw next-period productivity for every economy.
+        At = clip(searchsorted(cmat,rng.random(N)+At)-At*Alen,0,Alen-1)
+
+#%% Policy functions off the grid.
+def interp_policy(k,kgrid,pol,A_ind):
+    '''
+
+    This function linearly interpolates a policy function in k, for economies with capital k and productivity state A_ind.
+
+    Input:
+        k     : Capital stock of each economy.
+        kgrid : Grid for k.
+        pol   : Policy function on kgrid (rows) for each A-state (columns).
+        A_ind : Productivity state of each economy.
+
+    Output:
+        Policy at (k,A) for each economy.
+
+    '''
+
+    ind = clip(searchsorted(kgrid,k)-1,0,len(kgrid)-2) # Grid point below k.
+    w = (k-kgrid[ind])/(kgrid[ind+1]-kgrid[ind]) # Weight on the grid point above k.
+
+    return (1.0-w)*pol[ind,A_ind]+w*pol[ind+1,A_ind]
+
+#%% Blocks of economies.
+def panel_blocks(par):
+    '''
+
+    This function splits the panel into blocks of par.sim_block economies. Block b draws from the b-th seed stream spawned from par.seed_sim, whether the blocks are simulated in this process or by a pool.
+
+    Output:
+        starts  : First economy of each block.
+        sizes   : Economies in each block.
+        streams : Seed stream of each block.
+
+    '''
+
+    N = par.N_sim # Number of economies.
+    starts = list(range(0,N,par.sim_block)) # First economy of each block.
+    sizes = [min(par.sim_block,N-b) for b in starts] # Economies in each block.
+    streams = SeedSequence(par.seed_sim).spawn(len(starts)) # One seed stream per block.
+
+    return starts,sizes,streams
+
+#%% Simulate a panel in this process.
+def simulate_serial(par,sol,block,names):
+    '''
+
+    This function simulates the panel one block of economies at a time in this process, with the seed streams of simulate_pool, so the panel is the same as with a pool of processes.
+
+    Input:
+        par   : Parameters.
+        sol   : Policy functions.
+        block : Simulates one block of economies, block(par,sol,rng,out), writing one row of each array in out per economy.
+        names : Names of the simulated variables.
+
+    Output:
+        out : The simulated variables, each (N_sim,T).
+
+    '''
+
+    out = {name:zeros((par.N_sim,par.T)) for name in names} # Containers for the simulated variables.
+
+    for start,size,stream in zip(*panel_blocks(par)):
+        block(par,sol,default_rng(stream),{name:val[start:start+size] for name,val in out.items()})
+
+    return out
+
+#%% Simulate a panel with a pool of processes.
+pool_state = {} # Shared arrays attached by a worker.
+
+def simulate_pool(par,sol,block,policies,names):
+    '''
+
+    This function simulates the panel in blocks of par.sim_block economies on par.sim_workers processes.
+    The policy functions are copied once into shared memory, and every worker reads them there instead of receiving its own copy. The workers also write their rows of the panel into shared memory.
+    Block b draws from the b-th seed stream spawned from par.seed_sim (see panel_blocks), so the panel does not depend on the number of workers and is the same as from simulate_serial.
+    With the spawn start method (Windows, macOS), call it from a script guarded by if __name__ == '__main__'.
+
+    Input:
+        par      : Parameters.
+        sol      : Policy functions.
+        block    : Simulates one block of economies, block(par,sol,rng,out), writing one row of each array in out per economy. It must be a module-level function, so the workers can import it.
+        policies : Names of the policy functions on sol that block uses.
+        names    : Names of the simulated variables.
+
+    Output:
+        out : The simulated variables, each (N_sim,T).
+
+    '''
+
+    N = par.N_sim # Number of economies.
+    T = par.T # Time periods.
+    starts,sizes,streams = panel_blocks(par) # Blocks of economies and their seed streams.
+
+    # Policy functions, and the panel itself, in shared memory.
+    blocks = [] # Shared memory blocks owned by this process.
+    pol_specs = {}
+    out_specs = {}
+    views = {}
+    try:
+        for name in policies:
+            x = getattr(sol,name,None)
+            if isinstance(x,ndarray):
+                pol_specs[name],view = publish(x.shape,x.dtype,blocks)
+                view[...] = x # The only copy of the policy function.
+        for name in names:
+            out_specs[name],views[name] = publish((N,T),dtype('float64'),blocks)
+            views[name][...] = 0.0
+
+        with ProcessPoolExecutor(max_workers=par.sim_workers,initializer=attach_pool,initargs=(par,getattr(sol,'choice','grid'),block,pol_specs,out_specs)) as pool:
+            list(pool.map(simulate_block,starts,sizes,streams))
+
+        out = {name:view.copy() for name,view in views.items()} # The panel outlives the shared memory.
+    finally:
+        view = None
+        views.clear() # Views must be released before the blocks are closed.
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+    return out
+
+def publish(shape,dt,blocks):
+    '''
+
+    This function creates a block of shared memory for an array and appends it to blocks.
+    It returns what a worker needs to attach to the block, and an array view of it.
+
+    '''
+
+    shm = shared_memory.SharedMemory(create=True,size=max(int(prod(shape))*dt.itemsize,1))
+    blocks.append(shm)
+
+    return (shm.name,shape,dt.str),ndarray(shape,dtype=dt,buffer=shm.buf)
+
+def attach(spec):
+    '''
+
+    This function attaches a worker to a block of shared memory and views it as an array, without copying.
+    The parent process closes and unlinks the block when the pool is done.
+
+    '''
+
+    name,shape,dt = spec
+    shm = shared_memory.SharedMemory(name=name)
+    pool_state['shm'].append(shm) # Keep the block open while the worker uses it.
+
+    return ndarray(shape,dtype=dt,buffer=shm.buf)
+
+def attach_pool(par,choice,block,pol_specs,out_specs):
+    '''
+
+    This function runs once in each worker. It attaches to the shared policy functions and panel.
+
+    '''
+
+    pool_state['par'] = par
+    pool_state['block'] = block
+    pool_state['shm'] = []
+    pool_state['sol'] = SimpleNamespace(choice=choice,**{name:attach(spec) for name,spec in pol_specs.items()})
+    pool_state['out'] = {name:attach(spec) for name,spec in out_specs.items()}
+
+def simulate_block(start,size,stream):
+    '''
+
+    This function simulates economies start to start+size-1 in a worker, writing them into the shared panel.
+
+    '''
+
+    out = {name:val[start:start+size] for name,val in pool_state['out'].items()}
+    pool_state['block'](pool_state['par'],pool_state['sol'],default_rng(stream),out)
@@ -0,0 +1,187 @@
+"""
+
+store.py
+--------
+This code saves solutions to disk and loads them back, so the model can be simulated and graphed without solving it again.
+A solution is named by a hash of the parameters and grids of the solve and of the code of its model (model.py and solve.py in the model's folder) and of this package.
+
+"""
+
+#%% Imports from Python
+from numpy import ascontiguousarray,generic,load,ndarray,save,savez_compressed
+from types import SimpleNamespace
+import hashlib
+import inspect
+import json
+import os
+
+#%% Folder of a model.
+def model_folder(myClass):
+    '''
+
+    This function gives the folder of the model.py that defines the model class.
+
+    '''
+
+    return os.path.dirname(os.path.abspath(inspect.getfile(type(myClass))))
+
+#%% Parameters that do not enter the solve (simulation, stationary distribution, project directories).
+not_solve = ('main','figout','T','N_sim','seed_sim','sim_workers','sim_block','dist_method','dist_tol','dist_maxiter','backend')
+
+#%% Parameters and code version.
+def solution_key(par,folder,tag=''):
+    '''
+
+    This function hashes the parameters, the grids, and the code that produced the solution.
+    Scalar and string parameters and the grids (dense arrays on par) enter the hash; the utility function follows from them.
+    Parameters in not_solve are left out, so a solution is loaded again when only the simulation or the stationary distribution changes.
+
+    Input:
+        par    : Parameters.
+        folder : Folder with the model's model.py and solve.py (see model_folder).
+        tag    : Name that tells apart solutions of the same parameters from different solvers (e.g. 'egm').
+
+    Output:
+        key    : Hash of the parameters and code version.
+        params : The scalar parameters in the hash.
+
+    '''
+
+    params = {}
+    grids = hashlib.sha1()
+    for name,val in sorted(vars(par).items()):
+        if name in not_solve:
+            continue
+        if isinstance(val,generic):
+            val = val.item()
+        if isinstance(val,(bool,int,float,str,tuple,list)) or val is None:
+            params[name] = val
+        elif isinstance(val,ndarray):
+            grids.update(name.encode()+ascontiguousarray(val).tobytes())
+
+    # Code version: the source of the model and the solver, and of the shared vfi package they are built on.
+    core = os.path.dirname(os.path.abspath(__file__))
+    code = hashlib.sha1()
+    for f in [os.path.join(folder,f) for f in ('model.py','solve.py')]+[os.path.join(core,f) for f in sorted(os.listdir(core)) if f.endswith('.py')]:
+        with open(f,'rb') as src:
+            code.update(src.read())
+
+    key = hashlib.sha1((json.dumps(params,sort_keys=True)+grids.hexdigest()+code.hexdigest()+tag).encode()).hexdigest()[:16]
+
+    return key,params
+
+#%% Save the solution.
+def save_solution(myClass,fmt='npy',store=None,tag=''):
+    '''
+
+    This function saves par and sol under a name given by solution_key.
+    Arrays on sol (including the labor tensor n0, where the solver keeps it) go to a compressed .npz file, or to a directory of .npy files that can be memory-mapped.
+    Scalars on sol and the parameters go to JSON.
+
+    Input:
+        myClass : Model class with parameters and policy functions.
+        fmt     : 'npy' (directory of .npy files) or 'npz' (one compressed file).
+        store   : Directory for solutions (default: solutions under par.main).
+        tag     : Name of the solver, if not the default (see solution_key).
+
+    Output:
+        path : Where the solution was saved.
+
+    '''
+
+    assert fmt in ('npy','npz')
+
+    par = myClass.par # Parameters.
+    sol = myClass.sol # Policy functions.
+
+    store = os.path.join(par.main,'solutions') if store is None else store
+    key,params = solution_key(par,model_folder(myClass),tag)
+
+    # Arrays and scalars on sol.
+    arrays = {}
+    scalars = {}
+    for name,val in vars(sol).items():
+        if isinstance(val,ndarray):
+            arrays[name] = val
+        elif isinstance(val,generic):
+            scalars[name] = val.item()
+        elif isinstance(val,list):
+            scalars[name] = [v.item() if isinstance(v,generic) else v for v in val]
+        else:
+            scalars[name] = val
+    meta = {'key':key,'par':params,'sol':scalars}
+
+    if fmt == 'npz':
+        os.makedirs(store,exist_ok=True)
+        path = os.path.join(store,key+'.npz')
+        savez_compressed(path,**arrays)
+        with open(os.path.join(store,key+'.json'),'w') as f:
+            json.dump(meta,f)
+    else:
+        path = os.path.join(store,key)
+        os.makedirs(path,exist_ok=True)
+        for name,val in arrays.items():
+            save(os.path.join(path,name+'.npy'),val)
+        with open(os.path.join(path,'meta.json'),'w') as f:
+            json.dump(meta,f)
+
+    print('Solution saved to ',path,'.')
+
+    return path
+
+#%% Load the solution.
+def load_solution(myClass,fmt='npy',store=None,mmap=True,tag=''):
+    '''
+
+    This function loads the stored solution for the model's current parameters into myClass.sol, if there is one.
+    From a .npy directory the arrays are memory-mapped read-only, so only the parts that are used are read from disk.
+
+    Input:
+        myClass : Model class with parameters (after setup).
+        fmt     : 'npy' (directory of .npy files) or 'npz' (one compressed file).
+        store   : Directory for solutions (default: solutions under par.main).
+        mmap    : Whether to memory-map arrays from a .npy directory.
+        tag     : Name of the solver, if not the default (see solution_key).
+
+    Output:
+        found : Whether a stored solution was loaded.
+
+    '''
+
+    assert fmt in ('npy','npz')
+
+    par = myClass.par # Parameters.
+
+    store = os.path.join(par.main,'solutions') if store is None else store
+    key,params = solution_key(par,model_folder(myClass),tag)
+
+    if fmt == 'npz':
+        path = os.path.join(store,key+'.npz')
+        meta_path = os.path.join(store,key+'.json')
+    else:
+        path = os.path.join(store,key)
+        meta_path = os.path.join(path,'meta.json')
+
+    if not os.path.exists(meta_path):
+        return False
+
+    with open(meta_path) as f:
+        meta = json.load(f)
+
+    # Namespace for optimal policy funtions.
+    sol = myClass.sol = SimpleNamespace()
+    for name,val in meta['sol'].items():
+        setattr(sol,name,val)
+
+    if fmt == 'npz':
+        with load(path) as arrays:
+            for name in arrays.files:
+                setattr(sol,name,arrays[name])
+    else:
+        for f in sorted(os.listdir(path)):
+            if f.endswith('.npy'):
+                setattr(sol,f[:-4],load(os.path.join(path,f),mmap_mode='r' if mmap else None))
+
+    print('Solution loaded from ',path,'.')
+
+    return True
@@ -0,0 +1,38 @@
+"""
+
+utility.py
+----------
+This code has the period utility functions shared by the models.
+
+"""
+
+#%% Imports from Python
+from numpy import log
+
+#%% CRRA Utility Function.
+def crra(c,sigma):
+
+    # CRRA utility
+    if sigma == 1:
+        u = log(c) # Log utility.
+    else:
+        u = (c**(1-sigma))/(1-sigma) # CRRA utility.
+
+    return u
+
+#%% CRRA Utility with Leisure.
+def crra_leisure(c,n,sigma,nu,gamma):
+
+    # Leisure.
+    un = ((1.0-n)**(1.0+(1.0/nu)))/(1.0+(1.0/nu))
+
+    # Consumption.
+    if sigma == 1:
+        uc = log(c) # Log utility.
+    else:
+        uc = (c**(1.0-sigma))/(1.0-sigma) # CRRA utility.
+
+    # Total.
+    u = uc + gamma*un;
+
+    return u
@@ -0,0 +1,144 @@
+"""
+
+model.py
+--------
+This code sets up the model.
+
+"""
+
+#%% Imports from Python
+from numpy import exp,linspace
+from types import SimpleNamespace
+
+#%% Imports from the shared package in the Sample Code folder
+import os,sys
+vfi_root = os.path.abspath(os.path.join(os.path.dirname(__file__),'..','..','Sample Code')) # Sample Code folder.
+if vfi_root not in sys.path:
+    sys.path.append(vfi_root)
+from vfi.discretization import tauchen
+from vfi.utility import crra
+
+#%% Stochastic Life-Cycle Model.
+class household():
+    '''
+    
+    Methods:
+        __init__(self,**kwargs) -> Set the household's attributes.
+        setup(self,**kwargs) -> Sets parameters.
+        
+    '''
+    
+    #%% Constructor.
+    def __init__(self,**kwargs):
+        '''        
+        
+        This initializes the model.
+        
+        Optional kwargs:
+            All parameters changed by setting kwarg.
+            
+        '''
+
+        print('--------------------------------------------------------------------------------------------------')
+        print('Model')
+        print('--------------------------------------------------------------------------------------------------\n')
+        print('   The model is the stochastic life-cycle model with a borrowing constraint and is solved via Backward Induction.')
+        
+        print('\n--------------------------------------------------------------------------------------------------')
+        print('Household')
+        print('--------------------------------------------------------------------------------------------------\n')
+        print('   The household lives for T periods and retires in period tr.')
+        print('   It derives utility from consumption.')
+        print('    -> He/she earns a stochastic income while working and a pension proportional to the last income when retired.')
+        print('    -> He/she can save, but not borrow, at the interest rate r.')
+        
+    #%% Set up model.
+    def setup(self,**kwargs):
+        '''
+        
+        This sets the parameters and creates the grids for the model.
+        
+            Input:
+                self : Model class.
+                kwargs : Values for parameters if not using the default.
+                
+        '''
+        
+        # Namespace for parameters, grids, and utility function.
+        setattr(self,'par',SimpleNamespace())
+        par = self.par
+
+        print('\n--------------------------------------------------------------------------------')
+        print('Parameters:')
+        print('--------------------------------------------------------------------------------\n')
+        
+        # Preferences.
+        par.T = 61 # Last period of life.
+        par.tr = 41 # First period of retirement.
+
+        par.beta = 0.96 # Discount factor.
+        par.sigma = 2.00 # CRRA.
+
+        # Prices and income.
+        par.r = 0.03 # Interest rate.
+        par.kappa = 0.6 # Share of income as pension.
+
+        par.sigma_eps = 0.07 # Std. dev of income shocks.
+        par.rho = 0.85 # Persistence of AR(1) process.
+        par.mu = 0.0 # Intercept of AR(1) process.
+
+        # Simulation parameters.
+        par.seed_sim = 2025 # Seed for simulation.
+        par.TT = 61 # Number of time periods.
+        par.NN = 10000 # Number of people.
+
+        # Set up asset grid.
+        par.alen = 300 # Grid size for a.
+        par.amax = 30.0 # Upper bound for a.
+        par.amin = 0.0 # Minimum a (the borrowing constraint).
+
+        # Discretized income process.
+        par.ylen = 7 # Grid size for y.
+        par.m = 3 # Scaling parameter for Tauchen.
+        
+        # Update parameter values to kwarg values if you don't want the default values.
+        for key,val in kwargs.items():
+            setattr(par,key,val)
+        
+        assert par.main != None
+        assert par.figout != None
+        assert par.T > par.tr
+        assert par.beta > 0 and par.beta < 1.00
+        assert par.sigma > 0
+        assert par.kappa >= 0 and par.kappa <= 1.00
+        assert par.sigma_eps > 0
+        assert abs(par.rho) < 1
+        assert par.alen > 5
+        assert par.amax > par.amin
+        assert par.ylen > 3
+        assert par.m > 0.0
+        assert par.TT >= 1
+        assert par.NN >= 1
+        
+        # Set up asset grid.
+        par.agrid = linspace(par.amin,par.amax,par.alen) # Equally spaced, linear grid for a (and a').
+
+        # Discretize income.
+        ygrid,pmat = tauchen(par.mu,par.rho,par.sigma_eps,par.ylen,par.m) # Tauchen's Method to discretize the AR(1) process for log income.
+        par.ygrid = exp(ygrid[0]) # The AR(1) is in logs so exponentiate it to get y.
+        par.pmat = pmat # Transition matrix.
+    
+        # Utility function.
+        par.util = crra
+        
+        print('T: ',par.T)
+        print('tr: ',par.tr)
+        print('beta: ',par.beta)
+        print('sigma: ',par.sigma)
+        print('r: ',par.r)
+        print('kappa: ',par.kappa)
+        print('amin: ',par.amin)
+        print('amax: ',par.amax)
+        print('sigma_eps: ',par.sigma_eps)
+        print('rho: ',par.rho)
+        print('mu: ',par.mu)
@@ -0,0 +1,93 @@
+"""
+
+my_graph.py
+-----------
+This code plots the value and policy functions and the life-cycle profiles.
+
+"""
+
+#%% Imports from Python
+from matplotlib.pyplot import close,figure,plot,xlabel,ylabel,title,savefig,show
+from numpy import linspace,meshgrid,nan,nanmean,zeros
+
+#%% Plot the model functions and simulations.
+def track_life_cycle(myClass):
+    '''
+    
+    This function plots the model functions and the life-cycle profiles from the simulations.
+    
+    Input:
+        myClass : Model class with parameters, grids, utility function, policy functions, and simulations.
+        
+    '''
+
+    # Model parameters, policy and value functions, and simulations.
+    par = myClass.par # Parameters.
+    sol = myClass.sol # Policy functions.
+    sim = myClass.sim # Simulations.
+
+    age = linspace(1,par.T,par.T,dtype=int) # Ages.
+    tmat,ymat = meshgrid(age[::5],par.ygrid,indexing='ij') # Every fifth age for each y.
+
+    # Plot consumption, saving policy, and value functions at the lowest and highest a.
+
+    for fig,(pol,zlabel,name,fname) in enumerate(((sol.c,'$c_{t}$','Consumption Policy Function','cpol'),
+                                                  (sol.a,'$a_{t+1}$','Saving Policy Function','apol'),
+                                                  (sol.v,'$v_t(a_t,y_t)$','Value Function','vfun'))):
+        for side,(p,where) in enumerate(((0,'Lowest'),(-1,'Highest'))):
+            ax = figure(2*fig+side+1).add_subplot(projection='3d')
+            ax.plot_surface(tmat,ymat,pol[p,::5,:])
+            ax.set_xlabel('$t$')
+            ax.set_ylabel('$y_{t}$')
+            ax.set_zlabel(zlabel)
+            ax.set_title(name+', '+where+' $a_t$')
+
+            figname = myClass.par.figout+"\\"+fname+"_"+where.lower()+".png"
+            savefig(figname)
+
+    # Life-cycle profiles: means by age across the simulations.
+
+    lcp_c = zeros(par.T) # Consumption by age.
+    lcp_a = zeros(par.T) # Savings by age.
+    lcp_u = zeros(par.T) # Utility by age.
+    for i in age:
+        alive = sim.tsim == i
+        lcp_c[i-1] = nanmean(sim.csim[alive]) if alive.any() else nan
+        lcp_a[i-1] = nanmean(sim.asim[alive]) if alive.any() else nan
+        lcp_u[i-1] = nanmean(sim.usim[alive]) if alive.any() else nan
+
+    # Plot the life-cycle profile of consumption.
+
+    figure(7)
+    plot(age,lcp_c)
+    xlabel('Age')
+    ylabel('$c^{sim}_{t}$')
+    title('LCP of Consumption')
+
+    figname = myClass.par.figout+"\\lcp_c.png"
+    savefig(figname)
+
+    # Plot the life-cycle profile of savings.
+
+    figure(8)
+    plot(age,lcp_a)
+    xlabel('Age')
+    ylabel('$a^{sim}_{t+1}$')
+    title('LCP of Savings')
+
+    figname = myClass.par.figout+"\\lcp_a.png"
+    savefig(figname)
+
+    # Plot the life-cycle profile of utility.
+
+    figure(9)
+    plot(age,lcp_u)
+    xlabel('Age')
+    ylabel('$u^{sim}_t$')
+    title('LCP of Utility')
+
+    figname = myClass.par.figout+"\\lcp_u.png"
+    savefig(figname)
+
+    #show()
+    #close('all')
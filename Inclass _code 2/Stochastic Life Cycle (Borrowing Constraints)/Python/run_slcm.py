@@ -0,0 +1,34 @@
+"""
+
+run_slcm.py
+-----------
+This code solves the stochastic life-cycle model with a borrowing constraint using backward induction.
+
+"""
+
+#%% Import from Python and set project directory
+import os
+os.chdir("C:\\Users\\xmgb\\Dropbox\\02_FUV\\teaching\\spring_2025\\dynamic_macro\\code\\slcm_python")
+main = os.getcwd()
+figout = main+"\\output\\figures"
+
+#%% Import from folder
+from model import household
+from solve import plan_life
+from simulate import live_lives
+from my_graph import track_life_cycle
+
+#%% Stochastic Life-Cycle Model.
+saver = household()
+
+# Set the parameters, state space, and utility function.
+saver.setup(main=main,figout=figout,beta = 0.96,sigma=2.00) # You can set the parameters here or use the defaults.
+
+# Solve the model.
+plan_life(saver) # Obtain the policy functions for consumption and savings at every age.
+
+# Simulate the model.
+live_lives(saver) # Simulate people forward in time.
+
+# Graphs.
+track_life_cycle(saver) # Plot policy functions and life-cycle profiles.
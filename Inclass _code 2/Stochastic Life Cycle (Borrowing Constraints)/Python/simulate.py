@@ -0,0 +1,103 @@
+"""
+
+simulate.py
+-----------
+This code simulates the model.
+
+"""
+
+#%% Imports from Python
+from numpy import arange,clip,cumsum,expand_dims,full,minimum,nan,searchsorted,where
+from numpy.random import default_rng
+from numpy.linalg import matrix_power
+from types import SimpleNamespace
+
+#%% Simulate the model.
+def live_lives(myClass):
+    '''
+    
+    This function simulates the stochastic life-cycle model for par.NN people over par.TT periods.
+    Every period advances all people at once. People older than T have died, and their variables are NaN.
+    
+    Input:
+        myClass : Model class with parameters, grids, utility function, and policy functions.
+        
+    '''
+
+    print('\n--------------------------------------------------------------------------------------------------')
+    print('Simulate the Model')
+    print('--------------------------------------------------------------------------------------------------\n')
+    
+    # Namespace for simulation.
+    setattr(myClass,'sim',SimpleNamespace())
+    sim = myClass.sim
+
+    # Model parameters, grids and functions.
+    
+    par = myClass.par # Parameters.
+    sol = myClass.sol # Policy functions.
+
+    sigma = par.sigma # CRRA.
+    util = par.util # Utility function.
+    rng = default_rng(par.seed_sim) # Random number generator for simulation.
+
+    apol = sol.a # Policy function for savings.
+    cpol = sol.c # Policy function for consumption.
+    aind = sol.a_ind # Policy function for savings as indices on agrid.
+
+    TT = par.TT # Time periods.
+    NN = par.NN # People.
+    T = par.T # Life span.
+    tr = par.tr # Retirement.
+
+    kappa = par.kappa # Share of income as pension.
+    ylen = par.ylen # Grid size for y.
+    ygrid = par.ygrid # Exogenous income.
+    pmat = par.pmat # Transition matrix.
+
+    ysim = full((TT,NN),nan) # Container for simulated income.
+    asim = full((TT,NN),nan) # Container for simulated savings.
+    tsim = full((TT,NN),nan) # Container for simulated age.
+    csim = full((TT,NN),nan) # Container for simulated consumption.
+    usim = full((TT,NN),nan) # Container for simulated utility.
+
+    # Begin simulation.
+
+    pmat0 = matrix_power(pmat,100)
+    pmat0 = pmat0[0,:] # Stationary distribution.
+    cmat = cumsum(pmat,axis=1)+expand_dims(arange(0,ylen),axis=1) # CDF matrix with row j shifted up by j, so one sorted search covers every row.
+    cmat = cmat.ravel()
+
+    y_ind = minimum(searchsorted(cumsum(pmat0),rng.random(NN)),ylen-1) # Index for initial income.
+    a_ind = rng.integers(0,par.alen,NN) # Index for initial wealth.
+    age = rng.integers(1,T+1,NN) # Initial age.
+    yr = where(age>=tr,ygrid[y_ind],nan) # Retirement income: the last salary, stored for the pension.
+    alive = age <= T # Everyone starts alive.
+
+    for j in range(0,TT): # Time loop.
+
+        if j > 0:
+            age = age+1 # Age in period t.
+            alive = alive & (age <= T) # Check if still alive.
+
+        p = alive.nonzero()[0] # People alive in period t.
+        t = age[p]-1 # Index of their age in the policy functions.
+
+        ysim[j,p] = where(age[p]>=tr,kappa*yr[p],ygrid[y_ind[p]]) # Salary or pension in period t given age.
+        tsim[j,p] = age[p] # Age in period t.
+        csim[j,p] = cpol[a_ind[p],t,y_ind[p]] # Consumption in period t.
+        asim[j,p] = apol[a_ind[p],t,y_ind[p]] # Savings for period t+1.
+        usim[j,p] = util(csim[j,p],sigma) # Utility in period t.
+        a_ind[p] = aind[a_ind[p],t,y_ind[p]] # Savings choice today is the state tomorrow.
+
+        # Store the last salary as the pension for those who retire next period, and draw income shocks for the workers.
+        retire = p[age[p] == tr-1]
+        yr[retire] = ygrid[y_ind[retire]]
+        work = p[age[p] < tr-1]
+        y_ind[work] = clip(searchsorted(cmat,rng.random(len(work))+y_ind[work])-y_ind[work]*ylen,0,ylen-1)
+
+    sim.ysim = ysim # Simulated income.
+    sim.asim = asim # Simulated savings.
+    sim.tsim = tsim # Simulated age.
+    sim.csim = csim # Simulated consumption.
+    sim.usim = usim # Simulated utility.
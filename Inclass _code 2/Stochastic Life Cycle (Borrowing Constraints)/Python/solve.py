@@ -0,0 +1,119 @@
+"""
+
+solve.py
+--------
+This code solves the model.
+
+"""
+
+#%% Imports from Python
+from numpy import argmax,expand_dims,full,inf,nan,take_along_axis,zeros,seterr
+from types import SimpleNamespace
+import time
+seterr(divide='ignore')
+seterr(invalid='ignore')
+
+#%% Solve the model using BI.
+def plan_life(myClass):
+    '''
+    
+    This function solves the stochastic life-cycle model by backward induction.
+    Each age is one maximization over the (a,a',y) array, with the expected value of every a' in every y-state computed once per age.
+    
+    Input:
+        myClass : Model class with parameters, grids, and utility function.
+        
+    '''
+
+    print('\n--------------------------------------------------------------------------------------------------')
+    print('Solving the Model by Backward Induction')
+    print('--------------------------------------------------------------------------------------------------\n')
+    
+    # Namespace for optimal policy funtions.
+    setattr(myClass,'sol',SimpleNamespace())
+    sol = myClass.sol
+
+    # Model parameters, grids and functions.
+    
+    par = myClass.par # Parameters.
+
+    T = par.T # Last period of life.
+    tr = par.tr # First year of retirement.
+
+    beta = par.beta # Discount factor.
+    sigma = par.sigma # CRRA.
+
+    alen = par.alen # Grid size for a.
+    agrid = par.agrid # Grid for a (state and choice).
+
+    ylen = par.ylen # Grid size for y.
+    ygrid = par.ygrid # Grid for y.
+    pmat = par.pmat # Transition matrix for y.
+
+    r = par.r # Real interest rate.
+    kappa = par.kappa # Share of income as pension.
+
+    util = par.util # Utility function.
+
+    # Backward induction.
+
+    v1 = full((alen,T,ylen),nan) # Container for V.
+    a1 = full((alen,T,ylen),nan) # Container for a'.
+    c1 = full((alen,T,ylen),nan) # Container for c.
+    a1_ind = zeros((alen,T,ylen),dtype=int) # Container for a' as indices on agrid.
+
+    amat = expand_dims(agrid,axis=(1,2)) # a (rows).
+    apmat = expand_dims(agrid/(1+r),axis=(0,2)) # Cost of each a' (columns).
+
+    # Consumption and utility for every (a,a',y), c = a + y - (a'/(1+r)). They do not depend on age, except that workers get a salary and retirees get a pension proportional to last drawn salary.
+    ret = {}
+    for retired,yt in ((False,ygrid),(True,kappa*ygrid)):
+        ct = amat + expand_dims(yt,axis=(0,1)) - apmat
+        ct[ct<0.0] = 0.0
+        ut = util(ct,sigma)
+        ut[ct<=0.0] = -inf # Set utility to negative infinity when c <= 0.
+        ret[retired] = (ct,ut)
+
+    t0 = time.time()
+
+    print('------------Solving from the Last Period of Life.------------\n')
+
+    for age in range(T,0,-1): # Start in the last period and iterate backward.
+
+        t = age-1 # Index of the age in the arrays.
+
+        if age == T: # Last period of life.
+
+            c1[:,t,:] = expand_dims(agrid,axis=1) + kappa*expand_dims(ygrid,axis=0) # Consume everything.
+            a1[:,t,:] = 0.0 # Save nothing.
+            v1[:,t,:] = util(c1[:,t,:],sigma) # Terminal value function.
+
+        else: # All other periods.
+
+            ct,ut = ret[age >= tr] # Consumption and utility for a worker or a retiree.
+
+            # Solve the maximization problem.
+            ev = v1[:,t+1,:]@pmat.T # Expected value of each a' (rows) given today's y-state (columns).
+            vall = ut + beta*expand_dims(ev,axis=0) # Compute the value function for each choice of a', given a and y.
+            ind = expand_dims(argmax(vall,axis=1),axis=1) # Where the maximum is on the grid for each (a,y).
+
+            # Store values.
+            v1[:,t,:] = take_along_axis(vall,ind,axis=1)[:,0,:] # Maximized v.
+            c1[:,t,:] = take_along_axis(ct,ind,axis=1)[:,0,:] # Optimal c.
+            a1[:,t,:] = agrid[ind[:,0,:]] # Optimal a'.
+            a1_ind[:,t,:] = ind[:,0,:]
+
+        # Print counter.
+        if age%5 == 0:
+            print('Age: ',age,'.')
+
+    t1 = time.time()
+    print('------------Life Cycle Problem Solved.------------\n')
+    print('Elapsed time is ',t1-t0,' seconds.')
+
+    # Value and policy functions.
+    sol.c = c1 # Consumption policy function.
+    sol.a = a1 # Saving policy function.
+    sol.a_ind = a1_ind # Saving policy function as indices on agrid.
+    sol.v = v1 # Value function.
+    sol.time = t1-t0 # Elapsed time in seconds.
@@ -0,0 +1,128 @@
+"""
+
+simulate.py
+-----------
+This code simulates the model.
+
+"""
+
+#%% Imports from Python
+from numpy import arange,argmax,array,clip,cumsum,expand_dims,full,minimum,nan,searchsorted,where
+from numpy.random import default_rng
+from numpy.linalg import matrix_power
+from types import SimpleNamespace
+
+#%% Simulate the model.
+def live_lives(myClass):
+    '''
+    
+    This function simulates the stochastic life-cycle model with portfolio choice for par.NN people over par.TT periods.
+    Wealth a'R(alpha,nu) is off the grid, so the policy functions are interpolated linearly in wealth. Each person picks the share with the highest interpolated value.
+    Every period advances all people at once. People older than T have died, and their variables are NaN.
+    
+    Input:
+        myClass : Model class with parameters, grids, utility function, and policy functions.
+        
+    '''
+
+    print('\n--------------------------------------------------------------------------------------------------')
+    print('Simulate the Model')
+    print('--------------------------------------------------------------------------------------------------\n')
+    
+    # Namespace for simulation.
+    setattr(myClass,'sim',SimpleNamespace())
+    sim = myClass.sim
+
+    # Model parameters, grids and functions.
+    
+    par = myClass.par # Parameters.
+    sol = myClass.sol # Policy functions.
+
+    sigma = par.sigma # CRRA.
+    util = par.util # Utility function.
+    rng = default_rng(par.seed_sim) # Random number generator for simulation.
+
+    alen = par.alen # Grid size for a.
+    agrid = par.agrid # Assets today (state variable).
+    alphagrid = par.alphagrid # Portfolio shares.
+    R = par.R # Gross portfolio return for each alpha and nu.
+    nu_cdf = cumsum(array(par.nu_prob)) # CDF of the shocks to the risky return.
+
+    vfun = sol.v # Value function, given alpha.
+    apol = sol.a # Policy function for savings, given alpha.
+
+    TT = par.TT # Time periods.
+    NN = par.NN # People.
+    T = par.T # Life span.
+    tr = par.tr # Retirement.
+
+    kappa = par.kappa # Share of income as pension.
+    ylen = par.ylen # Grid size for y.
+    ygrid = par.ygrid # Exogenous income.
+    pmat = par.pmat # Transition matrix.
+
+    ysim = full((TT,NN),nan) # Container for simulated income.
+    wsim = full((TT,NN),nan) # Container for simulated wealth.
+    asim = full((TT,NN),nan) # Container for simulated savings.
+    alphasim = full((TT,NN),nan) # Container for simulated portfolio share.
+    tsim = full((TT,NN),nan) # Container for simulated age.
+    csim = full((TT,NN),nan) # Container for simulated consumption.
+    usim = full((TT,NN),nan) # Container for simulated utility.
+
+    # Begin simulation.
+
+    pmat0 = matrix_power(pmat,100)
+    pmat0 = pmat0[0,:] # Stationary distribution.
+    cmat = cumsum(pmat,axis=1)+expand_dims(arange(0,ylen),axis=1) # CDF matrix with row j shifted up by j, so one sorted search covers every row.
+    cmat = cmat.ravel()
+
+    y_ind = minimum(searchsorted(cumsum(pmat0),rng.random(NN)),ylen-1) # Index for initial income.
+    wealth = agrid[rng.integers(0,alen,NN)] # Initial wealth.
+    age = rng.integers(1,T+1,NN) # Initial age.
+    yr = where(age>=tr,ygrid[y_ind],nan) # Retirement income: the last salary, stored for the pension.
+    alive = age <= T # Everyone starts alive.
+
+    for j in range(0,TT): # Time loop.
+
+        if j > 0:
+            age = age+1 # Age in period t.
+            alive = alive & (age <= T) # Check if still alive.
+
+        p = alive.nonzero()[0] # People alive in period t.
+        t = age[p]-1 # Index of their age in the policy functions.
+        yi = y_ind[p] # Their income states.
+
+        # Wealth on agrid: the grid point below and the weight on the one above.
+        lo = clip(searchsorted(agrid,wealth[p])-1,0,alen-2)
+        w = clip((wealth[p]-agrid[lo])/(agrid[lo+1]-agrid[lo]),0.0,1.0)
+
+        # Portfolio share with the highest value, then savings given that share.
+        vals = (1.0-w[:,None])*vfun[lo,t,yi,:] + w[:,None]*vfun[lo+1,t,yi,:]
+        al = argmax(vals,axis=1)
+        ap = (1.0-w)*apol[lo,t,yi,al] + w*apol[lo+1,t,yi,al]
+
+        ysim[j,p] = where(age[p]>=tr,kappa*yr[p],ygrid[yi]) # Salary or pension in period t given age.
+        tsim[j,p] = age[p] # Age in period t.
+        wsim[j,p] = wealth[p] # Wealth in period t.
+        asim[j,p] = ap # Savings for period t+1.
+        alphasim[j,p] = where(age[p]<T,alphagrid[al],0.0) # Share of savings in the risky asset.
+        csim[j,p] = wealth[p]+ysim[j,p]-ap # Consumption in period t.
+        usim[j,p] = util(csim[j,p],sigma) # Utility in period t.
+
+        # Draw the risky return: savings today are wealth tomorrow.
+        nu = minimum(searchsorted(nu_cdf,rng.random(len(p))),len(nu_cdf)-1)
+        wealth[p] = ap*R[al,nu]
+
+        # Store the last salary as the pension for those who retire next period, and draw income shocks for the workers.
+        retire = p[age[p] == tr-1]
+        yr[retire] = ygrid[y_ind[retire]]
+        work = p[age[p] < tr-1]
+        y_ind[work] = clip(searchsorted(cmat,rng.random(len(work))+y_ind[work])-y_ind[work]*ylen,0,ylen-1)
+
+    sim.ysim = ysim # Simulated income.
+    sim.wsim = wsim # Simulated wealth.
+    sim.asim = asim # Simulated savings.
+    sim.alphasim = alphasim # Simulated portfolio share.
+    sim.tsim = tsim # Simulated age.
+    sim.csim = csim # Simulated consumption.
+    sim.usim = usim # Simulated utility.
@@ -0,0 +1,144 @@
+"""
+
+solve.py
+--------
+This code solves the model.
+
+"""
+
+#%% Imports from Python
+from numpy import argmax,array,ascontiguousarray,clip,expand_dims,float32,full,inf,int32,nan,searchsorted,take_along_axis,zeros,seterr
+from types import SimpleNamespace
+import time
+seterr(divide='ignore')
+seterr(invalid='ignore')
+
+#%% Solve the model using BI.
+def plan_life(myClass):
+    '''
+    
+    This function solves the stochastic life-cycle model with portfolio choice by backward induction.
+    The household has wealth a, saves a', and puts the share alpha of a' in the risky asset, so next-period wealth is a'R(alpha,nu).
+    At each age, the next-period value is first maximized over the next-period share, once. Its expectation over nu and y for every (a',alpha) follows.
+    The maximization over (a',alpha) is then broadcast over (a,y,alpha,a'), par.chunk shares at a time, with a' last so the maximum is over contiguous memory.
+    
+    Input:
+        myClass : Model class with parameters, grids, and utility function.
+        
+    '''
+
+    print('\n--------------------------------------------------------------------------------------------------')
+    print('Solving the Model by Backward Induction')
+    print('--------------------------------------------------------------------------------------------------\n')
+    
+    # Namespace for optimal policy funtions.
+    setattr(myClass,'sol',SimpleNamespace())
+    sol = myClass.sol
+
+    # Model parameters, grids and functions.
+    
+    par = myClass.par # Parameters.
+
+    T = par.T # Last period of life.
+    tr = par.tr # First year of retirement.
+
+    beta = par.beta # Discount factor.
+    sigma = par.sigma # CRRA.
+
+    alen = par.alen # Grid size for a.
+    agrid = par.agrid # Grid for a (state and choice).
+
+    ylen = par.ylen # Grid size for y.
+    ygrid = par.ygrid # Grid for y.
+    pmat = par.pmat # Transition matrix for y.
+
+    alphalen = par.alphalen # Grid size for alpha.
+    alphagrid = par.alphagrid # Grid for alpha (choice).
+    R = par.R # Gross portfolio return for each alpha and nu.
+    nu_prob = array(par.nu_prob) # Probability of each shock to the risky return.
+    chunk = par.chunk # Number of portfolio shares per block.
+
+    kappa = par.kappa # Share of income as pension.
+
+    util = par.util # Utility function.
+
+    # Backward induction.
+
+    v1 = full((alen,T,ylen,alphalen),nan,dtype=float32) # Container for V, given the share alpha chosen today.
+    a1 = full((alen,T,ylen,alphalen),nan,dtype=float32) # Container for a', given alpha.
+    c1 = full((alen,T,ylen,alphalen),nan,dtype=float32) # Container for c, given alpha.
+    alpha1 = full((alen,T,ylen),nan,dtype=float32) # Container for the optimal alpha.
+    alpha1_ind = zeros((alen,T,ylen),dtype=int32) # Container for the optimal alpha as indices on alphagrid.
+
+    # Next-period wealth a'R(alpha,nu) for every (a',alpha,nu), as a linear interpolation on agrid. It does not depend on age.
+    wp = expand_dims(agrid,axis=(1,2))*expand_dims(R,axis=0)
+    lo = clip(searchsorted(agrid,wp)-1,0,alen-2) # Grid point below a'R.
+    w = clip((wp-agrid[lo])/(agrid[lo+1]-agrid[lo]),0.0,1.0).astype(float32) # Weight on the grid point above a'R. Wealth above amax is held at amax.
+
+    # Consumption and utility for every (a,y,a'), c = a + y - a'. They do not depend on age, except that workers get a salary and retirees get a pension proportional to last drawn salary.
+    amat = expand_dims(agrid,axis=(1,2)) # a.
+    apmat = expand_dims(agrid,axis=(0,1)) # a'.
+    ret = {}
+    for retired,yt in ((False,ygrid),(True,kappa*ygrid)):
+        ct = amat + expand_dims(yt,axis=(0,2)) - apmat
+        ct[ct<0.0] = 0.0
+        ut = util(ct,sigma)
+        ut[ct<=0.0] = -inf # Set utility to negative infinity when c <= 0.
+        ret[retired] = (ct.astype(float32),ut.astype(float32))
+
+    t0 = time.time()
+
+    print('------------Solving from the Last Period of Life.------------\n')
+
+    for age in range(T,0,-1): # Start in the last period and iterate backward.
+
+        t = age-1 # Index of the age in the arrays.
+
+        if age == T: # Last period of life.
+
+            cT = expand_dims(agrid,axis=1) + kappa*expand_dims(ygrid,axis=0) # Consume everything.
+            c1[:,t,:,:] = expand_dims(cT,axis=2)
+            a1[:,t,:,:] = 0.0 # Save nothing.
+            v1[:,t,:,:] = expand_dims(util(cT,sigma),axis=2) # Terminal value function.
+            alpha1[:,t,:] = 0.0 # Invest nothing.
+
+        else: # All other periods.
+
+            ct,ut = ret[age >= tr] # Consumption and utility for a worker or a retiree.
+
+            # Next-period value with the best next-period share, once per age.
+            vnext = v1[:,t+1,:,:].max(axis=2) # (a,y').
+
+            # Expected value of each (a',alpha) given today's y-state: interpolate at a'R, average over nu, then over y'.
+            vR = (1.0-w[...,None])*vnext[lo,:] + w[...,None]*vnext[lo+1,:] # (a',alpha,nu,y').
+            ev = (vR*nu_prob[None,None,:,None]).sum(axis=2)@pmat.T # (a',alpha,y).
+            ev = ascontiguousarray(beta*ev.transpose(2,1,0),dtype=float32) # (y,alpha,a').
+
+            # Solve the maximization problem over a' for each alpha, a block of shares at a time.
+            for s in range(0,alphalen,chunk):
+                vall = ut[:,:,None,:] + ev[None,:,s:s+chunk,:] # Compute the value function for each choice of a', given a, y, and alpha.
+                ind = expand_dims(argmax(vall,axis=3),axis=3) # Where the maximum is on the grid for each (a,y,alpha).
+                v1[:,t,:,s:s+chunk] = take_along_axis(vall,ind,axis=3)[...,0] # Maximized v.
+                a1[:,t,:,s:s+chunk] = agrid[ind[...,0]] # Optimal a'.
+                c1[:,t,:,s:s+chunk] = take_along_axis(ct[:,:,None,:],ind,axis=3)[...,0] # Optimal c.
+
+        # Optimal share: the joint maximum over (a',alpha).
+        alpha1_ind[:,t,:] = argmax(v1[:,t,:,:],axis=2)
+        if age < T:
+            alpha1[:,t,:] = alphagrid[alpha1_ind[:,t,:]]
+
+        # Print counter.
+        if age%5 == 0:
+            print('Age: ',age,'.')
+
+    t1 = time.time()
+    print('------------Life Cycle Problem Solved.------------\n')
+    print('Elapsed time is ',t1-t0,' seconds.')
+
+    # Value and policy functions.
+    sol.c = c1 # Consumption policy function, given alpha.
+    sol.a = a1 # Saving policy function, given alpha.
+    sol.v = v1 # Value function, given alpha.
+    sol.alpha = alpha1 # Portfolio share policy function.
+    sol.alpha_ind = alpha1_ind # Portfolio share policy function as indices on alphagrid.
+    sol.time = t1-t0 # Elapsed time in seconds.
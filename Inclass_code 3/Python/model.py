@@ -0,0 +1,174 @@
+"""
+
+model.py
+--------
+This code sets up the model.
+
+"""
+
+#%% Imports from Python
+from numpy import exp,linspace
+from types import SimpleNamespace
+
+#%% Imports from the shared package in the Sample Code folder
+import os,sys
+vfi_root = os.path.abspath(os.path.join(os.path.dirname(__file__),'..','..','Inclass _code 2','Sample Code')) # Sample Code folder.
+if vfi_root not in sys.path:
+    sys.path.append(vfi_root)
+from vfi.discretization import tauchen
+
+#%% Q-Theory Model of the Firm.
+class firm():
+    '''
+    
+    Methods:
+        __init__(self,**kwargs) -> Set the firm's attributes.
+        setup(self,**kwargs) -> Sets parameters.
+        
+    '''
+    
+    #%% Constructor.
+    def __init__(self,**kwargs):
+        '''        
+        
+        This initializes the model.
+        
+        Optional kwargs:
+            All parameters changed by setting kwarg.
+            
+        '''
+
+        print('--------------------------------------------------------------------------------------------------')
+        print('Model')
+        print('--------------------------------------------------------------------------------------------------\n')
+        print('   The model is the Q-theory model of investment and is solved via Value Function Iteration.')
+        
+        print('\n--------------------------------------------------------------------------------------------------')
+        print('Firm')
+        print('--------------------------------------------------------------------------------------------------\n')
+        print('   The firm is infintely-lived and faces productivity shocks.')
+        print('   It maximizes the present value of profits.')
+        print('    -> It chooses next period capital and pays convex adjustment costs on investment.')
+        
+    #%% Set up model.
+    def setup(self,**kwargs):
+        '''
+        
+        This sets the parameters and creates the grids for the model.
+        
+            Input:
+                self : Model class.
+                kwargs : Values for parameters if not using the default.
+                
+        '''
+        
+        # Namespace for parameters, grids, and functions.
+        setattr(self,'par',SimpleNamespace())
+        par = self.par
+
+        print('\n--------------------------------------------------------------------------------')
+        print('Parameters:')
+        print('--------------------------------------------------------------------------------\n')
+        
+        # Technology.
+        par.beta = 0.96 # Discount factor.
+        par.alpha = 0.6 # Capital's share of income.
+        par.delta = 0.6 # Depreciation rate.
+
+        # Prices, income, and costs.
+        par.p = 1.00 # Price of investment.
+        par.gamma = 1.00 # Speed of adjustment; cost function coefficient.
+
+        par.sigma_eps = 0.07 # Std. dev of productivity shocks.
+        par.rho = 0.85 # Persistence of AR(1) process.
+        par.mu = 0.0 # Intercept of AR(1) process.
+
+        # Simulation parameters.
+        par.seed_sim = 2025 # Seed for simulation.
+        par.T = 300 # Number of time periods.
+        par.N = 100 # Number of firms.
+
+        # Set up capital grid.
+        par.klen = 300 # Grid size for k.
+        par.kmax = 30.0 # Upper bound for k.
+        par.kmin = 1e-4 # Minimum k.
+
+        # Discretized productivity process.
+        par.Alen = 7 # Grid size for A.
+        par.m = 3 # Scaling parameter for Tauchen.
+
+        # Solver.
+        par.howard = 0 # Howard improvement: policy-evaluation steps between maximizations (0 turns it off).
+        par.howard_method = 'iterate' # Policy evaluation: 'iterate' (par.howard fixed-policy updates) or 'sparse' (solve the policy's linear system).
+        par.stop = 'l2' # Stopping rule: 'l2' (norm of the change in v), 'sup' (sup norm of the change scaled by beta/(1-beta)), or 'mqp' (MacQueen-Porteus bounds; the reported v is the midpoint of the bounds).
+        par.accel = 'none' # Fixed-point accelerator: 'none' or 'anderson' (Anderson mixing, with a plain update whenever the residual grows).
+        par.accel_depth = 5 # Number of earlier iterates mixed by Anderson acceleration.
+        
+        # Update parameter values to kwarg values if you don't want the default values.
+        for key,val in kwargs.items():
+            setattr(par,key,val)
+        
+        assert par.main != None
+        assert par.figout != None
+        assert par.beta > 0 and par.beta < 1.00
+        assert par.alpha > 0 and par.alpha < 1.00
+        assert par.delta >= 0 and par.delta <= 1.00
+        assert par.gamma >= 0
+        assert par.p > 0
+        assert par.sigma_eps > 0
+        assert abs(par.rho) < 1
+        assert par.klen > 5
+        assert par.kmax > par.kmin and par.kmin > 0
+        assert par.Alen > 3
+        assert par.m > 0.0
+        assert par.howard >= 0
+        assert par.howard_method in ('iterate','sparse')
+        assert par.stop in ('l2','sup','mqp')
+        assert par.accel in ('none','anderson')
+        assert par.accel_depth >= 1
+        assert par.T >= 1
+        assert par.N >= 1
+        
+        # Set up capital grid.
+        par.kgrid = linspace(par.kmin,par.kmax,par.klen) # Equally spaced, linear grid for k (and k').
+
+        # Discretize productivity.
+        Agrid,pmat = tauchen(par.mu,par.rho,par.sigma_eps,par.Alen,par.m) # Tauchen's Method to discretize the AR(1) process for log productivity.
+        par.Agrid = exp(Agrid[0]) # The AR(1) is in logs so exponentiate it to get A.
+        par.pmat = pmat # Transition matrix.
+    
+        # Revenue and cost functions.
+        par.production = production
+        par.total_cost = total_cost
+        
+        print('beta: ',par.beta)
+        print('alpha: ',par.alpha)
+        print('delta: ',par.delta)
+        print('p: ',par.p)
+        print('gamma: ',par.gamma)
+        print('kmin: ',par.kmin)
+        print('kmax: ',par.kmax)
+        print('sigma_eps: ',par.sigma_eps)
+        print('rho: ',par.rho)
+        print('mu: ',par.mu)
+        print('howard: ',par.howard)
+        print('stop: ',par.stop)
+        print('accel: ',par.accel)
+
+#%% Revenue Function.
+def production(A,k,alpha):
+
+    # Cobb-Douglas production.
+    output = A*(k**alpha)
+
+    return output
+
+#%% Cost Function.
+def total_cost(k,kp,delta,gamma,p):
+
+    # Convex adjustment cost.
+    invest = kp-((1-delta)*k) # Investment in new capital.
+    adj_cost = (gamma/2)*((invest/k)**2)*k # Convex adjustment cost.
+    cost = adj_cost + p*invest # Total investment cost.
+
+    return cost
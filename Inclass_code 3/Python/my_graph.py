@@ -0,0 +1,76 @@
+"""
+
+my_graph.py
+-----------
+This code plots the value and policy functions and the time path of the variables.
+
+"""
+
+#%% Imports from Python
+from matplotlib.pyplot import close,figure,plot,xlabel,ylabel,title,savefig,show
+from numpy import linspace
+
+#%% Plot the model functions and simulations.
+def track_firms(myClass):
+    '''
+    
+    This function plots the model functions and simulations.
+    
+    Input:
+        myClass : Model class with parameters, grids, policy functions, and simulations.
+        
+    '''
+
+    # Model parameters, policy and value functions, and simulations.
+    par = myClass.par # Parameters.
+    sol = myClass.sol # Policy functions.
+    sim = myClass.sim # Simulations.
+
+    # Plot policy and value functions.
+
+    funcs = ((sol.k,'$k_{t+1}$','Capital Policy Function','kpol'),
+             (sol.i,'$i_{t}$','Investment Policy Function','ipol'),
+             (sol.ik,'$i_{t}/k_{t}$','Investment Rate Policy Function','ikpol'),
+             (sol.r,'$r_{t}$','Revenue Function','rfun'),
+             (sol.e,'$C(k_{t+1},A_t,k_t)+pi_t$','Expenditure Function','efun'),
+             (sol.p,'$\\pi_{t}$','Profit Function','pfun'),
+             (sol.v,'$v_{t}$','Value Function','vfun'),
+             (sol.Q,'$Q_{t}$',"Average Tobin's Q",'Qfun'),
+             (sol.q,'$q_{t}$','Marginal q','qfun'))
+
+    for fig,(pol,label,name,fname) in enumerate(funcs):
+        figure(fig+1)
+        plot(par.kgrid,pol)
+        xlabel('$k_{t}$')
+        ylabel(label)
+        title(name)
+
+        figname = myClass.par.figout+"\\"+fname+".png"
+        savefig(figname)
+
+    # Plot simulated variables.
+
+    tgrid = linspace(1,par.T,par.T,dtype=int)
+
+    sims = ((sim.Asim,'$A^{sim}_t$','Simulated Revenue Shocks','Asim'),
+            (sim.ksim,'$k^{sim}_{t+1}$','Simulated Capital Choice','ksim'),
+            (sim.esim,'$C(k^{sim}_{t+1},A^{sim}_t,k^{sim}_t)+pi^{sim}_t$','Simulated Investment Expenditure','esim'),
+            (sim.isim,'$i^{sim}_t$','Simulated Investment','isim'),
+            (sim.iksim,'$i^{sim}_t/k^{sim}_t$','Simulated Investment Rate','iksim'),
+            (sim.rsim,'$y^{sim}_t$','Simulated Revenue','rsim'),
+            (sim.psim,'$\\pi^{sim}_t$','Simulated Profit','psim'),
+            (sim.vsim,'$v^{sim}_t$','Simulated Firm Value','vsim'),
+            (sim.qsim,'$q^{sim}_t$','Simulated Marginal q','qsim'))
+
+    for fig,(path,label,name,fname) in enumerate(sims):
+        figure(len(funcs)+fig+1)
+        plot(tgrid,path)
+        xlabel('Time')
+        ylabel(label)
+        title(name)
+
+        figname = myClass.par.figout+"\\"+fname+".png"
+        savefig(figname)
+
+    #show()
+    #close('all')
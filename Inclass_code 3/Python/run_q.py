@@ -0,0 +1,34 @@
+"""
+
+run_q.py
+--------
+This code solves the Q-theory model of the firm using value function iteration.
+
+"""
+
+#%% Import from Python and set project directory
+import os
+os.chdir("C:\\Users\\xmgb\\Dropbox\\02_FUV\\teaching\\spring_2025\\dynamic_macro\\code\\q_python")
+main = os.getcwd()
+figout = main+"\\output\\figures"
+
+#%% Import from folder
+from model import firm
+from solve import firm_problem
+from simulate import firm_dynamics
+from my_graph import track_firms
+
+#%% Q-Theory Model.
+acme = firm()
+
+# Set the parameters, state space, and revenue and cost functions.
+acme.setup(main=main,figout=figout,beta = 0.96,gamma=1.00) # You can set the parameters here or use the defaults.
+
+# Solve the model.
+firm_problem(acme) # Obtain the policy functions for capital and investment, and Tobin's Q.
+
+# Simulate the model.
+firm_dynamics(acme) # Simulate a panel of firms forward in time.
+
+# Graphs.
+track_firms(acme) # Plot policy functions and simulations.
@@ -0,0 +1,108 @@
+"""
+
+simulate.py
+-----------
+This code simulates the model.
+
+"""
+
+#%% Imports from Python
+from numpy import arange,clip,cumsum,expand_dims,minimum,searchsorted,zeros
+from numpy.random import default_rng
+from numpy.linalg import matrix_power
+from types import SimpleNamespace
+
+#%% Simulate the model.
+def firm_dynamics(myClass):
+    '''
+    
+    This function simulates par.N firms for 2T periods and burns the first T. Each period advances every firm with index lookups on the policy functions.
+    
+    Input:
+        myClass : Model class with parameters, grids, and policy functions.
+        
+    '''
+
+    print('\n--------------------------------------------------------------------------------------------------')
+    print('Simulate the Model')
+    print('--------------------------------------------------------------------------------------------------\n')
+    
+    # Namespace for simulation.
+    setattr(myClass,'sim',SimpleNamespace())
+    sim = myClass.sim
+
+    # Model parameters, grids and functions.
+    
+    par = myClass.par # Parameters.
+    sol = myClass.sol # Policy functions.
+
+    rng = default_rng(par.seed_sim) # Random number generator for simulation.
+
+    klen = par.klen # Capital grid size.
+    Alen = par.Alen # Productivity grid size.
+    Agrid = par.Agrid # Productivity (state variable).
+    pmat = par.pmat # Transition matrix for productivity.
+
+    vpol = sol.v # Firm value.
+    kpol = sol.k # Policy function for capital.
+    kind = sol.k_ind # Policy function for capital as indices on kgrid.
+    ipol = sol.i # Policy function for investment.
+    rpol = sol.r # Optimal revenue.
+    epol = sol.e # Optimal total investment expenditure.
+    ppol = sol.p # Optimal profit.
+    Qpol = sol.Q # Average Q.
+    qpol = sol.q # Marginal q.
+    ikpol = sol.ik # Investment rate.
+
+    T = par.T # Time periods.
+    N = par.N # Number of firms.
+    Asim = zeros((T,N)) # Container for simulated productivity.
+    vsim = zeros((T,N)) # Container for simulated firm value.
+    ksim = zeros((T,N)) # Container for simulated capital stock.
+    isim = zeros((T,N)) # Container for simulated investment.
+    rsim = zeros((T,N)) # Container for simulated revenue.
+    esim = zeros((T,N)) # Container for simulated investment expenditure.
+    psim = zeros((T,N)) # Container for simulated profit.
+    Qsim = zeros((T,N)) # Container for simulated average Q.
+    qsim = zeros((T,N)) # Container for simulated marginal q.
+    iksim = zeros((T,N)) # Container for simulated investment rate.
+
+    # Begin simulation.
+
+    pmat0 = matrix_power(pmat,1000)
+    pmat0 = pmat0[0,:] # Stationary distribution.
+    cmat = cumsum(pmat,axis=1)+expand_dims(arange(0,Alen),axis=1) # CDF matrix with row j shifted up by j, so one sorted search covers every row.
+    cmat = cmat.ravel()
+
+    kt = rng.integers(0,klen,N) # Index for initial capital stock.
+    At = minimum(searchsorted(cumsum(pmat0),rng.random(N)),Alen-1) # Index for initial productivity.
+
+    for t in range(0,2*T): # Time loop.
+
+        # Record the second half.
+        if t >= T:
+            s = t-T
+            Asim[s,:] = Agrid[At] # Productivity in period t.
+            vsim[s,:] = vpol[kt,At] # Firm value in period t.
+            ksim[s,:] = kpol[kt,At] # Capital stock for period t+1.
+            isim[s,:] = ipol[kt,At] # Investment in period t.
+            rsim[s,:] = rpol[kt,At] # Revenue in period t.
+            esim[s,:] = epol[kt,At] # Investment expenditure in period t.
+            psim[s,:] = ppol[kt,At] # Profit in period t.
+            Qsim[s,:] = Qpol[kt,At] # Average Q in period t.
+            qsim[s,:] = qpol[kt,At] # Marginal q in period t.
+            iksim[s,:] = ikpol[kt,At] # Investment rate in period t.
+
+        kt = kind[kt,At] # Capital choice today is the state tomorrow.
+        At = clip(searchsorted(cmat,rng.random(N)+At)-At*Alen,0,Alen-1) # Draw next-period productivity for every firm.
+
+    sim.Asim = Asim # Simulated productivity.
+    sim.vsim = vsim # Simulated firm value.
+    sim.ksim = ksim # Simulated capital choice.
+    sim.isim = isim # Simulated investment.
+    sim.rsim = rsim # Simulated revenue.
+    sim.esim = esim # Simulated investment expenditure.
+    sim.psim = psim # Simulated profit.
+    sim.Qsim = Qsim # Simulated average Q.
+    sim.qsim = qsim # Simulated marginal q.
+    sim.iksim = iksim # Simulated investment rate.
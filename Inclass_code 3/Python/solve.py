@@ -0,0 +1,120 @@
+"""
+
+solve.py
+--------
+This code solves the model.
+
+"""
+
+#%% Imports from Python
+from numpy import arange,expand_dims,gradient,inf,take_along_axis,where,zeros,seterr
+from types import SimpleNamespace
+import time
+seterr(divide='ignore')
+seterr(invalid='ignore')
+
+#%% Imports from the shared package in the Sample Code folder
+import os,sys
+vfi_root = os.path.abspath(os.path.join(os.path.dirname(__file__),'..','..','Inclass _code 2','Sample Code')) # Sample Code folder.
+if vfi_root not in sys.path:
+    sys.path.append(vfi_root)
+from vfi.bellman import follow_policy,grid_operator,iterate,record
+
+#%% Solve the model using VFI.
+def firm_problem(myClass):
+    '''
+    
+    This function solves the Q-theory model of the firm.
+    Revenue, investment, cost, and profit do not depend on the value function, so the (k,A,k') profit tensor and its feasibility mask are built once.
+    Each iteration is then one masked maximum over k', by the Bellman operator and iteration engine of the vfi package.
+    
+    Input:
+        myClass : Model class with parameters, grids, and revenue and cost functions.
+        
+    '''
+
+    print('\n--------------------------------------------------------------------------------------------------')
+    print('Solving the Model by Value Function Iteration')
+    print('--------------------------------------------------------------------------------------------------\n')
+    
+    # Namespace for optimal policy funtions.
+    setattr(myClass,'sol',SimpleNamespace())
+    sol = myClass.sol
+
+    # Model parameters, grids and functions.
+    
+    par = myClass.par # Parameters.
+
+    beta = par.beta # Discount factor.
+    alpha = par.alpha # Capital's share of income.
+    delta = par.delta # Depreciation rate.
+    gamma = par.gamma # Cost function coefficient.
+    p = par.p # Price of investment.
+
+    klen = par.klen # Grid size for k.
+    kgrid = par.kgrid # Grid for k (state and choice).
+
+    Alen = par.Alen # Grid size for A.
+    Agrid = par.Agrid # Grid for A.
+    pmat = par.pmat # Transition matrix for A.
+
+    production = par.production # Revenue function.
+    total_cost = par.total_cost # Cost function.
+
+    # Revenue, investment, cost, and profit for every (k,A,k').
+    kmat = expand_dims(kgrid,axis=(1,2)) # k.
+    kpmat = expand_dims(kgrid,axis=(0,1)) # k'.
+    rev = production(expand_dims(Agrid,axis=(0,2)),kmat,alpha) # Revenue given A and k.
+    invest = kpmat-((1-delta)*kmat) # Investment in new capital.
+    expend = total_cost(kmat,kpmat,delta,gamma,p) # Total investment expenditure given k and k'.
+    prof = rev-expend # Profit.
+    feasible = (invest <= rev) & (invest >= 0.0) # Investment must be non-negative and paid for out of revenue.
+    prof_mask = where(feasible,prof,-inf) # Profit, with infeasible choices ruled out.
+
+    # Value function iteration.
+
+    v0 = zeros((klen,Alen)) # Guess of value function is zero profit.
+
+    t0 = time.time()
+
+    print('------------Beginning Value Function Iteration.------------\n')
+
+    # Bellman operator: profit for each k (axis 0), k' (axis 1), and A (axis 2).
+    T = grid_operator(prof_mask.transpose(0,2,1),beta,pmat) # Maximize for all states at once.
+
+    # Howard improvement: follow the current policy before maximizing again.
+    def evaluate(v0,pol):
+        r1 = take_along_axis(prof_mask,pol[...,None],axis=2)[...,0] # Profit under the current policy.
+        return follow_policy(v0,r1,pol,beta,par,pmat)
+
+    # Iterate on the Bellman Equation until convergence.
+    res = iterate(v0,T,beta,par,evaluate)
+    v1 = res.v # Firm value.
+    ind = res.pol # Capital policy as indices on kgrid.
+
+    t1 = time.time()
+    print('Elapsed time is ',t1-t0,' seconds.')
+    print('Converged in ',res.iter,' iterations.')
+    if par.howard > 0:
+        print('Policy-evaluation steps: ',res.eval_steps,'.')
+    print('------------End of Value Function Iteration.------------\n')
+
+    # Solver diagnostics.
+    record(sol,res,par)
+
+    # Macro variables, value, and policy functions.
+    kstate = expand_dims(kgrid,axis=1) # k for each value of A.
+    sol.v = v1 # Firm value.
+    sol.k = kgrid[ind] # Capital policy function.
+    sol.k_ind = ind # Capital policy function as indices on kgrid.
+    sol.i = sol.k-((1-delta)*kstate) # Investment policy function.
+    sol.r = rev[:,:,0] # Revenue function.
+    sol.e = take_along_axis(expend,ind[...,None],axis=2)[...,0] # Investment expenditure function.
+    sol.p = take_along_axis(prof,ind[...,None],axis=2)[...,0] # Profit function.
+    sol.ik = sol.i/kstate # Investment rate.
+
+    # Tobin's Q: average Q is firm value per unit of capital at its replacement cost. Marginal q is the discounted expected value of one more unit of capital next period.
+    sol.Q = v1/(p*kstate) # Average Q.
+    evk = gradient(v1,kgrid,axis=0)@pmat.T # Expected marginal value of k' given today's A.
+    sol.q = beta*evk[ind,arange(0,Alen)] # Marginal q.
+    sol.time = t1-t0 # Elapsed time in seconds.